@@ -0,0 +1,68 @@
+# scripts/bench_batch_hashing.py
+"""
+Compares computing phash, dhash, ahash and colorhash with a per-image imagehash
+loop against the single-decode, vectorized batch path in curation.hashing.
+
+Both paths start from the same decoded images, so the numbers are hashing
+cost only. The loop runs colorhash on the full image, as imagehash does; the
+batch path uses a COLOR_THUMBNAIL_SIZE thumbnail.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_batch_hashing.py --images 256 --size 1024x768
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import imagehash
+import numpy as np
+from bench_parallel_hashing import make_synthetic_jpegs
+from curation.hash_index import hash_to_int
+from curation.hashing import HASH_KINDS, batch_hashes, thumbnails_from_image
+from PIL import Image
+
+
+def per_image_loop(images: list[Image.Image]) -> dict[str, list[int]]:
+    hashes = {kind: [] for kind in HASH_KINDS}
+    for img in images:
+        hashes["phash"].append(hash_to_int(imagehash.phash(img)))
+        hashes["dhash"].append(hash_to_int(imagehash.dhash(img)))
+        hashes["ahash"].append(hash_to_int(imagehash.average_hash(img)))
+        hashes["colorhash"].append(hash_to_int(imagehash.colorhash(img)))
+    return hashes
+
+
+def batched(images: list[Image.Image]) -> dict[str, list[int]]:
+    thumbs = [thumbnails_from_image(img) for img in images]
+    stacked = {kind: np.stack([t[kind] for t in thumbs]) for kind in HASH_KINDS}
+    return {kind: values.tolist() for kind, values in batch_hashes(stacked).items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-family image hashing.")
+    parser.add_argument("--images", type=int, default=256, help="Number of synthetic JPEGs.")
+    parser.add_argument("--size", type=str, default="1024x768", help="Synthetic image resolution.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_synthetic_jpegs(Path(tmp), args.images, args.size)
+        images = [Image.open(p).convert("RGB") for p in paths]
+
+    start = time.perf_counter()
+    reference = per_image_loop(images)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = batched(images)
+    batch_time = time.perf_counter() - start
+
+    for kind in ("phash", "dhash", "ahash"):
+        assert result[kind] == reference[kind], f"{kind} differs from imagehash"
+
+    print(f"{len(images)} images at {args.size}, families: {', '.join(HASH_KINDS)}\n")
+    print(f"{'path':<18}{'total s':>10}{'images/s':>12}")
+    print(f"{'per-image loop':<18}{loop_time:>10.2f}{len(images) / loop_time:>12.1f}")
+    print(f"{'batched':<18}{batch_time:>10.2f}{len(images) / batch_time:>12.1f}")
+    print(f"\nspeedup: {loop_time / batch_time:.1f}x")
@@ -0,0 +1,164 @@
+# scripts/bench_clustering.py
+"""
+Compares wall-clock time and peak RSS of auto_curate's two clustering modes,
+HDBSCAN on the raw embeddings and PCA + k-NN graph clustering, on synthetic
+CLIP-like float16 embeddings (tight groups of near-duplicates around a shared
+mean direction, plus unrelated background images). Each configuration runs
+in a fresh subprocess on the same memmapped file, so peak RSS is per run and
+includes the embedding pages it touched.
+
+Each run also times auto_curate's filtering step (finding the clusters
+larger than --max-cluster-size and their rows) on the labels it produced,
+since with tens of thousands of k-NN components a per-cluster scan over the
+labels can cost more than the clustering.
+
+Pair precision/recall are measured against the planted groups, so a faster
+mode that merges or shatters clusters shows up here too. HDBSCAN is skipped
+when the hdbscan package is not installed, and with --hdbscan-max above the
+sizes it can finish in reasonable time.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_clustering.py --sizes 10000 50000 200000
+    PYTHONPATH=src python scripts/bench_clustering.py --sizes 10000 --modes knn-graph --knn 30
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+WRITE_BLOCK = 10000
+
+
+def make_synthetic_embeddings(out_path: Path, count: int, dim: int = 768, noise_frac: float = 0.3, seed: int = 0):
+    """
+    Writes `count` unit-length float16 embeddings to a .npy file, written in
+    blocks so generation memory stays flat, and returns the planted labels
+    (-1 for background). Groups hold 2-60 images with within-group cosine
+    similarity ~0.98; unrelated images sit around ~0.5, like CLIP's.
+    """
+    rng = np.random.default_rng(seed)
+    mean = rng.normal(size=dim)
+    mean /= np.linalg.norm(mean)
+    sizes = rng.integers(2, 61, size=count)
+    sizes = sizes[np.cumsum(sizes) <= int(count * (1 - noise_frac))]
+    truth = np.concatenate([np.repeat(np.arange(len(sizes)), sizes), np.full(count - sizes.sum(), -1)])
+    centers = 0.7 * mean + 0.7 * rng.normal(size=(len(sizes), dim)) / np.sqrt(dim)
+
+    embeddings = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float16, shape=(count, dim))
+    for start in range(0, count, WRITE_BLOCK):
+        labels = truth[start : start + WRITE_BLOCK]
+        block = np.where(
+            (labels >= 0)[:, None],
+            centers[np.maximum(labels, 0)] + 0.12 * rng.normal(size=(len(labels), dim)) / np.sqrt(dim),
+            0.7 * mean + 0.7 * rng.normal(size=(len(labels), dim)) / np.sqrt(dim),
+        )
+        embeddings[start : start + len(labels)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    embeddings.flush()
+    return truth
+
+
+def pair_scores(truth: np.ndarray, labels: np.ndarray) -> tuple[float, float]:
+    """Precision and recall over pairs of images placed in the same cluster; outliers pair with nothing."""
+
+    def same_cluster_pairs(*columns):
+        mask = np.all([c >= 0 for c in columns], axis=0)
+        _, counts = np.unique(np.stack([c[mask] for c in columns]), axis=1, return_counts=True)
+        return int((counts * (counts - 1) // 2).sum())
+
+    true_positives = same_cluster_pairs(truth, labels)
+    return true_positives / max(same_cluster_pairs(labels), 1), true_positives / max(same_cluster_pairs(truth), 1)
+
+
+def run_once(
+    embeddings_path: Path, mode: str, pca_dim: int, knn: int, min_similarity: float, max_cluster_size: int
+) -> dict:
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    start = time.perf_counter()
+    if mode == "knn-graph":
+        from curation.clustering import knn_graph_clusters
+
+        labels = knn_graph_clusters(embeddings, None, pca_dim, knn, min_similarity)
+    else:
+        import hdbscan
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        labels = hdbscan.HDBSCAN(min_cluster_size=2, metric="euclidean", cluster_selection_method="eom").fit(vectors)
+        labels = labels.labels_
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    from curation.clustering import oversized_clusters
+
+    oversized_clusters(labels, max_cluster_size)
+    filter_elapsed = time.perf_counter() - start
+    np.save(embeddings_path.with_name(f"labels-{mode}.npy"), labels)
+    # ru_maxrss is in KiB on Linux
+    return {
+        "seconds": elapsed,
+        "filter_seconds": filter_elapsed,
+        "clusters": int(labels.max()) + 1,
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HDBSCAN vs k-NN graph clustering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 200000], help="Embedding counts.")
+    parser.add_argument("--modes", nargs="+", choices=["hdbscan", "knn-graph"], default=["hdbscan", "knn-graph"])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--pca-dim", type=int, default=64)
+    parser.add_argument("--knn", type=int, default=15)
+    parser.add_argument("--min-similarity", type=float, default=0.85)
+    parser.add_argument("--max-cluster-size", type=int, default=10, help="auto_curate's dense-cluster cutoff.")
+    parser.add_argument("--hdbscan-max", type=int, default=200000, help="Skip HDBSCAN above this many embeddings.")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        path, mode = args.child.split(",")
+        print(
+            json.dumps(run_once(Path(path), mode, args.pca_dim, args.knn, args.min_similarity, args.max_cluster_size))
+        )
+        sys.exit(0)
+
+    try:
+        import hdbscan  # noqa: F401
+
+        has_hdbscan = True
+    except ImportError:
+        has_hdbscan = False
+        print("hdbscan is not installed; only the k-NN graph mode will run.")
+
+    print(
+        f"\n{'embeddings':>11}{'mode':>11}{'clusters':>10}{'seconds':>10}{'filter s':>10}"
+        f"{'peak RSS MB':>13}{'precision':>11}{'recall':>8}"
+    )
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            embeddings_path = Path(tmp) / "embeddings.npy"
+            truth = make_synthetic_embeddings(embeddings_path, count, args.dim)
+            for mode in args.modes:
+                if mode == "hdbscan" and (not has_hdbscan or count > args.hdbscan_max):
+                    print(f"{count:>11}{mode:>11}{'skipped':>10}")
+                    continue
+                command = [sys.executable, __file__, "--child", f"{embeddings_path},{mode}"]
+                command += ["--pca-dim", str(args.pca_dim), "--knn", str(args.knn)]
+                command += [
+                    "--min-similarity",
+                    str(args.min_similarity),
+                    "--max-cluster-size",
+                    str(args.max_cluster_size),
+                ]
+                output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                precision, recall = pair_scores(truth, np.load(Path(tmp) / f"labels-{mode}.npy"))
+                print(
+                    f"{count:>11}{mode:>11}{r['clusters']:>10}{r['seconds']:>10.1f}{r['filter_seconds']:>10.3f}"
+                    f"{r['peak_mb']:>13.0f}{precision:>11.3f}{recall:>8.3f}"
+                )
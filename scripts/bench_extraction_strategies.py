@@ -0,0 +1,49 @@
+# scripts/bench_extraction_strategies.py
+"""
+Reports decode throughput (source frames/sec) and how many frames each video
+extraction strategy keeps, so a strategy can be picked per source type.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_extraction_strategies.py --duration 300
+    PYTHONPATH=src python scripts/bench_extraction_strategies.py --video path/to/vhs_rip.mkv
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from bench_segmented_extract import make_synthetic_video
+from ingestion.extract import EXTRACTION_STRATEGIES, extract_video_frames, probe_video
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark video frame extraction strategies.")
+    parser.add_argument("--video", type=str, default=None, help="Benchmark a real video instead of a synthetic one.")
+    parser.add_argument("--duration", type=int, default=300, help="Length of the synthetic video in seconds.")
+    parser.add_argument("--scene-threshold", type=float, default=0.4)
+    parser.add_argument("--strategies", nargs="+", default=list(EXTRACTION_STRATEGIES), choices=EXTRACTION_STRATEGIES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.video:
+            video = Path(args.video)
+        else:
+            video = tmp_dir / "synthetic.mp4"
+            print(f"Rendering {args.duration}s synthetic video...")
+            make_synthetic_video(video, args.duration)
+
+        info = probe_video(video)
+        source_frames = int(info["duration"] * info["frame_rate"])
+        print(f"{video.name}: {info['width']}x{info['height']}, {info['duration']:.1f}s, ~{source_frames} frames\n")
+        print(f"{'strategy':<16}{'wall (s)':>10}{'src fps':>10}{'kept':>8}")
+
+        for strategy in args.strategies:
+            out_dir = tmp_dir / strategy
+            shutil.rmtree(out_dir, ignore_errors=True)
+            out_dir.mkdir()
+            start = time.perf_counter()
+            frames = extract_video_frames(video, out_dir, args.scene_threshold, strategy)
+            elapsed = time.perf_counter() - start
+            print(f"{strategy:<16}{elapsed:>10.2f}{source_frames / elapsed:>10.1f}{len(frames):>8}")
@@ -0,0 +1,100 @@
+# scripts/bench_face_detection.py
+"""
+Reports face-detection accuracy against speed for several FaceDetectionOptions
+operating points, on a synthetic set of large frames where half contain one
+drawn face of random size and half contain none.
+
+Detection time excludes decoding, which the blur check shares. Recall is
+over faces at least --min-face pixels tall at full resolution; the
+false-positive rate is over the face-free frames.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_face_detection.py --images 40 --size 4000x3000 --min-face 80
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from curation.quality_gate import FaceDetectionOptions, ImageContext, detect_faces
+
+
+def draw_face(size: int) -> np.ndarray:
+    """A schematic grayscale face (skin, eyes, brows, nose, mouth) that the frontal-face cascade detects."""
+    s, c = size, size // 2
+    face = np.full((s, s), 90, np.uint8)
+    cv2.ellipse(face, (c, int(c * 1.05)), (int(s * 0.36), int(s * 0.47)), 0, 0, 360, 200, -1)
+    for side in (-1, 1):
+        x, y = c + side * int(s * 0.15), int(s * 0.42)
+        cv2.ellipse(face, (x, y), (int(s * 0.09), int(s * 0.045)), 0, 0, 360, 40, -1)
+        cv2.ellipse(face, (x, y - int(s * 0.08)), (int(s * 0.10), int(s * 0.02)), 0, 0, 360, 70, -1)
+    cv2.ellipse(face, (c, int(s * 0.62)), (int(s * 0.04), int(s * 0.08)), 0, 0, 360, 170, -1)
+    cv2.ellipse(face, (c, int(s * 0.75)), (int(s * 0.13), int(s * 0.035)), 0, 0, 360, 80, -1)
+    return cv2.GaussianBlur(face, (0, 0), s / 100)
+
+
+def make_face_set(out_dir: Path, count: int, size: str, min_face: int) -> list[tuple[Path, bool]]:
+    """Writes `count` textured JPEG frames; every other one gets a face between min_face and 1/3 of the short edge."""
+    width, height = (int(v) for v in size.split("x"))
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frames = []
+    for i in range(count):
+        fx, fy = rng.uniform(1, 8, size=2)
+        frame = 127 + 80 * np.sin(x / width * fx * np.pi) * np.cos(y / height * fy * np.pi)
+        frame += rng.normal(0, 12, size=(height, width)).astype(np.float32)
+        frame = np.clip(frame, 0, 255).astype(np.uint8)
+        has_face = i % 2 == 0
+        if has_face:
+            side = int(rng.uniform(min_face, min(width, height) / 3))
+            top, left = rng.integers(0, height - side), rng.integers(0, width - side)
+            frame[top : top + side, left : left + side] = draw_face(side)
+        path = out_dir / f"frame_{i:04d}.jpg"
+        cv2.imwrite(str(path), frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        frames.append((path, has_face))
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Face detection accuracy vs speed report.")
+    parser.add_argument("--images", type=int, default=40, help="Number of synthetic frames (half with a face).")
+    parser.add_argument("--size", type=str, default="4000x3000", help="Synthetic frame resolution.")
+    parser.add_argument("--min-face", type=int, default=80, help="Smallest face, in full-resolution pixels.")
+    parser.add_argument("--reduction", type=int, choices=[1, 2, 4, 8], default=2)
+    parser.add_argument("--max-edges", type=int, nargs="+", default=[0, 1600, 1024, 640, 400], help="0 = no cap.")
+    parser.add_argument("--first-pass-scale-factor", type=float, default=1.3)
+    parser.add_argument("--cascade", type=str, default=cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    cascade = cv2.CascadeClassifier(args.cascade)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.images} frames at {args.size}...")
+        frames = make_face_set(Path(tmp), args.images, args.size, args.min_face)
+        contexts = [(ImageContext(path, args.reduction), has_face) for path, has_face in frames]
+        for ctx, _ in contexts:
+            ctx.size(), ctx.gray()  # decode up front, so only detection is timed
+
+        print(f"\n{'max edge':>9}{'two-pass':>10}{'ms/img':>10}{'recall':>9}{'false pos':>11}")
+        for max_edge in args.max_edges:
+            for first_pass in (None, args.first_pass_scale_factor):
+                options = FaceDetectionOptions(
+                    max_edge=max_edge or None, min_size=args.min_face, first_pass_scale_factor=first_pass
+                )
+                hits, misses, false_positives = 0, 0, 0
+                start = time.perf_counter()
+                for ctx, has_face in contexts:
+                    found = len(detect_faces(ctx, cascade, options)) > 0
+                    hits += found and has_face
+                    misses += has_face and not found
+                    false_positives += found and not has_face
+                elapsed = time.perf_counter() - start
+                faces = hits + misses
+                print(
+                    f"{max_edge or '-':>9}{'yes' if first_pass else 'no':>10}"
+                    f"{1000 * elapsed / len(contexts):>10.1f}{hits / faces:>9.0%}"
+                    f"{false_positives / (len(contexts) - faces):>11.0%}"
+                )
@@ -0,0 +1,49 @@
+# scripts/bench_frame_formats.py
+"""
+Reports encode time, decode time and bytes per frame for every frame output
+format, using frames streamed from a synthetic video.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_frame_formats.py --frames 50
+"""
+
+import argparse
+import itertools
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from bench_segmented_extract import make_synthetic_video
+from ingestion.extract import FRAME_FORMATS, iter_video_frames, write_frames
+from shared.image_files import open_image
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark frame output formats.")
+    parser.add_argument("--frames", type=int, default=50, help="Number of frames to encode per format.")
+    parser.add_argument("--size", type=str, default="1920x1080", help="Synthetic video resolution.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        video = tmp_dir / "synthetic.mp4"
+        make_synthetic_video(video, duration=max(10, args.frames // 2), size=args.size)
+        frames = list(itertools.islice(iter_video_frames(video, strategy="keyframe"), args.frames))
+        print(f"{len(frames)} frames at {args.size}\n")
+        print(f"{'format':<8}{'encode ms/frame':>17}{'decode ms/frame':>17}{'KiB/frame':>11}")
+
+        for frame_format in FRAME_FORMATS:
+            out_dir = tmp_dir / frame_format
+            out_dir.mkdir()
+
+            start = time.perf_counter()
+            paths = write_frames(frames, out_dir, "bench", frame_format)
+            encode = (time.perf_counter() - start) / len(paths)
+
+            start = time.perf_counter()
+            for p in paths:
+                np.asarray(open_image(p).convert("RGB"))
+            decode = (time.perf_counter() - start) / len(paths)
+
+            size = sum(p.stat().st_size for p in paths) / len(paths)
+            print(f"{frame_format:<8}{encode * 1000:>17.1f}{decode * 1000:>17.1f}{size / 1024:>11.1f}")
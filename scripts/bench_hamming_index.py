@@ -0,0 +1,73 @@
+# scripts/bench_hamming_index.py
+"""
+Compares near-duplicate lookups in MultiIndexHashTable against a brute-force
+numpy scan, on synthetic 64-bit hashes where a tenth of the queries are
+near-duplicates of stored hashes.
+
+Brute force is timed on a sample of the queries and both methods are
+reported per query; the results of the sampled queries are checked to match.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_hamming_index.py --sizes 10000 100000 1000000 --threshold 6
+"""
+
+import argparse
+import time
+
+import numpy as np
+from curation.hash_index import MultiIndexHashTable, brute_force_query
+
+
+def synthetic_hashes(n: int, rng: np.random.Generator, near_fraction: float = 0.1, max_flips: int = 6) -> np.ndarray:
+    """Random hashes, with `near_fraction` of them replaced by copies of others with a few bits flipped."""
+    hashes = rng.integers(0, 2**64, size=n, dtype=np.uint64)
+    near = rng.choice(n, size=int(n * near_fraction), replace=False)
+    for i in near:
+        value = int(hashes[rng.integers(n)])
+        for b in rng.choice(64, size=rng.integers(1, max_flips + 1), replace=False):
+            value ^= 1 << int(b)
+        hashes[i] = value
+    return hashes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multi-index Hamming table.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--threshold", type=int, default=6, help="Hamming distance threshold.")
+    parser.add_argument("--queries", type=int, default=10_000, help="Queries per size for the index.")
+    parser.add_argument("--brute-queries", type=int, default=200, help="Queries per size for brute force.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"threshold={args.threshold}\n")
+    print(f"{'hashes':>10}{'build s':>10}{'index us/query':>16}{'brute us/query':>16}{'speedup':>10}")
+
+    for n in args.sizes:
+        hashes = synthetic_hashes(n, rng)
+        table = MultiIndexHashTable(args.threshold)
+        start = time.perf_counter()
+        for value in hashes.tolist():
+            table.add(value)
+        build = time.perf_counter() - start
+
+        # Half the queries are stored hashes with bits flipped, half are fresh random hashes
+        queries = rng.integers(0, 2**64, size=args.queries, dtype=np.uint64)
+        flips = rng.integers(0, 64, size=args.queries // 2)
+        queries[: args.queries // 2] = hashes[rng.integers(n, size=args.queries // 2)] ^ (
+            np.uint64(1) << flips.astype(np.uint64)
+        )
+        queries = queries.tolist()
+
+        start = time.perf_counter()
+        results = [table.query(q) for q in queries]
+        index_time = (time.perf_counter() - start) / len(queries)
+
+        sample = queries[: args.brute_queries]
+        start = time.perf_counter()
+        expected = [brute_force_query(table.hashes(), q, args.threshold) for q in sample]
+        brute_time = (time.perf_counter() - start) / len(sample)
+        assert expected == results[: len(sample)], "index and brute force disagree"
+
+        print(
+            f"{n:>10}{build:>10.2f}{index_time * 1e6:>16.1f}{brute_time * 1e6:>16.1f}{brute_time / index_time:>9.1f}x"
+        )
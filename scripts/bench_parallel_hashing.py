@@ -0,0 +1,60 @@
+# scripts/bench_parallel_hashing.py
+"""
+Reports perceptual-hashing throughput (images/sec) for each worker count, with
+and without reduced-size JPEG decoding, on large synthetic JPEGs.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_parallel_hashing.py --images 64 --size 6000x4000 --workers 1 2 4 8
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from curation.hashing import hash_images
+from PIL import Image
+
+
+def make_synthetic_jpegs(out_dir: Path, count: int, size: str) -> list[Path]:
+    """Writes `count` photo-sized JPEGs: smooth gradients with noise, so they compress like real photos."""
+    width, height = (int(v) for v in size.split("x"))
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths = []
+    for i in range(count):
+        fx, fy = rng.uniform(1, 8, size=2)
+        base = 127 + 100 * np.sin(x / width * fx * np.pi) * np.cos(y / height * fy * np.pi)
+        rgb = np.stack([base, np.roll(base, i * 50, axis=1), 255 - base], axis=-1)
+        rgb += rng.normal(0, 8, size=(1, width, 1)).astype(np.float32)
+        path = out_dir / f"photo_{i:04d}.jpg"
+        Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8)).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel perceptual hashing.")
+    parser.add_argument("--images", type=int, default=64, help="Number of synthetic JPEGs.")
+    parser.add_argument("--size", type=str, default="6000x4000", help="Synthetic image resolution.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=4, help="Images per work item.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {args.images} JPEGs at {args.size}...")
+        paths = make_synthetic_jpegs(Path(tmp), args.images, args.size)
+
+        print(f"\n{'workers':>8}{'full decode img/s':>20}{'draft decode img/s':>20}")
+        reference = None
+        for workers in args.workers:
+            rates = []
+            for draft in (False, True):
+                start = time.perf_counter()
+                hashes = hash_images(paths, workers=workers, chunk_size=args.chunk_size, draft=draft)["phash"]
+                rates.append(len(hashes) / (time.perf_counter() - start))
+                if draft:
+                    reference = reference or hashes
+                    assert hashes == reference, "hashes differ between worker counts"
+            print(f"{workers:>8}{rates[0]:>20.1f}{rates[1]:>20.1f}")
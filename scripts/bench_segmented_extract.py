@@ -0,0 +1,61 @@
+# scripts/bench_segmented_extract.py
+"""
+Compares wall-clock time of single-process vs. segmented video frame extraction
+on a synthetic video with a hard scene cut every few seconds.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_segmented_extract.py --duration 600 --segments 2 4 8
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import ffmpeg
+from ingestion.extract import extract_video_frames, extract_video_segmented
+
+
+def make_synthetic_video(path: Path, duration: int, size: str = "1280x720", cut_every: int = 5):
+    """Renders a test pattern whose hue jumps every `cut_every` seconds, producing hard scene cuts."""
+    (
+        ffmpeg.input(f"testsrc2=size={size}:rate=30:duration={duration}", f="lavfi")
+        .filter("hue", H=f"2*PI*floor(t/{cut_every})/7")
+        .output(str(path), vcodec="libx264", pix_fmt="yuv420p", g=60)
+        .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+    )
+
+
+def time_extraction(fn, out_dir: Path, *args) -> tuple[float, int]:
+    shutil.rmtree(out_dir, ignore_errors=True)
+    out_dir.mkdir(parents=True)
+    start = time.perf_counter()
+    frames = fn(*args)
+    return time.perf_counter() - start, len(frames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark segmented vs. single-process frame extraction.")
+    parser.add_argument("--duration", type=int, default=300, help="Length of the synthetic video in seconds.")
+    parser.add_argument("--segments", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--scene-threshold", type=float, default=0.4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        video = tmp_dir / "synthetic.mp4"
+        print(f"Rendering {args.duration}s synthetic video...")
+        make_synthetic_video(video, args.duration)
+
+        out_dir = tmp_dir / "frames"
+        baseline, n_frames = time_extraction(extract_video_frames, out_dir, video, out_dir, args.scene_threshold)
+        print(f"{'mode':<16}{'wall (s)':>10}{'frames':>8}{'speedup':>9}")
+        print(f"{'single':<16}{baseline:>10.2f}{n_frames:>8}{1.0:>9.2f}")
+
+        for n in args.segments:
+            elapsed, n_frames = time_extraction(
+                extract_video_segmented, out_dir, video, out_dir, args.scene_threshold, n
+            )
+            print(f"{f'segmented x{n}':<16}{elapsed:>10.2f}{n_frames:>8}{baseline / elapsed:>9.2f}")
@@ -0,0 +1,88 @@
+# scripts/bench_streaming_embedding.py
+"""
+Reports CLIP embedding throughput (images/sec) and peak RSS for the streaming
+embedder at several corpus sizes and worker counts. Each configuration runs
+in a fresh subprocess so peak RSS is measured per run; flat RSS across image
+counts means memory no longer scales with the corpus.
+
+--loader-only skips the model and measures decode/preprocess throughput, to
+check that the loader workers keep ahead of the encoder.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_streaming_embedding.py --images 500 2000 --workers 0 2 4
+    PYTHONPATH=src python scripts/bench_streaming_embedding.py --loader-only --images 500 2000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from curation.embedding import embed_to_memmap, iter_image_batches
+
+sys.path.insert(0, str(Path(__file__).parent))
+from bench_parallel_hashing import make_synthetic_jpegs  # noqa: E402
+
+
+def run_once(image_dir: Path, count: int, workers: int, batch_size: int, model_name: str, loader_only: bool) -> dict:
+    paths = sorted(image_dir.glob("*.jpg"))[:count]
+    start = time.perf_counter()
+    if loader_only:
+        for _ in iter_image_batches(paths, batch_size, workers):
+            pass
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, device="cpu")
+        start = time.perf_counter()  # model loading is not part of the throughput
+        with tempfile.TemporaryDirectory() as tmp:
+            embed_to_memmap(paths, model, Path(tmp) / "emb.npy", batch_size, workers)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; loader processes have exited by now, so RUSAGE_CHILDREN covers them
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    worker_peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {
+        "images": len(paths),
+        "workers": workers,
+        "rate": len(paths) / elapsed,
+        "peak_mb": peak_mb,
+        "worker_peak_mb": worker_peak_mb,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming CLIP embedding.")
+    parser.add_argument("--images", type=int, nargs="+", default=[500, 2000], help="Corpus sizes to embed.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4], help="Loader processes (0 = inline).")
+    parser.add_argument("--size", type=str, default="1920x1080", help="Synthetic frame resolution.")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model", type=str, default="clip-ViT-B-32", help="SentenceTransformer CLIP model.")
+    parser.add_argument("--loader-only", action="store_true", help="Measure decoding only, without the model.")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        image_dir, count, workers = args.child.split(",")
+        result = run_once(Path(image_dir), int(count), int(workers), args.batch_size, args.model, args.loader_only)
+        print(json.dumps(result))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Writing {max(args.images)} JPEGs at {args.size}...")
+        make_synthetic_jpegs(Path(tmp), max(args.images), args.size)
+
+        print(f"\n{'images':>8}{'workers':>9}{'img/s':>9}{'peak RSS MB':>13}{'worker RSS MB':>15}")
+        for count in args.images:
+            for workers in args.workers:
+                command = [sys.executable, __file__, "--child", f"{tmp},{count},{workers}"]
+                command += ["--batch-size", str(args.batch_size), "--model", args.model]
+                command += ["--loader-only"] if args.loader_only else []
+                output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{r['images']:>8}{r['workers']:>9}{r['rate']:>9.1f}{r['peak_mb']:>13.0f}{r['worker_peak_mb']:>15.0f}"
+                )
@@ -10,6 +10,9 @@ OUTPUT_DIR="./tmp_test_output" # Use a temporary output directory
 LR=$(grep 'learning_rate:' $CONFIG_FILE | awk '{print $2}')
 LORA_RANK=$(grep 'lora_rank:' $CONFIG_FILE | awk '{print $2}')
 
+# The training script reads ingestion's sidecars through the ingestion package
+export PYTHONPATH=$PYTHONPATH:$(pwd)/src
+
 # --- LAUNCH THE SMOKE TEST ---
 echo "🚀 Starting CPU smoke test for 2 steps..."
 
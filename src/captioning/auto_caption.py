@@ -1,11 +1,16 @@
 # src/captioning/auto_caption.py
 import argparse
+import tempfile
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import torch
-from PIL import Image
+from curation.embedding import embed_to_memmap, open_embedding_store
+from curation.hash_cache import HashCache
 from sentence_transformers import SentenceTransformer, util
+from shared.embedding_store import DEFAULT_STORE_DIR
+from shared.image_files import list_images, open_image
 from shared.ontology import load_ontology
 from tqdm import tqdm
 from transformers import BlipForConditionalGeneration, BlipProcessor
@@ -16,9 +21,15 @@ def auto_caption_dataset(
     ontology_path: Path,
     clip_model_name: str = "clip-ViT-L-14",
     desc_model_name: str = "Salesforce/blip-image-captioning-base",
+    store_dir: Optional[Path] = None,
+    hash_cache_path: Optional[Path] = None,
 ):
     """
     Generates structured captions for all images in a directory.
+
+    CLIP image embeddings are computed up front in streamed batches; with a
+    `store_dir` they are shared with the curation stages, so images curation
+    already embedded never go through CLIP again.
     """
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Using device: {device}")
@@ -42,15 +53,32 @@ def auto_caption_dataset(
     # 2. Pre-compute embeddings for all ontology tokens
     token_embeddings = {token: clip_model.encode(token.replace("_", " ")) for token in ontology.get_all_tokens()}
 
-    image_paths = list(image_dir.glob("*.[jp][pn]g"))
+    image_paths = list_images(image_dir)
+    store = open_embedding_store(store_dir, clip_model_name, clip_model) if store_dir else None
+    hash_cache = HashCache(hash_cache_path) if hash_cache_path else None
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            image_embeddings = embed_to_memmap(
+                image_paths,
+                clip_model,
+                Path(tmp) / "embeddings.npy",
+                normalize=False,
+                store=store,
+                hash_cache=hash_cache,
+            )
+        finally:
+            if hash_cache is not None:
+                hash_cache.close()
+        # float16 on disk; cos_sim needs the same dtype as the token embeddings
+        image_embeddings = np.asarray(image_embeddings, dtype=np.float32)
+
     print(f"✍️  Generating captions for {len(image_paths)} images...")
 
-    for image_path in tqdm(image_paths):
+    for image_path, image_embedding in zip(tqdm(image_paths), image_embeddings):
         try:
-            image = Image.open(image_path).convert("RGB")
+            image = open_image(image_path).convert("RGB")
 
             # 3. Find the best style tokens using CLIP similarity
-            image_embedding = clip_model.encode(image)
 
             best_tokens = []
             for bucket_name, bucket_obj in ontology.buckets.items():
@@ -88,6 +116,20 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate structured captions for an image dataset.")
     parser.add_argument("image_directory", type=str, help="Directory of images to caption.")
     parser.add_argument("--ontology", type=str, default="configs/ontology.json", help="Path to the ontology JSON file.")
+    parser.add_argument(
+        "--embedding-store",
+        type=str,
+        default=DEFAULT_STORE_DIR,
+        help="Persistent CLIP embedding store shared with curation. Pass an empty string to disable it.",
+    )
+    parser.add_argument(
+        "--hash-cache", type=str, default="data/hash_cache.sqlite", help="Content-key cache (empty to disable)."
+    )
     args = parser.parse_args()
 
-    auto_caption_dataset(Path(args.image_directory), Path(args.ontology))
+    auto_caption_dataset(
+        Path(args.image_directory),
+        Path(args.ontology),
+        store_dir=Path(args.embedding_store) if args.embedding_store else None,
+        hash_cache_path=Path(args.hash_cache) if args.hash_cache else None,
+    )
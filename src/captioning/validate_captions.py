@@ -3,6 +3,7 @@ import argparse
 import re
 from pathlib import Path
 
+from shared.image_files import list_images
 from shared.ontology import load_ontology, ontology
 
 
@@ -10,7 +11,7 @@ def validate_dataset(dataset_dir: Path, ontology: "ontology"):
     """
     Validates the format and content of caption files in a dataset directory.
     """
-    image_paths = list(dataset_dir.glob("*.[jp][pn]g"))
+    image_paths = list_images(dataset_dir)
     valid_ontology_tokens = ontology.get_all_tokens()
 
     errors = []
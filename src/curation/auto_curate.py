@@ -1,26 +1,55 @@
 # src/curation/auto_curate.py
 import argparse
 import shutil
+import tempfile
 from pathlib import Path
+from typing import Optional
 
 import hdbscan
 import numpy as np
-from PIL import Image
+from curation.clustering import knn_graph_clusters, oversized_clusters, readable_rows
+from curation.embedding import embed_to_memmap, open_embedding_store
+from curation.hash_cache import HashCache
 from sentence_transformers import SentenceTransformer
-from tqdm import tqdm
+from shared.embedding_store import DEFAULT_STORE_DIR
+from shared.image_files import list_images
 
 
 def auto_curate_by_novelty(
-    image_dir: Path, model_name: str = "clip-ViT-L-14", max_cluster_size: int = 10, min_cluster_size: int = 2
+    image_dir: Path,
+    model_name: str = "clip-ViT-L-14",
+    max_cluster_size: int = 10,
+    min_cluster_size: int = 2,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
+    store_dir: Optional[Path] = None,
+    hash_cache_path: Optional[Path] = None,
+    cluster_mode: str = "hdbscan",
+    pca_dim: int = 64,
+    knn: int = 15,
+    knn_min_similarity: float = 0.85,
 ):
     """
     Automatically curates images by embedding them, clustering the embeddings,
     and keeping outliers and images from small, sparse clusters.
+
+    Images are decoded in bounded batches on `workers` processes and their
+    embeddings written to a preallocated float16 memmap (see
+    embedding.embed_to_memmap), so embedding memory stays flat in the number
+    of images. With a `store_dir`, only images not embedded by an earlier run
+    (of this or any other stage) go through the model.
+
+    cluster_mode="knn-graph" replaces HDBSCAN with clustering.knn_graph_clusters
+    (PCA to `pca_dim`, a `knn`-nearest-neighbor graph, components over edges
+    with cosine similarity >= `knn_min_similarity`), which runs on the memmap
+    directly and scales to hundreds of thousands of images.
     """
+    if cluster_mode not in ("hdbscan", "knn-graph"):
+        raise ValueError(f"Unknown cluster_mode {cluster_mode!r}")
     rejected_dir = image_dir / "rejected"
     rejected_dir.mkdir(exist_ok=True)
 
-    image_paths = list(image_dir.glob("*.[jp][pn]g"))
+    image_paths = list_images(image_dir)
     if len(image_paths) < min_cluster_size:
         print(f"Not enough images ({len(image_paths)}) to cluster. Skipping.")
         return
@@ -30,37 +59,53 @@ def auto_curate_by_novelty(
     model = SentenceTransformer(model_name)
 
     print(f"Embedding {len(image_paths)} images...")
-    embeddings = model.encode(
-        [Image.open(p) for p in tqdm(image_paths)], batch_size=32, convert_to_numpy=True, show_progress_bar=True
-    )
-
-    # 2. Cluster the embeddings
-    print("Clustering embeddings with HDBSCAN...")
-    clusterer = hdbscan.HDBSCAN(
-        min_cluster_size=min_cluster_size, metric="euclidean", cluster_selection_method="eom"
-    ).fit(embeddings)
-
-    labels = clusterer.labels_
+    store = open_embedding_store(store_dir, model_name, model) if store_dir else None
+    hash_cache = HashCache(hash_cache_path) if hash_cache_path else None
+    with tempfile.TemporaryDirectory() as tmp:
+        # Unnormalized, like model.encode returns them: HDBSCAN clusters on euclidean distance
+        try:
+            embeddings = embed_to_memmap(
+                image_paths,
+                model,
+                Path(tmp) / "embeddings.npy",
+                batch_size,
+                workers,
+                normalize=False,
+                store=store,
+                hash_cache=hash_cache,
+            )
+        finally:
+            if hash_cache is not None:
+                hash_cache.close()
+
+        # 2. Cluster the embeddings (images that could not be read keep an all-zero row and are left out)
+        readable = readable_rows(embeddings)
+        labels = np.full(len(image_paths), -1)
+        if cluster_mode == "knn-graph":
+            print(f"Clustering embeddings on a {knn}-NN graph (PCA to {pca_dim} dims)...")
+            labels[readable] = knn_graph_clusters(
+                embeddings, readable, pca_dim, knn, knn_min_similarity, min_cluster_size
+            )
+        else:
+            print("Clustering embeddings with HDBSCAN...")
+            vectors = np.asarray(embeddings[readable], dtype=np.float32)
+            clusterer = hdbscan.HDBSCAN(
+                min_cluster_size=min_cluster_size, metric="euclidean", cluster_selection_method="eom"
+            ).fit(vectors)
+            labels[readable] = clusterer.labels_
+        del embeddings
 
     # 3. Filter based on cluster labels and sizes
     print("Filtering images based on cluster novelty...")
+    dense_labels, dense_sizes, rejected_rows = oversized_clusters(labels, max_cluster_size)
+    # A cluster larger than max_cluster_size is a "cliché": reject all its members. Outliers are always kept.
+    for label, size in zip(dense_labels.tolist(), dense_sizes.tolist()):
+        print(f"  -> Rejecting large cluster {label} with {size} members.")
     rejected_count = 0
-    unique_labels = set(labels)
-
-    for label in unique_labels:
-        if label == -1:  # -1 indicates an outlier
-            continue  # Always keep outliers
-
-        # Find images belonging to the current cluster
-        cluster_indices = np.where(labels == label)[0]
-
-        # If a cluster is too large, it's a "cliché" - reject all its members
-        if len(cluster_indices) > max_cluster_size:
-            print(f"  -> Rejecting large cluster {label} with {len(cluster_indices)} members.")
-            for i in cluster_indices:
-                image_path = image_paths[i]
-                shutil.move(image_path, rejected_dir / image_path.name)
-                rejected_count += 1
+    for i in rejected_rows:
+        image_path = image_paths[i]
+        shutil.move(image_path, rejected_dir / image_path.name)
+        rejected_count += 1
 
     print(f"✅ Auto-curation complete. Rejected {rejected_count} images from dense clusters.")
 
@@ -68,10 +113,42 @@ def auto_curate_by_novelty(
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Curate images by keeping outliers and sparse clusters.")
     parser.add_argument("image_directory", type=str, help="Directory of images to curate.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per encoder batch.")
+    parser.add_argument("--workers", type=int, default=None, help="Image decoding processes (default: one per core).")
+    parser.add_argument(
+        "--embedding-store",
+        type=str,
+        default=DEFAULT_STORE_DIR,
+        help="Persistent embedding store shared with captioning. Pass an empty string to disable it.",
+    )
+    parser.add_argument(
+        "--hash-cache", type=str, default="data/hash_cache.sqlite", help="Content-key cache (empty to disable)."
+    )
+    parser.add_argument(
+        "--cluster-mode",
+        choices=["hdbscan", "knn-graph"],
+        default="hdbscan",
+        help="knn-graph scales to hundreds of thousands of images; hdbscan is exact but super-linear.",
+    )
+    parser.add_argument("--pca-dim", type=int, default=64, help="knn-graph: dimensions kept by PCA.")
+    parser.add_argument("--knn", type=int, default=15, help="knn-graph: neighbors per image.")
+    parser.add_argument(
+        "--knn-min-similarity", type=float, default=0.85, help="knn-graph: cosine similarity that links two images."
+    )
     args = parser.parse_args()
 
     target_dir = Path(args.image_directory)
     if not target_dir.is_dir():
         print(f"Error: Directory not found at {target_dir}")
     else:
-        auto_curate_by_novelty(target_dir)
+        auto_curate_by_novelty(
+            target_dir,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            store_dir=Path(args.embedding_store) if args.embedding_store else None,
+            hash_cache_path=Path(args.hash_cache) if args.hash_cache else None,
+            cluster_mode=args.cluster_mode,
+            pca_dim=args.pca_dim,
+            knn=args.knn,
+            knn_min_similarity=args.knn_min_similarity,
+        )
@@ -0,0 +1,184 @@
+# src/curation/clustering.py
+from typing import Optional
+
+import numpy as np
+from curation.similarity import normalize_rows
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Rows read from a (memory-mapped) embedding matrix at a time
+READ_BLOCK = 65536
+# Rows gathered at a time when re-scoring candidate neighbors on the original vectors
+GATHER_BLOCK = 8192
+# Upper bound on the query-by-corpus similarity tile in the NumPy k-NN fallback, in elements.
+# argpartition returns an int64 index per element, so a tile costs 12 bytes per element at peak.
+KNN_TILE_ELEMENTS = 1 << 23
+
+
+def readable_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Indices of rows that are not all zero (embed_to_memmap leaves unreadable images as zero rows)."""
+    keep = [
+        start + np.flatnonzero(np.any(embeddings[start : start + READ_BLOCK] != 0, axis=1))
+        for start in range(0, len(embeddings), READ_BLOCK)
+    ]
+    return np.concatenate(keep) if keep else np.empty(0, dtype=np.int64)
+
+
+def pca_reduce(
+    embeddings: np.ndarray, rows: np.ndarray, dim: int = 64, fit_sample: int = 20000, seed: int = 0
+) -> np.ndarray:
+    """
+    Projects unit-normalized `embeddings[rows]` onto their top `dim`
+    principal directions and renormalizes, returning float32 (len(rows), dim).
+
+    The directions are the top eigenvectors of the (dim x dim) Gram matrix
+    of a random sample of at most `fit_sample` rows, accumulated block by
+    block, and the data is projected READ_BLOCK rows at a time, so neither a
+    float16 memmap nor a float32 copy of the sample is ever held whole. The projection is uncentered
+    (a truncated SVD): CLIP embeddings share a large mean direction, and
+    keeping it means inner products in the reduced space still approximate
+    the original cosine similarities.
+    """
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(rows, size=min(fit_sample, len(rows)), replace=False))
+    gram = np.zeros((embeddings.shape[1], embeddings.shape[1]), dtype=np.float64)
+    for start in range(0, len(sample), GATHER_BLOCK):
+        block = normalize_rows(embeddings[sample[start : start + GATHER_BLOCK]])
+        gram += block.T @ block
+    # eigh sorts eigenvalues ascending
+    _, eigenvectors = np.linalg.eigh(gram)
+    components = eigenvectors[:, ::-1][:, :dim].astype(np.float32)
+
+    reduced = np.empty((len(rows), components.shape[1]), dtype=np.float32)
+    for start in range(0, len(rows), READ_BLOCK):
+        block = normalize_rows(embeddings[rows[start : start + READ_BLOCK]])
+        reduced[start : start + READ_BLOCK] = block @ components
+    return normalize_rows(reduced)
+
+
+def knn_graph(vectors: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (neighbors, similarities), both (n, k), for unit-length float32
+    rows, nearest first and excluding each point itself.
+
+    Uses a faiss HNSW index (approximate) when faiss is installed. Otherwise
+    an exact blocked search: each block of queries is multiplied against all
+    points, with blocks sized so a tile stays under KNN_TILE_ELEMENTS, and
+    the top k are picked with argpartition.
+    """
+    n = len(vectors)
+    k = min(k, n - 1)
+    if faiss is not None:
+        index = faiss.IndexHNSWFlat(vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = max(64, 2 * k)
+        index.add(vectors)
+        similarities, neighbors = index.search(vectors, k + 1)
+        # Drop each point's own hit (usually first, but not guaranteed for an approximate index)
+        own = neighbors == np.arange(n)[:, None]
+        own[~own.any(axis=1), -1] = True
+        keep = ~own
+        return neighbors[keep].reshape(n, k), similarities[keep].reshape(n, k)
+
+    neighbors = np.empty((n, k), dtype=np.int64)
+    similarities = np.empty((n, k), dtype=np.float32)
+    block_size = max(1, KNN_TILE_ELEMENTS // n)
+    for start in range(0, n, block_size):
+        sims = vectors[start : start + block_size] @ vectors.T
+        rows = np.arange(len(sims))
+        sims[rows, start + rows] = -np.inf
+        top = np.argpartition(sims, -k, axis=1)[:, -k:]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        neighbors[start : start + block_size] = np.take_along_axis(top, order, axis=1)
+        similarities[start : start + block_size] = np.take_along_axis(top_sims, order, axis=1)
+    return neighbors, similarities
+
+
+def exact_similarities(embeddings: np.ndarray, rows: np.ndarray, neighbors: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarities between each `embeddings[rows[i]]` and its candidate
+    neighbors `embeddings[rows[neighbors[i]]]`, computed on the original
+    vectors. Renormalizing after PCA inflates similarities (the discarded
+    dimensions are exactly where near-but-distinct images differ), so the
+    reduced space is only trusted to propose candidates, not to score them.
+    """
+    n, k = neighbors.shape
+    similarities = np.empty((n, k), dtype=np.float32)
+    block_size = max(1, GATHER_BLOCK // (k + 1))
+    for start in range(0, n, block_size):
+        block = neighbors[start : start + block_size]
+        queries = normalize_rows(embeddings[rows[start : start + block_size]])
+        candidates = normalize_rows(embeddings[rows[block.ravel()]]).reshape(len(block), k, -1)
+        similarities[start : start + block_size] = np.einsum("nd,nkd->nk", queries, candidates)
+    return similarities
+
+
+def knn_graph_clusters(
+    embeddings: np.ndarray,
+    rows: Optional[np.ndarray] = None,
+    pca_dim: int = 64,
+    k: int = 15,
+    min_similarity: float = 0.85,
+    min_cluster_size: int = 2,
+) -> np.ndarray:
+    """
+    Clusters embeddings in roughly O(n k) memory instead of HDBSCAN's
+    super-linear cost on raw 768-d vectors: PCA to `pca_dim`, a k-NN graph,
+    then connected components over mutual k-NN edges whose cosine similarity
+    in the original space is at least `min_similarity` (the same scale as
+    semantic_dedup's threshold). Requiring both points to list each other
+    keeps a hub from chaining unrelated groups into one component.
+
+    Returns one label per row of `embeddings` (or of `rows`, when given),
+    HDBSCAN-style: -1 for outliers and components smaller than
+    `min_cluster_size`, and 0, 1, ... for clusters.
+    """
+    rows = np.arange(len(embeddings)) if rows is None else rows
+    if len(rows) < 2:
+        return np.full(len(rows), -1)
+    vectors = pca_reduce(embeddings, rows, pca_dim) if pca_dim < embeddings.shape[1] else None
+    if vectors is None:
+        vectors = np.concatenate(
+            [normalize_rows(embeddings[rows[s : s + READ_BLOCK]]) for s in range(0, len(rows), READ_BLOCK)]
+        )
+    neighbors, similarities = knn_graph(vectors, k)
+    found = neighbors >= 0  # faiss pads missing neighbors with -1
+    if vectors.shape[1] < embeddings.shape[1]:
+        neighbors = np.where(found, neighbors, np.arange(len(rows))[:, None])
+        similarities = exact_similarities(embeddings, rows, neighbors)
+
+    n = len(rows)
+    strong = (similarities >= min_similarity) & found
+    sources = np.repeat(np.arange(n), neighbors.shape[1])[strong.ravel()]
+    targets = neighbors[strong]
+    graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n)).tocsr()
+    mutual = graph.multiply(graph.T)
+    _, components = connected_components(mutual, directed=False)
+
+    sizes = np.bincount(components)
+    clustered = sizes[components] >= max(min_cluster_size, 2)
+    labels = np.full(n, -1)
+    # Renumber the surviving components 0, 1, ...
+    _, labels[clustered] = np.unique(components[clustered], return_inverse=True)
+    return labels
+
+
+def oversized_clusters(labels: np.ndarray, max_cluster_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (labels, sizes, rows) for the clusters with more than
+    `max_cluster_size` members, and every row in them in ascending order.
+    Outliers (-1) belong to no cluster. One bincount over the labels, so the
+    cost stays linear however many clusters there are.
+    """
+    labels = np.asarray(labels)
+    clustered = labels >= 0
+    sizes = np.bincount(labels[clustered], minlength=1)
+    oversized = sizes > max_cluster_size
+    rows = np.flatnonzero(clustered & oversized[np.where(clustered, labels, 0)])
+    dense = np.flatnonzero(oversized)
+    return dense, sizes[dense], rows
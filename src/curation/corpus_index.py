@@ -0,0 +1,216 @@
+# src/curation/corpus_index.py
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+from curation.hash_index import chunk_ranges, flip_masks, popcount64
+from curation.hashing import hash_images
+from shared.image_files import list_images
+
+DEFAULT_INDEX_DIR = "data/approved_index"
+HASHES_FILE = "hashes.u64"
+NAMES_FILE = "names.txt"
+META_FILE = "meta.json"
+
+
+@lru_cache(maxsize=None)
+def _probe_masks(width: int, radius: int) -> np.ndarray:
+    return np.array(flip_masks(width, radius), dtype=np.uint64)
+
+
+def _fsync_dir(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CorpusIndex:
+    """
+    A long-lived phash index of the approved corpus, for deduplicating new
+    candidates against everything approved in earlier runs.
+
+    On disk it is an append-only array of uint64 hashes (plus one name per
+    line), and a "generation" directory holding, for each 16-bit chunk of the
+    hash, the chunk values sorted alongside their ids. All of it is memory-mapped
+    on open. A query with threshold t probes each chunk's sorted array with
+    binary search for every chunk value within t // chunks bits (the same
+    pigeonhole argument as MultiIndexHashTable), so lookups cost O(log n) per
+    probe instead of a scan of the corpus.
+
+    Hashes added since the last compaction form a small in-memory tail that is
+    scanned directly; once it exceeds `max_tail`, `compact` rebuilds the sorted
+    arrays into a new generation and swaps it in atomically via meta.json.
+    """
+
+    def __init__(self, index_dir: Path, chunks: int = 4, max_tail: int = 65536):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_tail = max_tail
+        self._default_chunks = chunks
+        self._open()
+
+    def _open(self):
+        meta_path = self.index_dir / META_FILE
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        self.chunks = meta.get("chunks", self._default_chunks)
+        self._ranges = chunk_ranges(64, self.chunks)
+        self._sorted_count = meta.get("sorted_count", 0)
+        self._generation = meta.get("generation")
+
+        self._names = self._load_names()
+        hashes_path = self.index_dir / HASHES_FILE
+        stored_bytes = hashes_path.stat().st_size if hashes_path.exists() else 0
+        # A crash mid-append can leave a torn hash, or one file longer than the other; the shorter one wins
+        self._count = min(stored_bytes // 8, len(self._names))
+        if stored_bytes > self._count * 8:
+            os.truncate(hashes_path, self._count * 8)
+        if len(self._names) > self._count:
+            del self._names[self._count :]
+            (self.index_dir / NAMES_FILE).write_text("".join(f"{name}\n" for name in self._names))
+
+        self._hashes = (
+            np.memmap(hashes_path, dtype="<u8", mode="r", shape=(self._count,)) if self._count else np.empty(0, "<u8")
+        )
+        self._tail = np.array(self._hashes[self._sorted_count :], dtype=np.uint64)
+        self._keys, self._ids = [], []
+        if self._generation is not None:
+            gen_dir = self.index_dir / self._generation
+            for i in range(self.chunks):
+                self._keys.append(np.load(gen_dir / f"chunk{i}.keys.npy", mmap_mode="r"))
+                self._ids.append(np.load(gen_dir / f"chunk{i}.ids.npy", mmap_mode="r"))
+
+    def _load_names(self) -> list[str]:
+        path = self.index_dir / NAMES_FILE
+        if not path.exists():
+            return []
+        with open(path, "r") as f:
+            names = f.read().split("\n")
+        # The last element is "" after a complete final line, or a torn name after a crash
+        return names[:-1]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    def add(self, values: Sequence[int], names: Sequence[str]):
+        """Appends approved hashes durably. Compacts when the unsorted tail grows past `max_tail`."""
+        if len(values) != len(names):
+            raise ValueError("values and names must have the same length")
+        if not values:
+            return
+        with open(self.index_dir / NAMES_FILE, "a") as f:
+            f.write("".join(f"{name}\n" for name in names))
+            f.flush()
+            os.fsync(f.fileno())
+        array = np.array(values, dtype="<u8")
+        with open(self.index_dir / HASHES_FILE, "ab") as f:
+            f.write(array.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._names.extend(names)
+        self._count += len(values)
+        self._tail = np.concatenate([self._tail, array.astype(np.uint64)])
+        if len(self._tail) > self.max_tail:
+            self.compact()
+
+    def compact(self):
+        """Rebuilds the sorted per-chunk arrays over every stored hash and empties the tail."""
+        if self._generation is not None and self._sorted_count == self._count:
+            return
+        hashes = np.memmap(self.index_dir / HASHES_FILE, dtype="<u8", mode="r", shape=(self._count,))
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        # A fresh directory per rebuild, so a crash mid-rebuild can never touch the generation meta.json points at
+        gen_dir = Path(tempfile.mkdtemp(prefix=f"gen-{self._count}-", dir=self.index_dir))
+        generation = gen_dir.name
+        for i, (shift, width) in enumerate(self._ranges):
+            keys = (hashes >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+            order = np.argsort(keys, kind="stable")
+            key_dtype = np.uint16 if width <= 16 else np.uint32 if width <= 32 else np.uint64
+            np.save(gen_dir / f"chunk{i}.keys.npy", keys[order].astype(key_dtype))
+            np.save(gen_dir / f"chunk{i}.ids.npy", order.astype(np.uint32))
+        _fsync_dir(gen_dir)
+
+        meta = {"chunks": self.chunks, "sorted_count": self._count, "generation": generation}
+        tmp_path = self.index_dir / (META_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.index_dir / META_FILE)
+        _fsync_dir(self.index_dir)
+
+        old_generation = self._generation
+        self._open()
+        if old_generation is not None and old_generation != generation:
+            shutil.rmtree(self.index_dir / old_generation, ignore_errors=True)
+
+    def query(self, value: int, threshold: int) -> list[tuple[str, int]]:
+        """Returns (name, distance) for every approved image within `threshold` bits, nearest first."""
+        matches = {}
+        if self._sorted_count:
+            radius = threshold // self.chunks
+            candidates = []
+            for keys, ids, (shift, width) in zip(self._keys, self._ids, self._ranges):
+                # Probes must share the keys' dtype, or searchsorted copies the whole memmap to convert it
+                probes = (np.uint64((value >> shift) & ((1 << width) - 1)) ^ _probe_masks(width, radius)).astype(
+                    keys.dtype
+                )
+                lo = np.searchsorted(keys, probes, side="left")
+                hi = np.searchsorted(keys, probes, side="right")
+                candidates.extend(ids[a:b] for a, b in zip(lo, hi) if b > a)
+            if candidates:
+                ids = np.unique(np.concatenate(candidates))
+                distances = popcount64(np.asarray(self._hashes[ids]) ^ np.uint64(value))
+                keep = distances <= threshold
+                matches.update(zip(ids[keep].tolist(), distances[keep].tolist()))
+        if len(self._tail):
+            distances = popcount64(self._tail ^ np.uint64(value))
+            for offset in np.flatnonzero(distances <= threshold).tolist():
+                matches[self._sorted_count + offset] = int(distances[offset])
+        return [(self._names[i], d) for i, d in sorted(matches.items(), key=lambda pair: (pair[1], pair[0]))]
+
+    def summary(self) -> dict:
+        return {"hashes": self._count, "sorted": self._sorted_count, "tail": len(self._tail)}
+
+    def nearest(self, value: int, threshold: int) -> Optional[tuple[str, int]]:
+        matches = self.query(value, threshold)
+        return matches[0] if matches else None
+
+
+def register_approved(index: CorpusIndex, image_dir: Path, workers: Optional[int] = None) -> int:
+    """Adds every image in `image_dir` that is not indexed yet. Returns the number added."""
+    known = set(index.names())
+    new_paths = sorted(p for p in list_images(image_dir) if str(p) not in known)
+    if not new_paths:
+        return 0
+    hashes = hash_images(new_paths, workers=workers)["phash"]
+    added = [p for p in new_paths if p in hashes]
+    index.add([hashes[p] for p in added], [str(p) for p in added])
+    return len(added)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the global phash index of the approved corpus.")
+    parser.add_argument("command", choices=["add", "compact", "stats"])
+    parser.add_argument("image_directory", nargs="?", default="data/approved", help="Approved images to index (add).")
+    parser.add_argument("--index", type=str, default=DEFAULT_INDEX_DIR, help="Index directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: one per CPU core).")
+    args = parser.parse_args()
+
+    corpus = CorpusIndex(Path(args.index))
+    if args.command == "add":
+        added = register_approved(corpus, Path(args.image_directory), args.workers)
+        print(f"Indexed {added} newly approved images ({len(corpus)} total).")
+    elif args.command == "compact":
+        corpus.compact()
+        print(f"Compacted {len(corpus)} hashes.")
+    else:
+        print(corpus.summary())
@@ -1,18 +1,86 @@
 # src/curation/dedup.py
 import argparse
+import json
+import shutil
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional, Sequence
 
-import imagehash
-from PIL import Image
+from curation.corpus_index import CorpusIndex
+from curation.duplicate_groups import find_duplicate_groups, pick_representative, representative_score
+from curation.hash_cache import HashCache
+from curation.hashing import HASH_KINDS, hash_images
+from shared.image_files import list_images
 
+DUPLICATES_DIRNAME = "duplicates"
+REPORT_NAME = "dedup_report.json"
 
-def find_and_remove_duplicates(image_dir: Path):
+
+def _free_path(path: Path) -> Path:
+    """`path`, or the first of name_1.ext, name_2.ext, ... that does not exist yet."""
+    candidate, n = path, 0
+    while candidate.exists():
+        n += 1
+        candidate = path.with_name(f"{path.stem}_{n}{path.suffix}")
+    return candidate
+
+
+def quarantine(image_path: Path, duplicates_dir: Path) -> Path:
+    """
+    Moves an image into `duplicates_dir` and returns its new path. A file
+    quarantined earlier under the same name (e.g. by a previous hot-folder
+    batch) is kept; the newcomer gets a numbered name instead.
+    """
+    duplicates_dir.mkdir(exist_ok=True)
+    target = _free_path(duplicates_dir / image_path.name)
+    shutil.move(image_path, target)
+    return target
+
+
+def write_report(duplicates_dir: Path, report_name: str, report: dict) -> Path:
+    """Writes one report per run, stamped with the run's UTC time, so runs never overwrite each other's reports."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = _free_path(duplicates_dir / f"{Path(report_name).stem}-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def find_and_remove_duplicates(
+    image_dir: Path,
+    threshold: int = 0,
+    workers: Optional[int] = None,
+    cache_path: Optional[Path] = None,
+    hash_kinds: Sequence[str] = ("phash",),
+    corpus_index_dir: Optional[Path] = None,
+):
     """
-    Finds and removes duplicate images in a directory based on
-    their perceptual hash.
+    Finds duplicate images in a directory based on their perceptual hash
+    and moves all but one of each group to a 'duplicates' subdirectory.
+
+    With a `threshold` above 0, near-duplicates (adjacent video frames,
+    re-encodes) whose 64-bit phash differs in at most that many bits count
+    as well. Duplicates are grouped into connected components and the member
+    with the highest resolution (then the largest file) is kept. A JSON report
+    of every group is written to a timestamped duplicates/dedup_report-*.json
+    and returned; quarantined files that clash with earlier ones are renamed
+    (see quarantine) and the report records both names.
+
+    Hashes are computed on a process pool of `workers` (default: one per
+    CPU core) with reduced-size JPEG decoding. With a `cache_path`, hashes of
+    files unchanged since the last run are read from a persistent SQLite cache
+    and entries for files that no longer exist are pruned.
+
+    `hash_kinds` lists the hash families to compare (see hashing.HASH_KINDS),
+    all computed from one decode. The first is indexed; a match only counts as
+    a duplicate if every family is within `threshold`, which trades a little
+    recall for far fewer false positives on similar-but-different frames.
+
+    With a `corpus_index_dir` (see corpus_index.CorpusIndex), every image that
+    survives in-directory dedup is also looked up in the global index of the
+    approved corpus by phash, and quarantined if it was already approved.
     """
-    hashes = set()
-    image_files = list(image_dir.glob("*.[jp][pn]g"))  # handles jpg, jpeg, png
+    image_files = list_images(image_dir)  # handles jpg, jpeg, png, webp, npy
 
     if not image_files:
         print(f"No images found in {image_dir}.")
@@ -20,34 +88,132 @@ def find_and_remove_duplicates(image_dir: Path):
 
     print(f"Scanning {len(image_files)} images for duplicates...")
 
+    cache = HashCache(cache_path) if cache_path else None
+    try:
+        if cache is not None:
+            pruned = cache.prune(image_dir, image_files)
+            if pruned:
+                print(f"Pruned {pruned} stale hash cache entries.")
+        kinds = tuple(hash_kinds) + (("phash",) if corpus_index_dir and "phash" not in hash_kinds else ())
+        image_hashes = hash_images(image_files, workers=workers, cache=cache, kinds=kinds)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    groups = find_duplicate_groups(image_files, image_hashes, hash_kinds, threshold)
+
+    duplicates_dir = image_dir / DUPLICATES_DIRNAME
+    report_groups = []
     duplicates_found = 0
-    for image_path in image_files:
+    for group in groups:
         try:
-            # Open the image and compute its phash
-            img_hash = imagehash.phash(Image.open(image_path))
+            scores = {p: representative_score(p) for p in group}
+        except Exception as e:
+            print(f"Could not score duplicate group of {group[0].name}: {e}")
+            continue
+        keep = pick_representative(scores)
 
-            if img_hash in hashes:
-                # This is a duplicate, remove it
+        quarantined, quarantined_as = [], []
+        for image_path in sorted(group):
+            if image_path == keep:
+                continue
+            try:
+                quarantined_as.append(quarantine(image_path, duplicates_dir).name)
+                quarantined.append(image_path)
                 duplicates_found += 1
-                image_path.unlink()
-            else:
-                # This is a unique image, add its hash to the set
-                hashes.add(img_hash)
+            except Exception as e:
+                print(f"Could not quarantine {image_path.name}: {e}")
 
-        except Exception as e:
-            print(f"Could not process {image_path.name}: {e}")
+        report_groups.append(
+            {
+                "kept": keep.name,
+                "quarantined": [p.name for p in quarantined],
+                "quarantined_as": quarantined_as,
+                "members": [{"file": p.name, "pixels": scores[p][0], "bytes": scores[p][1]} for p in sorted(group)],
+            }
+        )
+
+    corpus_matches = []
+    if corpus_index_dir:
+        corpus = CorpusIndex(corpus_index_dir)
+        quarantined_paths = {Path(image_dir) / name for group in report_groups for name in group["quarantined"]}
+        for image_path in sorted(image_files):
+            img_hash = image_hashes["phash"].get(image_path)
+            if image_path in quarantined_paths or img_hash is None:
+                continue
+            match = corpus.nearest(img_hash, threshold)
+            if match is None:
+                continue
+            try:
+                target = quarantine(image_path, duplicates_dir)
+                duplicates_found += 1
+                corpus_matches.append(
+                    {"file": image_path.name, "quarantined_as": target.name, "approved": match[0], "distance": match[1]}
+                )
+            except Exception as e:
+                print(f"Could not quarantine {image_path.name}: {e}")
+        print(f"Checked against {len(corpus)} approved images: {len(corpus_matches)} already approved.")
+
+    report = {
+        "image_dir": str(image_dir),
+        "threshold": threshold,
+        "hash_kinds": list(hash_kinds),
+        "images": len(image_files),
+        "quarantined": duplicates_found,
+        "groups": report_groups,
+        "corpus_matches": corpus_matches,
+    }
+    if report_groups or corpus_matches:
+        write_report(duplicates_dir, REPORT_NAME, report)
 
-    print(f"Scan complete. Removed {duplicates_found} duplicate images.")
-    print(f"Remaining unique images: {len(hashes)}")
+    print(
+        f"Scan complete. Quarantined {duplicates_found} duplicate images "
+        f"({len(report_groups)} groups, {len(corpus_matches)} already approved)."
+    )
+    print(f"Remaining unique images: {len(image_files) - duplicates_found}")
+    return report
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Remove duplicate images from a directory.")
+    parser = argparse.ArgumentParser(description="Quarantine duplicate images in a directory.")
     parser.add_argument("image_directory", type=str, help="The directory containing images to deduplicate.")
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=0,
+        help="Maximum Hamming distance between phashes to count as duplicates (0 = exact matches only).",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default="data/hash_cache.sqlite",
+        help="Persistent hash cache. Pass an empty string to disable it.",
+    )
+    parser.add_argument(
+        "--hashes",
+        nargs="+",
+        default=["phash"],
+        choices=HASH_KINDS,
+        help="Hash families that must all match for two images to be duplicates.",
+    )
+    parser.add_argument(
+        "--corpus-index",
+        type=str,
+        default=None,
+        help="Global index of the approved corpus (e.g. data/approved_index) to dedup against.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: one per CPU core).")
     args = parser.parse_args()
 
     target_dir = Path(args.image_directory)
     if not target_dir.is_dir():
         print(f"Error: Directory not found at {target_dir}")
     else:
-        find_and_remove_duplicates(target_dir)
+        find_and_remove_duplicates(
+            target_dir,
+            args.threshold,
+            args.workers,
+            Path(args.cache) if args.cache else None,
+            args.hashes,
+            Path(args.corpus_index) if args.corpus_index else None,
+        )
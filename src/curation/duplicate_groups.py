@@ -0,0 +1,89 @@
+# src/curation/duplicate_groups.py
+from pathlib import Path
+from typing import Sequence
+
+from curation.hash_index import MultiIndexHashTable
+from shared.image_files import image_size
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size (near-constant amortized ops)."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merges the sets holding a and b. Returns False if they were already together."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+    def groups(self) -> list[list[int]]:
+        """Returns every set with more than one member, members in ascending order."""
+        members: dict[int, list[int]] = {}
+        for x in range(len(self.parent)):
+            members.setdefault(self.find(x), []).append(x)
+        return [m for m in members.values() if len(m) > 1]
+
+
+def find_duplicate_groups(
+    image_paths: Sequence[Path],
+    hashes: dict[str, dict[Path, int]],
+    hash_kinds: Sequence[str],
+    threshold: int,
+) -> list[list[Path]]:
+    """
+    Groups images into connected components of the "is a near-duplicate of"
+    relation: two images are linked when every family in `hash_kinds` is within
+    `threshold` bits. Candidate pairs come from a multi-index table over the
+    first family, so the cost is linear in the number of candidate pairs rather
+    than quadratic in the number of images. Images without hashes are skipped.
+    """
+    primary, *secondary = hash_kinds
+    paths = [p for p in image_paths if all(p in hashes[kind] for kind in hash_kinds)]
+    others = [tuple(hashes[kind][p] for kind in secondary) for p in paths]
+
+    table = MultiIndexHashTable(threshold)
+    uf = UnionFind(len(paths))
+    for i, path in enumerate(paths):
+        value = hashes[primary][path]
+        for j, _ in table.query(value):
+            if all((a ^ b).bit_count() <= threshold for a, b in zip(others[i], others[j])):
+                uf.union(i, j)
+        table.add(value)
+
+    return [[paths[i] for i in group] for group in uf.groups()]
+
+
+def representative_score(image_path: Path) -> tuple[int, int]:
+    """Returns (pixels, bytes) for ranking copies of the same image with `pick_representative`."""
+    width, height = image_size(image_path)
+    return width * height, image_path.stat().st_size
+
+
+def pick_representative(scores: dict[Path, tuple[int, int]]) -> Path:
+    """
+    Picks the copy of an image to keep from its `representative_score`s: the
+    highest resolution, then, among files of the same format, the largest (the
+    least compressed). Byte sizes say nothing across formats (a raw .npy dwarfs
+    any .jpg), so the remaining tie between formats goes to the first name, and
+    reruns pick the same file.
+    """
+    best = max(pixels for pixels, _ in scores.values())
+    by_format = {}
+    for path in sorted(p for p, (pixels, _) in scores.items() if pixels == best):
+        by_format.setdefault(path.suffix.lower(), []).append(path)
+    return min(max(paths, key=lambda p: scores[p][1]) for paths in by_format.values())
@@ -0,0 +1,166 @@
+# src/curation/embedding.py
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+from curation.hash_cache import HashCache
+from curation.similarity import normalize_rows
+from ingestion.index import hash_file
+from PIL import Image
+from shared.embedding_store import EmbeddingStore
+from shared.image_files import open_image
+from tqdm import tqdm
+
+# CLIP resizes the short edge to 224 and center-crops; decoding a little above that
+# keeps the model's own resize antialiased while skipping most of the decode work.
+EMBED_IMAGE_SIZE = 256
+# Recorded with every stored embedding; bump it whenever load_for_embedding changes what the model sees
+PREPROCESS_VERSION = f"short-edge-{EMBED_IMAGE_SIZE}-v1"
+# Stored vectors are copied into the output memmap this many rows at a time
+COPY_BLOCK = 4096
+
+
+def load_for_embedding(image_path: Path, size: int = EMBED_IMAGE_SIZE) -> Image.Image:
+    """
+    Decodes an image as RGB with its short edge at most `size`. JPEGs are
+    decoded at a reduced DCT scale, so a 24MP frame never exists in memory.
+    """
+    with open_image(image_path) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+    scale = size / min(img.size)
+    if scale < 1:
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.BICUBIC)
+    return img
+
+
+def content_key(image_path: Path) -> int:
+    """The first 64 bits of the file's SHA-256, as an int."""
+    return int(hash_file(image_path)[:16], 16)
+
+
+def content_keys(image_paths: list[Path], cache: Optional[HashCache] = None) -> list[int]:
+    """Returns each image's content key, re-reading only files that changed since `cache` last saw them."""
+    hits, misses = cache.lookup(image_paths, "sha256") if cache is not None else ({}, list(image_paths))
+    fresh = {path: content_key(path) for path in misses}
+    if cache is not None and fresh:
+        cache.store(fresh, "sha256")
+    return [hits[p] if p in hits else fresh[p] for p in image_paths]
+
+
+def embedding_dimension(model) -> int:
+    """
+    The length of `model`'s vectors. SentenceTransformer only reports it for
+    text-style pipelines; a CLIP model (a lone CLIPModel module) returns None,
+    so the dimension is read off one probe encode instead.
+    """
+    dim = model.get_sentence_embedding_dimension()
+    if dim is None:
+        probe = Image.new("RGB", (EMBED_IMAGE_SIZE, EMBED_IMAGE_SIZE))
+        dim = model.encode([probe], batch_size=1, convert_to_numpy=True, show_progress_bar=False).shape[-1]
+    return int(dim)
+
+
+def open_embedding_store(root: Path, model_name: str, model) -> EmbeddingStore:
+    """Opens the store for `model_name` vectors of images preprocessed at PREPROCESS_VERSION."""
+    return EmbeddingStore(root, model_name, PREPROCESS_VERSION, embedding_dimension(model))
+
+
+def _load_batch(paths: list[str], size: int) -> tuple[list[int], list[Image.Image]]:
+    """Returns the batch positions that loaded and their images; unreadable images are skipped with a message."""
+    positions, images = [], []
+    for i, path in enumerate(paths):
+        try:
+            images.append(load_for_embedding(Path(path), size))
+            positions.append(i)
+        except Exception as e:
+            print(f"Could not process {Path(path).name}: {e}")
+    return positions, images
+
+
+def iter_image_batches(
+    image_paths: list[Path],
+    batch_size: int = 32,
+    workers: Optional[int] = None,
+    prefetch: int = 2,
+    size: int = EMBED_IMAGE_SIZE,
+) -> Iterator[tuple[list[int], list[Image.Image]]]:
+    """
+    Yields (rows, images) batches in order, where `rows` index into
+    `image_paths`. Like a DataLoader, `workers` processes decode and resize
+    batches ahead of the consumer, with at most `prefetch` batches per worker
+    in flight, so memory is bounded by the batch size rather than the number
+    of images. workers=0 loads in this process.
+    """
+    batches = [[str(p) for p in image_paths[i : i + batch_size]] for i in range(0, len(image_paths), batch_size)]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers == 0:
+        for start, batch in zip(range(0, len(image_paths), batch_size), batches):
+            positions, images = _load_batch(batch, size)
+            yield [start + i for i in positions], images
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        next_batch = 0
+        for start in range(0, len(image_paths), batch_size):
+            while next_batch < len(batches) and len(pending) < workers * prefetch:
+                pending.append(executor.submit(_load_batch, batches[next_batch], size))
+                next_batch += 1
+            positions, images = pending.popleft().result()
+            yield [start + i for i in positions], images
+
+
+def embed_to_memmap(
+    image_paths: list[Path],
+    model,
+    out_path: Path,
+    batch_size: int = 32,
+    workers: Optional[int] = None,
+    normalize: bool = True,
+    store: Optional[EmbeddingStore] = None,
+    hash_cache: Optional[HashCache] = None,
+) -> np.memmap:
+    """
+    Embeds images with a SentenceTransformer-style `model` into a
+    preallocated float16 .npy memmap at `out_path`, one row per image, with
+    decoding streamed through iter_image_batches. Rows are scaled to unit
+    length when `normalize` is set. Images that cannot be read keep the
+    file's initial zero row. Peak memory is a few batches of small images
+    plus the encoder, whatever the number of images.
+
+    With a `store`, images whose contents were embedded before (by any
+    stage) are copied from it and only the rest go through the model; new
+    vectors are added to the store as they are computed. `hash_cache` saves
+    re-reading unchanged files to compute their content keys.
+    """
+    dim = embedding_dimension(model)
+    embeddings = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float16, shape=(len(image_paths), dim))
+
+    todo, keys = list(range(len(image_paths))), None
+    if store is not None:
+        keys = content_keys(image_paths, hash_cache)
+        stored = store.rows(keys)
+        hits = [i for i, row in enumerate(stored) if row is not None]
+        for start in range(0, len(hits), COPY_BLOCK):
+            block = hits[start : start + COPY_BLOCK]
+            vectors = store.get([keys[i] for i in block])
+            embeddings[block] = normalize_rows(vectors) if normalize else vectors
+        todo = [i for i, row in enumerate(stored) if row is None]
+        print(f"Reusing {len(hits)} of {len(image_paths)} embeddings from {store.store_dir}.")
+
+    with tqdm(total=len(todo), desc="Embedding") as progress:
+        for positions, images in iter_image_batches([image_paths[i] for i in todo], batch_size, workers):
+            rows = [todo[i] for i in positions]
+            if images:
+                vectors = model.encode(images, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+                if store is not None:
+                    store.add([keys[i] for i in rows], vectors)
+                embeddings[rows] = normalize_rows(vectors) if normalize else vectors
+            progress.update(min(batch_size, len(todo) - progress.n))
+    embeddings.flush()
+    return embeddings
@@ -0,0 +1,113 @@
+# src/curation/hash_cache.py
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+# SQLite integers are signed 64-bit; hashes are stored in two's complement
+_SIGN_BIT = 1 << 63
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= _SIGN_BIT else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def _key(image_path: Path) -> str:
+    # abspath rather than resolve(): no per-component syscalls on million-file directories
+    return os.path.abspath(image_path)
+
+
+def file_signature(image_path: Path) -> Optional[tuple[int, int]]:
+    """Returns (size, mtime_ns) for a file, or None if it no longer exists."""
+    try:
+        st = os.stat(image_path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class HashCache:
+    """
+    A persistent SQLite cache of image hashes keyed by absolute path, valid only
+    while the file's size and mtime_ns are unchanged. Several hash kinds (phash,
+    dhash, ...) can be stored per file.
+
+    Writes are committed in small transactions with WAL journaling, so a crash
+    loses at most the batch in flight and never leaves a half-written entry.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                PRIMARY KEY (path, kind)
+            )
+            """
+        )
+
+    def lookup(self, image_paths: Iterable[Path], kind: str = "phash") -> tuple[dict[Path, int], list[Path]]:
+        """
+        Splits `image_paths` into cached hashes and the paths that must be
+        (re)hashed because they are new or changed since they were cached.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, mtime_ns, value FROM hashes WHERE kind = ?", (kind,))
+            cached = {path: (size, mtime_ns, value) for path, size, mtime_ns, value in rows}
+
+        hits, misses = {}, []
+        for path in image_paths:
+            entry = cached.get(_key(path))
+            if entry is not None and file_signature(path) == entry[:2]:
+                hits[path] = _to_unsigned(entry[2])
+            else:
+                misses.append(path)
+        return hits, misses
+
+    def store(self, hashes: dict[Path, int], kind: str = "phash"):
+        """Records freshly computed hashes in one transaction, with each file's current size and mtime."""
+        rows = []
+        for path, value in hashes.items():
+            sig = file_signature(path)
+            if sig is not None:
+                rows.append((_key(path), kind, sig[0], sig[1], _to_signed(value)))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes (path, kind, size, mtime_ns, value) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def prune(self, directory: Path, existing: Iterable[Path]) -> int:
+        """Deletes entries under `directory` whose file is not in `existing`. Returns the number removed."""
+        prefix = _key(directory) + os.sep
+        keep = {_key(p) for p in existing}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT path FROM hashes WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+            stale = [(path,) for (path,) in rows if path not in keep]
+            with self._conn:
+                self._conn.executemany("DELETE FROM hashes WHERE path = ?", stale)
+        return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,118 @@
+# src/curation/hash_index.py
+import itertools
+from typing import Iterable, Optional
+
+import numpy as np
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Returns the number of set bits in each element of a uint64 array."""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def hash_to_int(image_hash) -> int:
+    """Converts an imagehash.ImageHash (64 bits for the default hash_size=8) to an int."""
+    return int(str(image_hash), 16)
+
+
+def flip_masks(width: int, radius: int) -> list[int]:
+    """Every `width`-bit mask with at most `radius` bits set, starting with 0."""
+    masks = []
+    for k in range(radius + 1):
+        for bits in itertools.combinations(range(width), k):
+            masks.append(sum(1 << b for b in bits))
+    return masks
+
+
+def chunk_ranges(bits: int, chunks: int) -> list[tuple[int, int]]:
+    """Splits `bits` into `chunks` (shift, width) ranges whose widths differ by at most one bit."""
+    base, extra = divmod(bits, chunks)
+    ranges = []
+    shift = 0
+    for i in range(chunks):
+        width = base + (1 if i < extra else 0)
+        ranges.append((shift, width))
+        shift += width
+    return ranges
+
+
+class MultiIndexHashTable:
+    """
+    An index of 64-bit hashes that finds every stored hash within a Hamming
+    distance `threshold` of a query, without comparing against all of them.
+
+    Each hash is split into `chunks` disjoint bit ranges with one hash table per
+    range. If two hashes differ in at most `threshold` bits, at least one range
+    differs in at most threshold // chunks bits (pigeonhole), so a query only
+    probes its own chunk values with that many bits flipped. Candidates are then
+    checked with an exact popcount. With 16-bit chunks the buckets stay small
+    into the millions of hashes.
+    """
+
+    def __init__(self, threshold: int, bits: int = 64, chunks: Optional[int] = None):
+        if not 0 <= threshold < bits:
+            raise ValueError(f"threshold must be in [0, {bits}), got {threshold}")
+        self.threshold = threshold
+        self.bits = bits
+        self.chunks = chunks or min(threshold + 1, max(1, bits // 16))
+
+        self._ranges = chunk_ranges(bits, self.chunks)
+        radius = threshold // self.chunks
+        self._probes = [flip_masks(width, radius) for _, width in self._ranges]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in range(self.chunks)]
+
+        self._hashes = np.empty(1024, dtype=np.uint64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def hashes(self) -> np.ndarray:
+        """Returns the stored hashes, indexed by the ids `add` returned."""
+        return self._hashes[: self._size]
+
+    def _keys(self, value: int) -> Iterable[int]:
+        for shift, width in self._ranges:
+            yield (value >> shift) & ((1 << width) - 1)
+
+    def add(self, value: int) -> int:
+        """Stores a hash and returns its id (ids are assigned 0, 1, 2, ...)."""
+        if self._size == len(self._hashes):
+            self._hashes = np.resize(self._hashes, 2 * len(self._hashes))
+        item_id = self._size
+        self._hashes[item_id] = value
+        self._size += 1
+        for table, key in zip(self._tables, self._keys(value)):
+            table.setdefault(key, []).append(item_id)
+        return item_id
+
+    def query(self, value: int) -> list[tuple[int, int]]:
+        """Returns (id, distance) for every stored hash within `threshold` of `value`."""
+        candidates = []
+        for table, probes, key in zip(self._tables, self._probes, self._keys(value)):
+            for mask in probes:
+                ids = table.get(key ^ mask)
+                if ids:
+                    candidates.extend(ids)
+        if not candidates:
+            return []
+
+        # A hash can match in several chunks; duplicates are dropped after the (cheap) distance check
+        ids = np.array(candidates, dtype=np.int64)
+        distances = popcount64(self._hashes[ids] ^ np.uint64(value))
+        keep = distances <= self.threshold
+        matches = dict(zip(ids[keep].tolist(), distances[keep].tolist()))
+        return sorted(matches.items(), key=lambda pair: (pair[1], pair[0]))
+
+
+def brute_force_query(hashes: np.ndarray, value: int, threshold: int) -> list[tuple[int, int]]:
+    """Reference linear scan with the same output as MultiIndexHashTable.query."""
+    distances = popcount64(hashes ^ np.uint64(value))
+    ids = np.flatnonzero(distances <= threshold)
+    return sorted(zip(ids.tolist(), distances[ids].tolist()), key=lambda pair: (pair[1], pair[0]))
@@ -0,0 +1,209 @@
+# src/curation/hashing.py
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from curation.hash_cache import HashCache
+from PIL import Image
+from shared.image_files import open_image
+
+# phash shrinks to 32x32 (hash_size * highfreq_factor); decoding at a few times
+# that keeps the downsample antialiased while skipping most of the IDCT work.
+DRAFT_SIZE = (128, 128)
+
+# Hash families computed by batch_hashes. All but colorhash are 64 bits; colorhash is 42.
+HASH_KINDS = ("phash", "dhash", "ahash", "colorhash")
+# colorhash only measures colour fractions, so a small thumbnail stands in for the full image
+COLOR_THUMBNAIL_SIZE = (64, 64)
+
+
+def _dct_rows(n: int, k: int) -> np.ndarray:
+    """The first `k` rows of the unnormalized DCT-II matrix that scipy.fftpack.dct applies."""
+    i = np.arange(n)
+    return 2 * np.cos(np.pi * np.arange(k)[:, None] * (2 * i[None, :] + 1) / (2 * n))
+
+
+_PHASH_DCT = _dct_rows(32, 8)
+
+
+def load_for_hash(image_path: Path, draft: bool = True, mode: str = "L"):
+    """
+    Opens an image for hashing. JPEGs are decoded at the smallest DCT scale
+    (1/2, 1/4 or 1/8) that still covers DRAFT_SIZE, so a 24MP photo is decoded
+    at roughly 750x500 instead of full size.
+    """
+    img = open_image(image_path)
+    if draft and img.format == "JPEG":
+        img.draft(mode, DRAFT_SIZE)
+    return img
+
+
+def thumbnails_from_image(img: Image.Image, kinds: Iterable[str] = HASH_KINDS) -> dict[str, np.ndarray]:
+    """
+    Returns the small arrays each hash family needs from one decoded image,
+    resized exactly as imagehash does: 32x32, 9x8 and 8x8 grayscale for phash,
+    dhash and ahash, and (intensity, hue, saturation) planes for colorhash.
+    """
+    kinds = set(kinds)
+    thumbs = {}
+    if kinds & {"phash", "dhash", "ahash"}:
+        gray = img.convert("L")
+        for kind, size in (("phash", (32, 32)), ("dhash", (9, 8)), ("ahash", (8, 8))):
+            if kind in kinds:
+                thumbs[kind] = np.asarray(gray.resize(size, Image.Resampling.LANCZOS))
+    if "colorhash" in kinds:
+        small = img.convert("RGB").resize(COLOR_THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        hue, saturation, _ = small.convert("HSV").split()
+        thumbs["colorhash"] = np.stack([np.asarray(small.convert("L")), np.asarray(hue), np.asarray(saturation)])
+    return thumbs
+
+
+def load_thumbnails(image_path: Path, kinds: Iterable[str] = HASH_KINDS, draft: bool = True) -> dict[str, np.ndarray]:
+    """Decodes an image once (see load_for_hash) and returns its thumbnails_from_image."""
+    kinds = set(kinds)
+    with load_for_hash(image_path, draft, mode="RGB" if "colorhash" in kinds else "L") as img:
+        return thumbnails_from_image(img, kinds)
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Packs (batch, n_bits) booleans into uint64s, first bit most significant (as str(ImageHash) does)."""
+    padded = np.zeros((bits.shape[0], 64), dtype=bool)
+    padded[:, 64 - bits.shape[1] :] = bits
+    return np.packbits(padded, axis=1).view(">u8")[:, 0].astype(np.uint64)
+
+
+def _batch_colorhash(planes: np.ndarray, binbits: int = 3) -> np.ndarray:
+    # Vectorized port of imagehash.colorhash over (batch, 3, H, W) intensity/hue/saturation planes
+    batch = planes.shape[0]
+    intensity, hue, saturation = (planes[:, i].reshape(batch, -1).astype(np.int64) for i in range(3))
+    mask_black = intensity < 256 // 8
+    mask_gray = saturation < 256 // 3
+    mask_colors = ~mask_black & ~mask_gray
+    mask_faint = mask_colors & (saturation < 256 * 2 // 3)
+    mask_bright = mask_colors & (saturation > 256 * 2 // 3)
+    colors = np.maximum(1, mask_colors.sum(axis=1))[:, None]
+
+    hue_bin = np.digitize(hue, np.linspace(0, 255, 7)[1:-1])
+    faint = np.stack([(mask_faint & (hue_bin == b)).sum(axis=1) for b in range(6)], axis=1)
+    bright = np.stack([(mask_bright & (hue_bin == b)).sum(axis=1) for b in range(6)], axis=1)
+
+    maxvalue = 2**binbits
+    fractions = np.concatenate(
+        [
+            mask_black.mean(axis=1)[:, None],
+            (~mask_black & mask_gray).mean(axis=1)[:, None],
+            faint / colors,
+            bright / colors,
+        ],
+        axis=1,
+    )
+    values = np.minimum(maxvalue - 1, (fractions * maxvalue).astype(np.int64))
+    shifts = [(values // 2 ** (binbits - i - 1)) % 2 ** (binbits - i) > 0 for i in range(binbits)]
+    return _pack_bits(np.stack(shifts, axis=2).reshape(batch, -1))
+
+
+def batch_hashes(thumbnails: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Computes hashes for a batch of stacked thumbnails (as returned by
+    load_thumbnails, stacked along a new first axis). The phash DCT is two
+    matrix multiplies over the whole batch. Returns one uint64 array per family,
+    bit-for-bit equal to imagehash on the same thumbnails.
+    """
+    hashes = {}
+    if "phash" in thumbnails:
+        pixels = thumbnails["phash"].astype(np.float64)
+        low = (_PHASH_DCT @ pixels @ _PHASH_DCT.T).reshape(len(pixels), -1)
+        hashes["phash"] = _pack_bits(low > np.median(low, axis=1, keepdims=True))
+    if "dhash" in thumbnails:
+        pixels = thumbnails["dhash"]
+        hashes["dhash"] = _pack_bits((pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(pixels), -1))
+    if "ahash" in thumbnails:
+        pixels = thumbnails["ahash"]
+        mean = pixels.mean(axis=(1, 2), keepdims=True)
+        hashes["ahash"] = _pack_bits((pixels > mean).reshape(len(pixels), -1))
+    if "colorhash" in thumbnails:
+        hashes["colorhash"] = _batch_colorhash(thumbnails["colorhash"])
+    return hashes
+
+
+def _hash_chunk(paths: list[str], draft: bool, kinds: tuple[str, ...]):
+    loaded, results = [], []
+    for path in paths:
+        try:
+            loaded.append((path, load_thumbnails(Path(path), kinds, draft)))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    if loaded:
+        stacked = {kind: np.stack([thumbs[kind] for _, thumbs in loaded]) for kind in kinds}
+        values = {kind: array.tolist() for kind, array in batch_hashes(stacked).items()}
+        for i, (path, _) in enumerate(loaded):
+            results.append((path, {kind: values[kind][i] for kind in kinds}, None))
+    return results
+
+
+def hash_images(
+    image_paths: list[Path],
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    draft: bool = True,
+    cache: Optional[HashCache] = None,
+    kinds: Iterable[str] = ("phash",),
+) -> dict[str, dict[Path, int]]:
+    """
+    Computes hashes of one or more families (see HASH_KINDS) for many images
+    on a process pool, returning {kind: {path: hash}}.
+
+    Each image is decoded once; every requested family is computed from that
+    decode, and each worker hashes its chunk as a single vectorized batch.
+    Paths are sent to the workers in chunks of `chunk_size` to amortize the
+    pickling round trip. `workers` defaults to one per CPU core; 1 hashes in
+    this process. Images that cannot be read are reported and left out.
+
+    With a `cache`, unchanged files are looked up instead of decoded, and each
+    chunk of new hashes is stored as soon as it arrives so an interrupted run
+    keeps its progress.
+    """
+    kinds = tuple(kinds)
+    unknown = set(kinds) - set(HASH_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown hash kinds {sorted(unknown)}; expected some of {HASH_KINDS}")
+
+    hashes = {kind: {} for kind in kinds}
+    misses = list(image_paths)
+    if cache is not None:
+        missing = set()
+        for kind in kinds:
+            hashes[kind], kind_misses = cache.lookup(image_paths, kind)
+            missing.update(kind_misses)
+        # A file is re-decoded if any requested family is missing; all of them are recomputed together
+        misses = [p for p in image_paths if p in missing]
+        print(f"Hash cache: {len(image_paths) - len(misses)} unchanged, {len(misses)} to hash.")
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [[str(p) for p in misses[i : i + chunk_size]] for i in range(0, len(misses), chunk_size)]
+    hash_chunk = functools.partial(_hash_chunk, draft=draft, kinds=kinds)
+
+    if workers == 1 or len(chunks) <= 1:
+        _collect(map(hash_chunk, chunks), hashes, cache)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _collect(executor.map(hash_chunk, chunks), hashes, cache)
+    return hashes
+
+
+def _collect(chunk_results, hashes: dict[str, dict[Path, int]], cache: Optional[HashCache]):
+    for chunk in chunk_results:
+        fresh = {kind: {} for kind in hashes}
+        for path, values, error in chunk:
+            if error is not None:
+                print(f"Could not process {Path(path).name}: {error}")
+                continue
+            for kind, value in values.items():
+                fresh[kind][Path(path)] = value
+        for kind, kind_hashes in fresh.items():
+            hashes[kind].update(kind_hashes)
+            if cache is not None and kind_hashes:
+                cache.store(kind_hashes, kind)
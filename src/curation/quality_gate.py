@@ -1,78 +1,426 @@
 # src/curation/quality_gate.py
 import argparse
+import contextlib
+import functools
+import os
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Callable, Optional, Sequence
 
 import cv2
+from shared.image_files import image_size, list_images, read_gray, shrink_gray
 
 # Download the model from: https://github.com/opencv/opencv/blob/master/data/haarcascades/haarcascade_frontalface_default.xml
 # And place it in your project's root or a dedicated 'models' folder.
 CASCADE_PATH = "haarcascade_frontalface_default.xml"
 
+# Detection window of haarcascade_frontalface_default.xml: the smallest face, in scanned pixels, it can find
+HAAR_WINDOW = 24
 
-def run_quality_gate(image_dir: Path, min_resolution: int = 600, blur_threshold: float = 100.0):
+
+def blur_score(gray) -> float:
+    """Variance of the Laplacian: low values mean few sharp edges."""
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+
+class ImageContext:
+    """
+    The image under test, decoded lazily and at most once, so checks share
+    the decode and a check that never runs never pays for one. Reduced
+    scales are shrunk from the full-resolution decode (see shrink_gray), so
+    they are the same whichever check asks first.
+    """
+
+    def __init__(self, path: Path, reduction: int = 2):
+        self.path = path
+        self.reduction = reduction
+        self._size = None
+        self._grays = {}
+
+    def size(self) -> tuple[int, int]:
+        if self._size is None:
+            self._size = image_size(self.path)
+        return self._size
+
+    def gray(self, reduction: Optional[int] = None):
+        reduction = reduction or self.reduction
+        if reduction not in self._grays:
+            if reduction == 1:
+                gray = read_gray(self.path)
+                if gray is None:
+                    raise ValueError("could not read image")
+            else:
+                gray = shrink_gray(self.gray(1), reduction)
+            self._grays[reduction] = gray
+        return self._grays[reduction]
+
+
+def check_resolution(ctx: ImageContext, min_resolution: int) -> Optional[str]:
+    """Reads only the file header."""
+    width, height = ctx.size()
+    if min(width, height) < min_resolution:
+        return f"Low resolution ({width}x{height})"
+    return None
+
+
+def check_blur(ctx: ImageContext, blur_threshold: float) -> Optional[str]:
+    """
+    Scores blur on the full-resolution decode, whatever the context's
+    `reduction`. The blur score is not scale-invariant: downscaling by s can
+    raise it by up to s**4 or lower it without bound (detail above the
+    reduced decode's Nyquist limit averages away), and on ordinary photos the
+    reduced score lands between those bounds, so it can decide almost nothing
+    on its own and a fallback decode costs more than it saves.
+    """
+    laplacian_var = blur_score(ctx.gray(1))
+    if laplacian_var < blur_threshold:
+        return f"Blurry (Score: {laplacian_var:.2f})"
+    return None
+
+
+@dataclass
+class FaceDetectionOptions:
+    """
+    How the Haar cascade is run. `max_edge` caps the longest edge of the
+    image the cascade scans (None scans the 1/reduction decode as is), and
+    `min_size` is the smallest face to report, in full-resolution pixels; it
+    is scaled to the scanned image. With `first_pass_scale_factor` set, a
+    coarser pyramid finds candidates and only the regions around them are
+    rescanned with `scale_factor` to confirm.
+    """
+
+    max_edge: Optional[int] = None
+    min_size: int = 0
+    scale_factor: float = 1.1
+    min_neighbors: int = 4
+    first_pass_scale_factor: Optional[float] = None
+
+
+def detect_faces(ctx: ImageContext, face_cascade, options: FaceDetectionOptions) -> list[tuple[int, int, int, int]]:
+    """
+    Returns (x, y, w, h) face boxes in full-resolution pixels. Faces smaller
+    than HAAR_WINDOW pixels in the scanned image cannot be found, so a small
+    `max_edge` also raises the effective minimum face size.
+    """
+    gray = ctx.gray()
+    longest = max(gray.shape)
+    if options.max_edge and longest > options.max_edge:
+        factor = options.max_edge / longest
+        size = (max(1, round(gray.shape[1] * factor)), max(1, round(gray.shape[0] * factor)))
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    scale = max(gray.shape) / max(ctx.size())  # scanned pixels per full-resolution pixel
+
+    min_side = round(options.min_size * scale)
+    kwargs = {"minSize": (min_side, min_side)} if min_side > HAAR_WINDOW else {}
+    if options.first_pass_scale_factor is None:
+        faces = face_cascade.detectMultiScale(gray, options.scale_factor, options.min_neighbors, **kwargs)
+    else:
+        faces = []
+        candidates = face_cascade.detectMultiScale(
+            gray, options.first_pass_scale_factor, options.min_neighbors, **kwargs
+        )
+        for x, y, w, h in candidates:
+            pad = w // 2
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            roi = gray[y0 : y + h + pad, x0 : x + w + pad]
+            for fx, fy, fw, fh in face_cascade.detectMultiScale(
+                roi, options.scale_factor, options.min_neighbors, **kwargs
+            ):
+                faces.append((fx + x0, fy + y0, fw, fh))
+    return [tuple(round(v / scale) for v in box) for box in faces]
+
+
+def check_faces(ctx: ImageContext, face_cascade, options: Optional[FaceDetectionOptions] = None) -> Optional[str]:
+    faces = detect_faces(ctx, face_cascade, options or FaceDetectionOptions())
+    if len(faces) > 0:
+        return "Face detected"
+    return None
+
+
+@dataclass
+class QualityCheck:
+    """
+    One gate check. `run` takes an ImageContext and returns a rejection
+    reason or None; `cost` is the expected seconds per image, used to order
+    the check until it has been measured. Checks run in worker processes, so
+    `run` must be picklable (a module-level function or a functools.partial
+    of one).
+    """
+
+    name: str
+    cost: float
+    run: Callable[[ImageContext], Optional[str]]
+
+
+def default_checks(
+    face_cascade,
+    min_resolution: int = 600,
+    blur_threshold: float = 100.0,
+    face_options: Optional[FaceDetectionOptions] = None,
+) -> list[QualityCheck]:
+    return [
+        QualityCheck("resolution", 1e-4, functools.partial(check_resolution, min_resolution=min_resolution)),
+        QualityCheck("blur", 5e-3, functools.partial(check_blur, blur_threshold=blur_threshold)),
+        QualityCheck("faces", 5e-2, functools.partial(check_faces, face_cascade=face_cascade, options=face_options)),
+    ]
+
+
+@dataclass
+class CheckStats:
+    runs: int = 0
+    rejects: int = 0
+    seconds: float = 0.0
+
+    def add(self, other: "CheckStats"):
+        self.runs += other.runs
+        self.rejects += other.rejects
+        self.seconds += other.seconds
+
+
+class CheckScheduler:
+    """
+    Runs checks in the order that minimises the expected cost per image and
+    stops at the first rejection.
+
+    For independent filters, the expected cost of an order is minimised by
+    running checks in ascending cost / reject-rate. Both are measured live:
+    the cost is the mean latency once a check has run (its declared cost
+    until then) and the reject rate is Laplace-smoothed, so a check that
+    never rejects still gets a finite rank. The order is recomputed every
+    `reorder_every` images. Which checks reject an image does not depend on
+    the order, only which reason is reported first does.
+    """
+
+    def __init__(self, checks: Sequence[QualityCheck], reorder_every: int = 32):
+        self.checks = list(checks)
+        self.reorder_every = reorder_every
+        self.stats = {check.name: CheckStats() for check in self.checks}
+        self._seen = 0
+
+    def rank(self, check: QualityCheck) -> float:
+        stats = self.stats[check.name]
+        cost = stats.seconds / stats.runs if stats.runs else check.cost
+        reject_rate = (stats.rejects + 1) / (stats.runs + 2)
+        return cost / reject_rate
+
+    def run(self, ctx: ImageContext, record: Optional[dict[str, CheckStats]] = None) -> Optional[str]:
+        if self._seen % self.reorder_every == 0:
+            self.checks.sort(key=self.rank)
+        self._seen += 1
+
+        for check in self.checks:
+            start = time.perf_counter()
+            reason = check.run(ctx)
+            elapsed = time.perf_counter() - start
+            targets = [self.stats[check.name]]
+            if record is not None:
+                targets.append(record.setdefault(check.name, CheckStats()))
+            for stats in targets:
+                stats.runs += 1
+                stats.rejects += reason is not None
+                stats.seconds += elapsed
+            if reason is not None:
+                return reason
+        return None
+
+
+def check_image(
+    image_path: Path,
+    face_cascade,
+    min_resolution: int,
+    blur_threshold: float,
+    reduction: int = 2,
+    face_options: Optional[FaceDetectionOptions] = None,
+) -> Optional[str]:
+    """
+    Runs the default checks on one image in their declared order. Returns the
+    rejection reason, or None if the image passes. Raises ValueError if the
+    image cannot be read.
+    """
+    ctx = ImageContext(image_path, reduction)
+    for check in default_checks(face_cascade, min_resolution, blur_threshold, face_options):
+        reason = check.run(ctx)
+        if reason is not None:
+            return reason
+    return None
+
+
+def _init_pool_worker(initializer: Callable, initargs: tuple):
+    # One process per core already; OpenCV's own thread pool would oversubscribe the CPU
+    cv2.setNumThreads(1)
+    initializer(*initargs)
+
+
+@contextlib.contextmanager
+def map_chunks(fn: Callable, chunks: list, workers: int, initializer: Callable, initargs: tuple = ()):
+    """
+    Yields the results of `fn` over `chunks`, in order. With `workers` > 1
+    (and more than one chunk) they run on a process pool, where each worker
+    calls `initializer(*initargs)` once to set up its per-process state;
+    otherwise the initializer runs here and the chunks run in this process.
+    """
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_pool_worker, initargs=(initializer, initargs)
+        ) as executor:
+            yield executor.map(fn, chunks)
+    else:
+        initializer(*initargs)
+        yield map(fn, chunks)
+
+
+# Per-process state for the gate, set up once by _init_worker
+_worker_scheduler = None
+
+
+def _init_worker(
+    cascade_path: str,
+    min_resolution: int,
+    blur_threshold: float,
+    face_options: Optional[FaceDetectionOptions],
+    extra_checks: list[QualityCheck],
+):
+    global _worker_scheduler
+    face_cascade = cv2.CascadeClassifier(cascade_path)
+    _worker_scheduler = CheckScheduler(
+        default_checks(face_cascade, min_resolution, blur_threshold, face_options) + extra_checks
+    )
+
+
+def _check_chunk(paths: list[str], reduction: int):
+    results, chunk_stats = [], {}
+    for path in paths:
+        try:
+            reason = _worker_scheduler.run(ImageContext(Path(path), reduction), chunk_stats)
+            results.append((path, reason, None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results, chunk_stats
+
+
+def print_check_summary(stats: dict[str, CheckStats]):
+    print(f"{'check':<12}{'runs':>8}{'rejects':>9}{'rate':>8}{'ms/img':>9}{'total s':>9}")
+    for name, s in sorted(stats.items(), key=lambda item: -item[1].seconds):
+        rate = s.rejects / s.runs if s.runs else 0.0
+        mean_ms = 1000 * s.seconds / s.runs if s.runs else 0.0
+        print(f"{name:<12}{s.runs:>8}{s.rejects:>9}{rate:>8.1%}{mean_ms:>9.2f}{s.seconds:>9.2f}")
+
+
+def run_quality_gate(
+    image_dir: Path,
+    min_resolution: int = 600,
+    blur_threshold: float = 100.0,
+    workers: int = 1,
+    chunk_size: int = 16,
+    cascade_path: str = CASCADE_PATH,
+    reduction: int = 2,
+    extra_checks: Sequence[QualityCheck] = (),
+    face_options: Optional[FaceDetectionOptions] = None,
+    image_paths: Optional[Sequence[Path]] = None,
+):
     """
     Filters images in a directory based on resolution, blurriness, and face detection.
-    Moves failed images to a 'rejected' subdirectory.
+    Moves failed images to a 'rejected' subdirectory. With `image_paths`, only
+    those images (the ones that still exist) are checked instead of the whole
+    directory, e.g. just the new frames of an ingestion batch.
+
+    The checks (plus any `extra_checks`) are run by a CheckScheduler, which
+    orders them by measured cost and reject rate and stops at the first
+    rejection. Per-check stats are printed at the end and returned.
+
+    With `workers` > 1 the checks run on a process pool: each worker loads its
+    own face cascade once and schedules its own checks over chunks of
+    `chunk_size` paths, and only this process moves files, so no file is ever
+    moved twice.
+
+    Blur is scored at full resolution (see check_blur) and faces are found on
+    a 1/`reduction` scale image shrunk from that same decode;
+    `face_options` can scan faces at an even smaller size (see
+    FaceDetectionOptions).
     """
     rejected_dir = image_dir / "rejected"
     rejected_dir.mkdir(exist_ok=True)
 
-    face_cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    face_cascade = cv2.CascadeClassifier(cascade_path)
     if face_cascade.empty():
-        print(f"❌ Error: Could not load face cascade model from {CASCADE_PATH}.")
+        print(f"❌ Error: Could not load face cascade model from {cascade_path}.")
         print("Please download it and place it in the correct location.")
         return
 
-    image_files = list(image_dir.glob("*.[jp][pn]g"))
+    if image_paths is None:
+        image_files = list_images(image_dir)
+    else:
+        image_files = [Path(p) for p in image_paths if Path(p).exists()]
     print(f"🔍 Running quality gate on {len(image_files)} images...")
 
-    rejected_count = 0
-    for image_path in image_files:
-        try:
-            image = cv2.imread(str(image_path))
-            if image is None:
-                print(f"Warning: Could not read {image_path.name}. Skipping.")
-                continue
-
-            # 1. Resolution Check
-            height, width, _ = image.shape
-            if min(width, height) < min_resolution: # <--- NEW, BETTER LOGIC
-                shutil.move(image_path, rejected_dir / image_path.name)
-                print(f"-> Rejected {image_path.name}: Low resolution ({width}x{height})")
-                rejected_count += 1
-                continue
-
-            # 2. Blur Check
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-            if laplacian_var < blur_threshold:
-                shutil.move(image_path, rejected_dir / image_path.name)
-                print(f"-> Rejected {image_path.name}: Blurry (Score: {laplacian_var:.2f})")
-                rejected_count += 1
-                continue
-
-            # 3. Face Check
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-            if len(faces) > 0:
-                shutil.move(image_path, rejected_dir / image_path.name)
-                print(f"-> Rejected {image_path.name}: Face detected")
-                rejected_count += 1
-                continue
+    chunks = [[str(p) for p in image_files[i : i + chunk_size]] for i in range(0, len(image_files), chunk_size)]
+    check_chunk = functools.partial(_check_chunk, reduction=reduction)
+    extra_checks = list(extra_checks)
 
-        except Exception as e:
-            print(f"Error processing {image_path.name}: {e}")
+    rejected_count = 0
+    stats = {}
+    initargs = (cascade_path, min_resolution, blur_threshold, face_options, extra_checks)
+    with map_chunks(check_chunk, chunks, workers, _init_worker, initargs) as results:
+        for chunk, chunk_stats in results:
+            for name, s in chunk_stats.items():
+                stats.setdefault(name, CheckStats()).add(s)
+            for path, reason, error in chunk:
+                image_path = Path(path)
+                if error is not None:
+                    print(f"Error processing {image_path.name}: {error}")
+                    continue
+                if reason is None:
+                    continue
+                try:
+                    shutil.move(image_path, rejected_dir / image_path.name)
+                    print(f"-> Rejected {image_path.name}: {reason}")
+                    rejected_count += 1
+                except Exception as e:
+                    print(f"Error processing {image_path.name}: {e}")
 
+    if stats:
+        print_check_summary(stats)
     print(f"✅ Quality gate complete. Rejected {rejected_count} images.")
+    return {"rejected": rejected_count, "checks": {name: asdict(s) for name, s in stats.items()}}
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Filter images by quality and content.")
     parser.add_argument("image_directory", type=str, help="Directory of images to filter.")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Checker processes (default: one per CPU core)."
+    )
+    parser.add_argument(
+        "--reduction",
+        type=int,
+        choices=[1, 2, 4, 8],
+        default=2,
+        help="Scale divisor for the face check (1 = full resolution).",
+    )
+    parser.add_argument(
+        "--face-max-edge", type=int, default=None, help="Scan for faces at most this many pixels on the long edge."
+    )
+    parser.add_argument(
+        "--min-face-size", type=int, default=0, help="Smallest face to reject on, in full-resolution pixels."
+    )
+    parser.add_argument(
+        "--face-first-pass-scale-factor",
+        type=float,
+        default=None,
+        help="Coarse first-pass scale factor (e.g. 1.3); hits are confirmed at 1.1.",
+    )
     args = parser.parse_args()
 
     target_dir = Path(args.image_directory)
     if not target_dir.is_dir():
         print(f"Error: Directory not found at {target_dir}")
     else:
-        run_quality_gate(target_dir)
+        face_detection = FaceDetectionOptions(
+            max_edge=args.face_max_edge,
+            min_size=args.min_face_size,
+            first_pass_scale_factor=args.face_first_pass_scale_factor,
+        )
+        run_quality_gate(target_dir, workers=args.workers, reduction=args.reduction, face_options=face_detection)
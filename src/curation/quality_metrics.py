@@ -0,0 +1,283 @@
+# src/curation/quality_metrics.py
+import argparse
+import functools
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+from curation.embedding import content_keys
+from curation.hash_cache import HashCache
+from curation.quality_gate import CASCADE_PATH, blur_score, map_chunks
+from shared.image_files import image_size, list_images, read_gray, shrink_gray
+
+METRICS_NAME = "quality_metrics.npz"
+# Bump when a metric's definition changes; tables from another version are re-scored from scratch
+METRICS_VERSION = 2
+# Pixel values at or beyond these levels count as crushed shadows / blown highlights
+SHADOW_LEVEL = 5
+HIGHLIGHT_LEVEL = 250
+
+# Column name -> dtype. "key" is the file's content key (see embedding.content_key), so a renamed image keeps its row.
+COLUMNS = {
+    "key": "<u8",
+    "name": "<U255",
+    "width": np.int32,
+    "height": np.int32,
+    "blur": np.float32,
+    "faces": np.int16,
+    "brightness": np.float32,
+    "contrast": np.float32,
+    "shadows": np.float32,
+    "highlights": np.float32,
+}
+
+
+def compute_metrics(image_path: Path, face_cascade, reduction: int = 2) -> dict:
+    """
+    Computes every quality metric except "key" for one image, without
+    stopping at the first failure like the gate does. The blur score and exposure statistics
+    are exact (full-resolution decode); faces are counted on the same
+    1/`reduction` scale shrink of it the gate uses, so the counts match it.
+    """
+    width, height = image_size(image_path)
+    gray = read_gray(image_path)
+    if gray is None:
+        raise ValueError("could not read image")
+    small = shrink_gray(gray, reduction)
+    faces = face_cascade.detectMultiScale(small, 1.1, 4)
+    return {
+        "name": image_path.name,
+        "width": width,
+        "height": height,
+        "blur": blur_score(gray),
+        "faces": len(faces),
+        "brightness": gray.mean(),
+        "contrast": gray.std(),
+        "shadows": np.count_nonzero(gray <= SHADOW_LEVEL) / gray.size,
+        "highlights": np.count_nonzero(gray >= HIGHLIGHT_LEVEL) / gray.size,
+    }
+
+
+def empty_table() -> dict[str, np.ndarray]:
+    return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+
+
+def table_from_rows(rows: list[dict]) -> dict[str, np.ndarray]:
+    return {column: np.array([row[column] for row in rows], dtype=dtype) for column, dtype in COLUMNS.items()}
+
+
+def load_metrics(metrics_path: Path, reduction: Optional[int] = None) -> dict[str, np.ndarray]:
+    """
+    Loads a metrics table. Returns an empty table if the file is missing, was
+    written by another METRICS_VERSION, or (when given) used another face-check
+    `reduction`.
+    """
+    if not metrics_path.exists():
+        return empty_table()
+    with np.load(metrics_path) as data:
+        if int(data["version"]) != METRICS_VERSION:
+            return empty_table()
+        if reduction is not None and int(data["reduction"]) != reduction:
+            return empty_table()
+        return {column: data[column] for column in COLUMNS}
+
+
+def save_metrics(metrics_path: Path, table: dict[str, np.ndarray], reduction: int):
+    """Writes the table atomically, so an interrupted run never leaves a truncated file behind."""
+    tmp_path = metrics_path.with_name(metrics_path.name + ".tmp.npz")
+    np.savez(tmp_path, version=METRICS_VERSION, reduction=reduction, **table)
+    os.replace(tmp_path, metrics_path)
+
+
+# Per-process state for scoring, set up once by _init_worker (see quality_gate.map_chunks)
+_worker_cascade = None
+
+
+def _init_worker(cascade_path: str):
+    global _worker_cascade
+    _worker_cascade = cv2.CascadeClassifier(cascade_path)
+
+
+def _score_chunk(paths: list[str], reduction: int):
+    results = []
+    for path in paths:
+        try:
+            results.append((path, compute_metrics(Path(path), _worker_cascade, reduction), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def score_directory(
+    image_dir: Path,
+    metrics_path: Optional[Path] = None,
+    workers: int = 1,
+    chunk_size: int = 16,
+    cascade_path: str = CASCADE_PATH,
+    reduction: int = 2,
+    hash_cache_path: Optional[Path] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Brings the metrics table for `image_dir` up to date and returns it, one
+    row per image currently in the directory (sorted by name). Images whose
+    contents were scored before are never decoded again; the rest are
+    scored on `workers` processes like run_quality_gate. With a
+    `hash_cache_path`, files unchanged since the last run are not even
+    re-read to compute their content keys, so an up-to-date table costs
+    only a stat per image.
+    """
+    metrics_path = metrics_path or image_dir / METRICS_NAME
+    previous = load_metrics(metrics_path, reduction)
+    known = {key: i for i, key in enumerate(previous["key"].tolist())}
+
+    image_paths = sorted(list_images(image_dir))
+    hash_cache = HashCache(hash_cache_path) if hash_cache_path else None
+    try:
+        keys = dict(zip(image_paths, content_keys(image_paths, hash_cache)))
+    finally:
+        if hash_cache is not None:
+            hash_cache.close()
+    rows, missing = {}, []
+    for image_path in image_paths:
+        i = known.get(keys[image_path])
+        if i is None:
+            missing.append(str(image_path))
+        else:
+            rows[image_path.name] = {column: previous[column][i] for column in COLUMNS} | {"name": image_path.name}
+    print(f"📏 Scoring {len(missing)} images ({len(rows)} already in {metrics_path.name})...")
+
+    face_cascade = cv2.CascadeClassifier(cascade_path) if missing else None
+    if face_cascade is not None and face_cascade.empty():
+        print(f"❌ Error: Could not load face cascade model from {cascade_path}.")
+        return previous
+
+    chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    score_chunk = functools.partial(_score_chunk, reduction=reduction)
+    with map_chunks(score_chunk, chunks, workers, _init_worker, (cascade_path,)) as results:
+        for chunk in results:
+            for path, metrics, error in chunk:
+                if error is not None:
+                    print(f"Error processing {Path(path).name}: {error}")
+                else:
+                    rows[metrics["name"]] = metrics | {"key": keys[Path(path)]}
+
+    table = table_from_rows([rows[name] for name in sorted(rows)]) if rows else empty_table()
+    save_metrics(metrics_path, table, reduction)
+    return table
+
+
+def rejection_masks(
+    table: dict[str, np.ndarray],
+    min_resolution: int = 600,
+    blur_threshold: float = 100.0,
+    max_faces: int = 0,
+    min_brightness: Optional[float] = None,
+    max_brightness: Optional[float] = None,
+    max_clipped: Optional[float] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Evaluates a threshold set over the whole table at once. Returns one
+    boolean mask per check, in the gate's order; exposure checks only apply
+    when their thresholds are given. With the defaults this rejects exactly
+    what run_quality_gate rejects (given the same reduction).
+    """
+    masks = {
+        "resolution": np.minimum(table["width"], table["height"]) < min_resolution,
+        "blur": table["blur"] < blur_threshold,
+        "faces": table["faces"] > max_faces,
+    }
+    exposure = np.zeros(len(table["key"]), dtype=bool)
+    if min_brightness is not None:
+        exposure |= table["brightness"] < min_brightness
+    if max_brightness is not None:
+        exposure |= table["brightness"] > max_brightness
+    if max_clipped is not None:
+        exposure |= (table["shadows"] > max_clipped) | (table["highlights"] > max_clipped)
+    masks["exposure"] = exposure
+    return masks
+
+
+def preview(table: dict[str, np.ndarray], **thresholds) -> dict:
+    """Counts how many images each check, and the gate as a whole, would reject."""
+    masks = rejection_masks(table, **thresholds)
+    rejected = np.logical_or.reduce(list(masks.values())) if len(table["key"]) else np.zeros(0, dtype=bool)
+    return {
+        "images": len(table["key"]),
+        "rejected": int(rejected.sum()),
+        "by_check": {check: int(mask.sum()) for check, mask in masks.items()},
+    }
+
+
+def apply_gate(image_dir: Path, table: dict[str, np.ndarray], **thresholds) -> int:
+    """Moves every image the thresholds reject to the 'rejected' subdirectory. Returns the number moved."""
+    masks = rejection_masks(table, **thresholds)
+    rejected_dir = image_dir / "rejected"
+    rejected_dir.mkdir(exist_ok=True)
+    rejected_count = 0
+    for i, name in enumerate(table["name"].tolist()):
+        failed = [check for check, mask in masks.items() if mask[i]]
+        image_path = image_dir / name
+        if not failed or not image_path.exists():
+            continue
+        try:
+            shutil.move(image_path, rejected_dir / name)
+            print(f"-> Rejected {name}: {', '.join(failed)}")
+            rejected_count += 1
+        except Exception as e:
+            print(f"Error processing {name}: {e}")
+    print(f"✅ Quality gate complete. Rejected {rejected_count} images.")
+    return rejected_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score images once, then preview or apply quality thresholds.")
+    parser.add_argument("command", choices=["score", "preview", "apply"])
+    parser.add_argument("image_directory", type=str, help="Directory of images.")
+    parser.add_argument("--metrics", type=str, default=None, help=f"Metrics file (default: <dir>/{METRICS_NAME}).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes.")
+    parser.add_argument("--reduction", type=int, choices=[1, 2, 4, 8], default=2, help="Face-check decode scale.")
+    parser.add_argument(
+        "--hash-cache", type=str, default="data/hash_cache.sqlite", help="Content-key cache (empty to disable)."
+    )
+    parser.add_argument("--min-resolution", type=int, default=600)
+    parser.add_argument("--blur-threshold", type=float, default=100.0)
+    parser.add_argument("--max-faces", type=int, default=0)
+    parser.add_argument("--min-brightness", type=float, default=None, help="Reject darker images (mean, 0-255).")
+    parser.add_argument("--max-brightness", type=float, default=None, help="Reject brighter images (mean, 0-255).")
+    parser.add_argument(
+        "--max-clipped", type=float, default=None, help="Reject images with more crushed or blown pixels (0-1)."
+    )
+    args = parser.parse_args()
+
+    target_dir = Path(args.image_directory)
+    if not target_dir.is_dir():
+        print(f"Error: Directory not found at {target_dir}")
+    else:
+        metrics_file = Path(args.metrics) if args.metrics else None
+        # preview/apply only score images that are new since the last run
+        metrics_table = score_directory(
+            target_dir,
+            metrics_file,
+            workers=args.workers,
+            reduction=args.reduction,
+            hash_cache_path=Path(args.hash_cache) if args.hash_cache else None,
+        )
+        if args.command != "score":
+            gate_thresholds = {
+                "min_resolution": args.min_resolution,
+                "blur_threshold": args.blur_threshold,
+                "max_faces": args.max_faces,
+                "min_brightness": args.min_brightness,
+                "max_brightness": args.max_brightness,
+                "max_clipped": args.max_clipped,
+            }
+            if args.command == "preview":
+                summary = preview(metrics_table, **gate_thresholds)
+                print(f"Would reject {summary['rejected']} of {summary['images']} images.")
+                for check, count in summary["by_check"].items():
+                    print(f"  {check:<11}{count:>8}")
+            else:
+                apply_gate(target_dir, metrics_table, **gate_thresholds)
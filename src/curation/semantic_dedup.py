@@ -0,0 +1,158 @@
+# src/curation/semantic_dedup.py
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from curation.dedup import DUPLICATES_DIRNAME, quarantine, write_report
+from curation.duplicate_groups import UnionFind, pick_representative, representative_score
+from curation.embedding import embed_to_memmap, open_embedding_store
+from curation.hash_cache import HashCache
+from curation.similarity import similar_pairs
+from sentence_transformers import SentenceTransformer
+from shared.embedding_store import DEFAULT_STORE_DIR
+from shared.image_files import list_images
+
+REPORT_NAME = "semantic_dedup_report.json"
+
+
+def find_semantic_duplicates(
+    image_dir: Path,
+    threshold: float = 0.95,
+    model_name: str = "clip-ViT-L-14",
+    batch_size: int = 32,
+    block_size: int = 4096,
+    workers: Optional[int] = None,
+    store_dir: Optional[Path] = None,
+    hash_cache_path: Optional[Path] = None,
+):
+    """
+    Finds images that are semantically the same shot (crops, recolors, mirrored
+    copies) by CLIP cosine similarity, groups them with union-find and moves
+    all but the best member of each group to the 'duplicates' subdirectory,
+    like dedup.py does for hash duplicates.
+
+    Images are decoded on `workers` processes, embeddings are streamed to a
+    float16 memmap (see embedding.embed_to_memmap) and compared with a blocked
+    matrix multiply (see similarity.similar_pairs), so memory is bounded by
+    the block size rather than the number of images: 500k ViT-L/14 embeddings
+    are ~770 MB on disk and a 4096-row tile pair is 128 MB in RAM. With a
+    `store_dir`, embeddings computed by earlier runs are reused.
+    """
+    image_paths = sorted(list_images(image_dir))
+    if len(image_paths) < 2:
+        print(f"Not enough images ({len(image_paths)}) to compare. Skipping.")
+        return
+
+    print(f"Loading embedding model: {model_name}...")
+    model = SentenceTransformer(model_name)
+
+    store = open_embedding_store(store_dir, model_name, model) if store_dir else None
+    hash_cache = HashCache(hash_cache_path) if hash_cache_path else None
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            embeddings = embed_to_memmap(
+                image_paths,
+                model,
+                Path(tmp) / "embeddings.npy",
+                batch_size,
+                workers,
+                store=store,
+                hash_cache=hash_cache,
+            )
+        finally:
+            if hash_cache is not None:
+                hash_cache.close()
+
+        print(f"Comparing {len(image_paths)} embeddings (cosine >= {threshold})...")
+        uf = UnionFind(len(image_paths))
+        best = {}
+        for rows, cols, sims in similar_pairs(embeddings, threshold, block_size):
+            for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist()):
+                uf.union(i, j)
+                best[i] = max(best.get(i, 0.0), sim)
+                best[j] = max(best.get(j, 0.0), sim)
+        del embeddings
+
+    duplicates_dir = image_dir / DUPLICATES_DIRNAME
+    report_groups = []
+    duplicates_found = 0
+    for group in uf.groups():
+        members = [image_paths[i] for i in group]
+        try:
+            scores = {p: representative_score(p) for p in members}
+        except Exception as e:
+            print(f"Could not score duplicate group of {members[0].name}: {e}")
+            continue
+        keep = pick_representative(scores)
+
+        quarantined, quarantined_as = [], []
+        for image_path in members:
+            if image_path == keep:
+                continue
+            try:
+                quarantined_as.append(quarantine(image_path, duplicates_dir).name)
+                quarantined.append(image_path.name)
+                duplicates_found += 1
+            except Exception as e:
+                print(f"Could not quarantine {image_path.name}: {e}")
+
+        report_groups.append(
+            {
+                "kept": keep.name,
+                "quarantined": quarantined,
+                "quarantined_as": quarantined_as,
+                "members": [{"file": image_paths[i].name, "max_similarity": round(best[i], 4)} for i in group],
+            }
+        )
+
+    report = {
+        "image_dir": str(image_dir),
+        "model": model_name,
+        "threshold": threshold,
+        "images": len(image_paths),
+        "quarantined": duplicates_found,
+        "groups": report_groups,
+    }
+    if report_groups:
+        write_report(duplicates_dir, REPORT_NAME, report)
+
+    print(f"✅ Semantic dedup complete. Quarantined {duplicates_found} images from {len(report_groups)} groups.")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quarantine semantic near-duplicates using CLIP embeddings.")
+    parser.add_argument("image_directory", type=str, help="Directory of images to deduplicate.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.95, help="Cosine similarity at or above which images match."
+    )
+    parser.add_argument("--model", type=str, default="clip-ViT-L-14", help="SentenceTransformer CLIP model.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per encoder batch.")
+    parser.add_argument("--block-size", type=int, default=4096, help="Rows per similarity tile.")
+    parser.add_argument("--workers", type=int, default=None, help="Image decoding processes (default: one per core).")
+    parser.add_argument(
+        "--embedding-store",
+        type=str,
+        default=DEFAULT_STORE_DIR,
+        help="Persistent embedding store shared with curation and captioning. Pass an empty string to disable it.",
+    )
+    parser.add_argument(
+        "--hash-cache", type=str, default="data/hash_cache.sqlite", help="Content-key cache (empty to disable)."
+    )
+    args = parser.parse_args()
+
+    target_dir = Path(args.image_directory)
+    if not target_dir.is_dir():
+        print(f"Error: Directory not found at {target_dir}")
+    else:
+        find_semantic_duplicates(
+            target_dir,
+            args.threshold,
+            args.model,
+            args.batch_size,
+            args.block_size,
+            args.workers,
+            Path(args.embedding_store) if args.embedding_store else None,
+            Path(args.hash_cache) if args.hash_cache else None,
+        )
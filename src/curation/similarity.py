@@ -0,0 +1,39 @@
+# src/curation/similarity.py
+from typing import Iterator
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Returns float32 copies of the rows scaled to unit length (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def similar_pairs(
+    embeddings: np.ndarray, threshold: float, block_size: int = 4096
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yields (i, j, similarity) arrays for every pair i < j of unit-length rows
+    whose cosine similarity is at least `threshold`.
+
+    The upper triangle of the similarity matrix is computed one
+    block_size x block_size tile at a time with a float32 matrix multiply, so
+    peak memory is a few tiles regardless of n. `embeddings` may be a
+    (float16) memmap; only the two blocks of a tile are read into memory.
+    """
+    n = len(embeddings)
+    for start_i in range(0, n, block_size):
+        block_i = np.asarray(embeddings[start_i : start_i + block_size], dtype=np.float32)
+        for start_j in range(start_i, n, block_size):
+            block_j = (
+                block_i if start_j == start_i else np.asarray(embeddings[start_j : start_j + block_size], np.float32)
+            )
+            sims = block_i @ block_j.T
+            if start_j == start_i:
+                # Diagonal tile: keep the strict upper triangle only
+                sims[np.tril_indices(sims.shape[0], k=0, m=sims.shape[1])] = -np.inf
+            rows, cols = np.nonzero(sims >= threshold)
+            if len(rows):
+                yield rows + start_i, cols + start_j, sims[rows, cols]
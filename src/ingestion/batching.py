@@ -0,0 +1,136 @@
+# src/ingestion/batching.py
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+def _percentiles(values: Iterable[float]) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[-1], 3)}
+
+
+class BatchTrigger:
+    """
+    Coalesces newly ingested frames into downstream batches.
+
+    A batch fires when `max_batch_size` frames are waiting or the oldest waiting
+    frame is `max_wait` seconds old, whichever comes first. Batches run one at a
+    time on a background thread; frames that arrive while a batch is in flight
+    wait for the next one. Batch sizes and frame latency (arrival to batch
+    completion) are kept for tuning the watermark against freshness.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[Path]], None],
+        max_batch_size: int = 256,
+        max_wait: float = 300.0,
+        history: int = 1000,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: list[tuple[float, Path]] = []
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = False
+
+        self._batches = 0
+        self._failed_batches = 0
+        self._frames = 0
+        self._sizes: deque = deque(maxlen=history)
+        self._latencies: deque = deque(maxlen=history)
+        self._durations: deque = deque(maxlen=history)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop, name="batch-trigger", daemon=True)
+        self._thread.start()
+
+    def add(self, frames: Iterable[Path]):
+        """Adds newly ingested frames. Never blocks on a running batch."""
+        now = time.monotonic()
+        with self._cond:
+            self._pending.extend((now, Path(f)) for f in frames)
+            self._cond.notify_all()
+
+    def stop(self, flush: bool = True):
+        """Stops the trigger. With `flush`, whatever is still pending runs as a final batch."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush and self._pending:
+            self._run(self._take())
+
+    def _ready(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._pending[0][0] >= self.max_wait
+
+    def _take(self) -> list[tuple[float, Path]]:
+        with self._cond:
+            batch, self._pending = self._pending, []
+            return batch
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stop and not self._ready():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.max_wait - (time.monotonic() - self._pending[0][0]))
+                    self._cond.wait(timeout)
+                if self._stop:
+                    return
+            self._run(self._take())
+
+    def _run(self, batch: list[tuple[float, Path]]):
+        with self._cond:
+            self._in_flight = True
+        started = time.monotonic()
+        failed = False
+        try:
+            self.run_batch([path for _, path in batch])
+        except Exception as e:
+            failed = True
+            print(f"Downstream batch of {len(batch)} frames failed: {e}")
+        finished = time.monotonic()
+
+        with self._cond:
+            self._in_flight = False
+            self._batches += 1
+            self._failed_batches += failed
+            self._frames += len(batch)
+            self._sizes.append(len(batch))
+            self._durations.append(finished - started)
+            self._latencies.extend(finished - arrived for arrived, _ in batch)
+
+    def summary(self) -> dict:
+        with self._cond:
+            return {
+                "batches": self._batches,
+                "failed_batches": self._failed_batches,
+                "frames": self._frames,
+                "pending": len(self._pending),
+                "in_flight": self._in_flight,
+                "batch_size": _percentiles(self._sizes),
+                "batch_duration_s": _percentiles(self._durations),
+                "frame_latency_s": _percentiles(self._latencies),
+            }
@@ -0,0 +1,73 @@
+# src/ingestion/config.py
+import json
+from pathlib import Path
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .extract import FrameFilters
+
+
+class IngestionConfig(BaseModel):
+    """A Pydantic model for the hot-folder ingestion settings."""
+
+    output_dir: str = "data/ingested"
+    scene_threshold: float = Field(0.4, ge=0.0, le=1.0)
+    # See extract.EXTRACTION_STRATEGIES
+    extraction_strategy: Literal["scene", "keyframe", "keyframe_scene"] = "scene"
+    # Video frame output format (see extract.FRAME_FORMATS)
+    frame_format: Literal["png", "webp", "jpg", "npy"] = "png"
+    # Decode video frames in memory instead of having ffmpeg write every frame
+    streaming: bool = False
+    # Concurrent ffmpeg time segments per video (1 = single process, 0 = one per CPU core)
+    segments: int = Field(1, ge=0)
+
+    # In-ffmpeg frame filters (see extract.FrameFilters); null disables a filter
+    max_blur: Optional[float] = Field(None, gt=0.0)
+    drop_near_duplicates: bool = False
+    max_short_edge: Optional[int] = Field(None, gt=0)
+    # Cap on the long edge of image sources, with EXIF orientation baked in; null keeps images as dropped
+    max_edge: Optional[int] = Field(None, gt=0)
+
+    # SQLite index of already-ingested sources; re-dropped files are skipped. Empty disables it.
+    index_path: str = "data/ingestion_index.sqlite"
+    # Write-ahead journal of ingestion units, so a crash mid-extraction resumes cleanly. Empty disables it.
+    journal_path: str = "data/ingestion_journal.jsonl"
+    # Persistent perceptual-hash cache for downstream dedup. Empty disables it.
+    hash_cache_path: str = "data/hash_cache.sqlite"
+
+    # Worker pool sizing
+    max_workers: int = Field(4, gt=0)
+    max_queue_size: int = Field(256, gt=0)
+    use_processes: bool = False
+
+    # A file is only processed once its size and mtime stop changing
+    stability_interval: float = Field(1.0, gt=0.0)
+    stability_checks: int = Field(2, gt=0)
+    # A file still zero bytes after this many unchanged polls is skipped
+    empty_checks: int = Field(30, gt=0)
+
+    # Downstream curation runs on batches of new frames: when this many are waiting
+    # or the oldest has waited pipeline_max_wait seconds. 0 disables it.
+    pipeline_batch_size: int = Field(256, ge=0)
+    pipeline_max_wait: float = Field(300.0, gt=0.0)
+
+    # How often the watcher prints throughput / queue-depth counters (seconds)
+    stats_interval: float = Field(30.0, gt=0.0)
+
+    def frame_filters(self) -> Optional[FrameFilters]:
+        """Returns the in-ffmpeg frame filters, or None if none are enabled."""
+        if self.max_blur is None and not self.drop_near_duplicates and self.max_short_edge is None:
+            return None
+        return FrameFilters(self.max_blur, self.drop_near_duplicates, self.max_short_edge)
+
+
+def load_ingestion_config(path: Path) -> IngestionConfig:
+    """Loads and validates the ingestion config from a JSON file."""
+    if not path.exists():
+        raise FileNotFoundError(f"Ingestion config not found at: {path}")
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    return IngestionConfig(**data)
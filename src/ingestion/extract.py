@@ -1,15 +1,458 @@
 # src/ingestion/extract.py
+import os
+import queue
+import re
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
 
 import ffmpeg
 import magic
+import numpy as np
+from PIL import Image
+
+from .index import IngestionIndex, hash_file, link_or_copy
+from .journal import COMMITTED, EXTRACTED, IngestionJournal, fsync_path, unit_lock
+from .normalize import normalize_image, sidecar_path, write_sidecar
 
 VIDEO_MIMETYPES = ["video/mp4", "video/quicktime", "video/x-matroska"]
 IMAGE_MIMETYPES = ["image/jpeg", "image/png", "image/webp"]
 
+# showinfo logs one line per frame that reaches it, e.g. "[tap_out @ 0x..] n:   3 pts: 1234 pts_time:4.1 ..."
+_SHOWINFO_RE = re.compile(r"\bn:\s*(\d+)\b.*?\bpts_time:\s*([-+\d.eE]+|nan)")
+# Every showinfo in our graphs is named "showinfo@tap_<stage>" so its log lines can be told apart
+_TAP_RE = re.compile(r"^\[[^\]]*?\b(tap_[a-z]+)")
+
+# How video frames are selected:
+#   scene:          decode every frame, keep those whose scene-change score exceeds the threshold
+#   keyframe:       decode only I-frames (non-key frames are skipped inside the decoder) and keep them all
+#   keyframe_scene: decode only I-frames and keep those whose score against the previous keyframe exceeds the threshold
+EXTRACTION_STRATEGIES = ("scene", "keyframe", "keyframe_scene")
+
+# Frame output formats -> ffmpeg image2 output options. "npy" frames are raw HxWx3 RGB uint8
+# arrays saved with np.save; ffmpeg can't write them, so they always go through the streaming path.
+FRAME_FORMATS = {
+    "png": {},
+    "webp": {"vcodec": "libwebp", "lossless": 1, "compression_level": 4},
+    "jpg": {"q:v": 2},
+    "npy": None,
+}
+
+# Segments shorter than this are not worth an extra ffmpeg process
+MIN_SEGMENT_SECONDS = 30.0
+# Frames from neighbouring segments closer than this are treated as the same frame
+BOUNDARY_TOLERANCE_SECONDS = 0.05
+
+
+@dataclass
+class ExtractedFrame:
+    """A single decoded frame streamed out of ffmpeg."""
+
+    index: int  # 1-based, matches the %05d numbering of the file-based path
+    timestamp: float  # seconds from the start of the video
+    image: np.ndarray  # HxWx3 RGB uint8
+
+
+def probe_video(file_path: Path) -> dict:
+    """
+    Returns the display width, height and duration (seconds) of the first video stream.
+    Width and height account for rotation metadata, since ffmpeg autorotates on decode.
+    """
+    info = ffmpeg.probe(str(file_path))
+    stream = next(s for s in info["streams"] if s.get("codec_type") == "video")
+    width, height = int(stream["width"]), int(stream["height"])
+
+    rotation = int(stream.get("tags", {}).get("rotate", 0))
+    for side_data in stream.get("side_data_list", []):
+        rotation = int(side_data.get("rotation", rotation))
+    if abs(rotation) % 180 == 90:
+        width, height = height, width
+
+    duration = float(stream.get("duration") or info.get("format", {}).get("duration") or 0.0)
+    num, _, den = stream.get("avg_frame_rate", "0/1").partition("/")
+    frame_rate = float(num) / float(den) if den and float(den) else 0.0
+    return {"width": width, "height": height, "duration": duration, "frame_rate": frame_rate}
+
+
+@dataclass
+class FrameFilters:
+    """
+    Filters applied inside the ffmpeg graph, after frame selection and before
+    anything is written, so rejected frames are never encoded.
+    """
+
+    # Drop frames whose `blurdetect` score (mean edge width in pixels) is at or above this
+    max_blur: Optional[float] = None
+    # Drop frames that `mpdecimate` considers near-identical to the previous kept frame
+    drop_near_duplicates: bool = False
+    # Downscale so the short edge is at most this many pixels (never upscales)
+    max_short_edge: Optional[int] = None
+    # Filled in after extraction: frames reaching each stage (see _filter_counts)
+    counts: dict = field(default_factory=dict)
+
+
+def _selected_frames(file_path: Path, strategy: str, scene_threshold: float, **input_kwargs):
+    """Builds the ffmpeg input + frame selection for an extraction strategy."""
+    if strategy not in EXTRACTION_STRATEGIES:
+        raise ValueError(f"Unknown extraction strategy '{strategy}'. Expected one of {EXTRACTION_STRATEGIES}.")
+
+    if strategy == "scene":
+        stream = ffmpeg.input(str(file_path), **input_kwargs)
+    else:
+        stream = ffmpeg.input(str(file_path), skip_frame="nokey", **input_kwargs)
+
+    if strategy == "keyframe":
+        return stream
+    return stream.filter("select", f"gt(scene,{scene_threshold})")
+
+
+def _frame_graph(
+    file_path: Path, strategy: str, scene_threshold: float, filters: Optional[FrameFilters] = None, **input_kwargs
+):
+    """
+    Builds the full per-frame graph: selection, optional in-graph filters, and
+    named showinfo taps. `tap_out` always logs the frames that are output.
+    """
+    stream = _selected_frames(file_path, strategy, scene_threshold, **input_kwargs)
+    if filters is not None:
+        stream = stream.filter("showinfo@tap_selected")
+        if filters.max_blur is not None:
+            stream = (
+                stream.filter("blurdetect")
+                .filter("metadata", mode="select", key="lavfi.blur", value=filters.max_blur, function="less")
+                .filter("showinfo@tap_sharp")
+            )
+        if filters.drop_near_duplicates:
+            stream = stream.filter("mpdecimate").filter("showinfo@tap_unique")
+        if filters.max_short_edge is not None:
+            n = filters.max_short_edge
+            stream = stream.filter("scale", w=f"if(lt(iw,ih),min(iw,{n}),-2)", h=f"if(lt(iw,ih),-2,min(ih,{n}))")
+    return stream.filter("showinfo@tap_out")
+
+
+def _output_size(width: int, height: int, filters: Optional[FrameFilters]) -> tuple[int, int]:
+    """
+    Mirrors the scale expression in _frame_graph, including ffmpeg's rounding
+    for -2: av_rescale rounds halves away from zero, not to even like round().
+    """
+    if filters is None or filters.max_short_edge is None:
+        return width, height
+    n = filters.max_short_edge
+    if width < height:
+        new_w = min(width, n)
+        return new_w, (new_w * height + width) // (width * 2) * 2
+    new_h = min(height, n)
+    return (new_h * width + height) // (height * 2) * 2, new_h
+
+
+def _parse_showinfo_line(line: str) -> Optional[tuple[str, float]]:
+    """Returns (tap name, pts_time) for a showinfo frame line, else None."""
+    # ffmpeg's progress line ends in \r, not \n, so a showinfo line can arrive glued to one
+    line = line.rsplit("\r", 1)[-1]
+    tap = _TAP_RE.match(line)
+    if tap is None:
+        return None
+    match = _SHOWINFO_RE.search(line)
+    if match is None:
+        return None
+    return tap.group(1), float(match.group(2))
+
+
+def _filter_counts(tap_counts: dict) -> dict:
+    """Turns per-tap frame counts into per-filter drop counts."""
+    selected = tap_counts.get("tap_selected", tap_counts.get("tap_out", 0))
+    sharp = tap_counts.get("tap_sharp", selected)
+    unique = tap_counts.get("tap_unique", sharp)
+    return {
+        "selected": selected,
+        "blurry": selected - sharp,
+        "near_duplicate": sharp - unique,
+        "kept": tap_counts.get("tap_out", 0),
+    }
+
+
+def _read_showinfo(stderr, timestamps: queue.Queue, tap_counts: dict, log: list):
+    """Drains ffmpeg's stderr, forwarding output-frame timestamps as they appear."""
+    for raw_line in iter(stderr.readline, b""):
+        log.append(raw_line)
+        parsed = _parse_showinfo_line(raw_line.decode(errors="replace"))
+        if parsed is None:
+            continue
+        tap, timestamp = parsed
+        tap_counts[tap] = tap_counts.get(tap, 0) + 1
+        if tap == "tap_out":
+            timestamps.put(timestamp)
+    timestamps.put(None)
+
+
+def iter_video_frames(
+    file_path: Path,
+    scene_threshold: float = 0.4,
+    strategy: str = "scene",
+    filters: Optional[FrameFilters] = None,
+) -> Iterator[ExtractedFrame]:
+    """
+    Streams scene-change frames out of ffmpeg's stdout as RGB NumPy arrays,
+    without writing anything to disk. `filters.counts` is filled in once the
+    stream is exhausted.
+
+    Raises:
+        ffmpeg.Error: If ffmpeg exits with a non-zero status.
+    """
+    info = probe_video(file_path)
+    width, height = _output_size(info["width"], info["height"], filters)
+    frame_size = width * height * 3
+
+    process = (
+        _frame_graph(file_path, strategy, scene_threshold, filters)
+        .output("pipe:", format="rawvideo", pix_fmt="rgb24", vsync="vfr")
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+
+    timestamps: queue.Queue = queue.Queue()
+    tap_counts: dict = {}
+    stderr_log: list[bytes] = []
+    reader = threading.Thread(
+        target=_read_showinfo, args=(process.stderr, timestamps, tap_counts, stderr_log), daemon=True
+    )
+    reader.start()
+
+    try:
+        index = 0
+        while True:
+            buffer = process.stdout.read(frame_size)
+            if len(buffer) < frame_size:
+                break
+            index += 1
+            try:
+                timestamp = timestamps.get(timeout=5.0)
+            except queue.Empty:
+                timestamp = None
+            yield ExtractedFrame(
+                index=index,
+                timestamp=float("nan") if timestamp is None else timestamp,
+                image=np.frombuffer(buffer, np.uint8).reshape(height, width, 3),
+            )
+
+        process.wait()
+        reader.join()
+        if process.returncode != 0:
+            raise ffmpeg.Error("ffmpeg", b"", b"".join(stderr_log))
+        if filters is not None:
+            filters.counts = _filter_counts(tap_counts)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def _check_frame_format(frame_format: str):
+    if frame_format not in FRAME_FORMATS:
+        raise ValueError(f"Unknown frame format '{frame_format}'. Expected one of {tuple(FRAME_FORMATS)}.")
+
+
+def write_frames(
+    frames: Iterable[ExtractedFrame], output_dir: Path, stem: str, frame_format: str = "png"
+) -> list[Path]:
+    """Writes streamed frames to `{stem}_{index:05d}.{frame_format}` and returns the paths."""
+    _check_frame_format(frame_format)
+    output_paths = []
+    for frame in frames:
+        frame_path = output_dir / f"{stem}_{frame.index:05d}.{frame_format}"
+        if frame_format == "npy":
+            np.save(frame_path, frame.image)
+        elif frame_format == "webp":
+            Image.fromarray(frame.image).save(frame_path, lossless=True, method=4)
+        elif frame_format == "jpg":
+            Image.fromarray(frame.image).save(frame_path, quality=95)
+        else:
+            Image.fromarray(frame.image).save(frame_path)
+        output_paths.append(frame_path)
+    return output_paths
+
+
+def _parse_showinfo(stderr: bytes) -> tuple[list[float], dict]:
+    """Returns the output-frame timestamps (in order) and the frame count seen by every tap."""
+    timestamps = []
+    tap_counts: dict = {}
+    for line in stderr.decode(errors="replace").splitlines():
+        parsed = _parse_showinfo_line(line)
+        if parsed is None:
+            continue
+        tap, timestamp = parsed
+        tap_counts[tap] = tap_counts.get(tap, 0) + 1
+        if tap == "tap_out":
+            timestamps.append(timestamp)
+    return timestamps, tap_counts
+
+
+def extract_video_frames(
+    file_path: Path,
+    output_dir: Path,
+    scene_threshold: float = 0.4,
+    strategy: str = "scene",
+    filters: Optional[FrameFilters] = None,
+    frame_format: str = "png",
+) -> list[Path]:
+    """Runs a single ffmpeg process that writes every selected frame as an image."""
+    _check_frame_format(frame_format)
+    if FRAME_FORMATS[frame_format] is None:
+        frames = iter_video_frames(file_path, scene_threshold, strategy, filters)
+        return write_frames(frames, output_dir, file_path.stem, frame_format)
+
+    output_pattern = str(output_dir / f"{file_path.stem}_%05d.{frame_format}")
+    _, stderr = (
+        _frame_graph(file_path, strategy, scene_threshold, filters)
+        .output(output_pattern, vsync="vfr", **FRAME_FORMATS[frame_format])
+        .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+    )
+    if filters is not None:
+        filters.counts = _filter_counts(_parse_showinfo(stderr)[1])
+    return sorted(list(output_dir.glob(f"{file_path.stem}_*.{frame_format}")))
+
+
+def _segment_bounds(duration: float, segments: int, overlap: float) -> list[tuple[float, float, float]]:
+    """
+    Splits [0, duration) into `segments` equal parts.
+
+    Returns (decode_start, own_start, own_end) per segment. Each segment starts
+    decoding `overlap` seconds before the part it owns so the scene filter has a
+    previous frame to compare against at the boundary.
+    """
+    length = duration / segments
+    bounds = []
+    for k in range(segments):
+        own_start = k * length
+        own_end = duration if k == segments - 1 else (k + 1) * length
+        bounds.append((max(0.0, own_start - overlap), own_start, own_end))
+    return bounds
+
+
+def _extract_segment(
+    file_path: Path,
+    work_dir: Path,
+    k: int,
+    decode_start: float,
+    decode_end: float,
+    scene_threshold: float,
+    strategy: str,
+    filters: Optional[FrameFilters],
+    frame_format: str,
+) -> tuple[list[tuple[float, Path]], dict]:
+    """
+    Decodes one time segment into `work_dir`. Returns (absolute timestamp, frame path)
+    pairs and the per-tap frame counts.
+    """
+    output_pattern = str(work_dir / f"seg{k:03d}_%05d.{frame_format}")
+    _, stderr = (
+        _frame_graph(file_path, strategy, scene_threshold, filters, ss=decode_start, t=decode_end - decode_start)
+        .output(output_pattern, vsync="vfr", **FRAME_FORMATS[frame_format])
+        .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+    )
+    frame_paths = sorted(work_dir.glob(f"seg{k:03d}_*.{frame_format}"))
+    timestamps, tap_counts = _parse_showinfo(stderr)
+    # Input seeking resets timestamps to zero at decode_start
+    return [(decode_start + ts, path) for ts, path in zip(timestamps, frame_paths)], tap_counts
+
+
+def extract_video_segmented(
+    file_path: Path,
+    output_dir: Path,
+    scene_threshold: float = 0.4,
+    segments: Optional[int] = None,
+    overlap: float = 2.0,
+    strategy: str = "scene",
+    filters: Optional[FrameFilters] = None,
+    frame_format: str = "png",
+) -> list[Path]:
+    """
+    Splits a video into time segments and decodes them concurrently, one ffmpeg
+    process per segment. Frames are merged in timestamp order, keeping only the
+    frames each segment owns, and renamed to the usual `{stem}_%05d.png` scheme.
+
+    Args:
+        segments: Number of concurrent ffmpeg processes. Defaults to the CPU count.
+        overlap: Seconds decoded before each segment's start so scene changes
+                 right at the boundary are still detected.
+        filters: Optional in-graph filters. Their counts are summed over
+                 segments, so frames in the overlaps are counted twice.
+        frame_format: Output format. "npy" can't be written by ffmpeg and
+                      falls back to the single-process streaming path.
+    """
+    _check_frame_format(frame_format)
+    duration = probe_video(file_path)["duration"]
+    segments = segments or os.cpu_count() or 1
+    segments = max(1, min(segments, int(duration // MIN_SEGMENT_SECONDS)))
+    if segments == 1 or FRAME_FORMATS[frame_format] is None:
+        return extract_video_frames(file_path, output_dir, scene_threshold, strategy, filters, frame_format)
+
+    bounds = _segment_bounds(duration, segments, overlap)
+    work_dir = Path(tempfile.mkdtemp(prefix=f".{file_path.stem}-segments-", dir=output_dir))
+    try:
+        with ThreadPoolExecutor(max_workers=segments) as pool:
+            futures = [
+                pool.submit(
+                    _extract_segment,
+                    file_path,
+                    work_dir,
+                    k,
+                    decode_start,
+                    own_end,
+                    scene_threshold,
+                    strategy,
+                    filters,
+                    frame_format,
+                )
+                for k, (decode_start, _, own_end) in enumerate(bounds)
+            ]
+            results = [future.result() for future in futures]
+
+        if filters is not None:
+            total_counts: dict = {}
+            for _, tap_counts in results:
+                for tap, n in tap_counts.items():
+                    total_counts[tap] = total_counts.get(tap, 0) + n
+            filters.counts = _filter_counts(total_counts)
+
+        owned = []
+        for k, ((_, own_start, own_end), (frames, _)) in enumerate(zip(bounds, results)):
+            is_last = k == len(bounds) - 1
+            owned.extend((ts, path) for ts, path in frames if own_start <= ts and (ts < own_end or is_last))
+        owned.sort(key=lambda item: item[0])
+
+        output_paths = []
+        last_ts = None
+        for ts, path in owned:
+            if last_ts is not None and ts - last_ts < BOUNDARY_TOLERANCE_SECONDS:
+                continue
+            last_ts = ts
+            new_path = output_dir / f"{file_path.stem}_{len(output_paths) + 1:05d}.{frame_format}"
+            os.replace(path, new_path)
+            output_paths.append(new_path)
+        return output_paths
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
-def process_source_file(file_path: Path, output_dir: Path, scene_threshold: float = 0.4) -> list[Path]:
+
+def process_source_file(
+    file_path: Path,
+    output_dir: Path,
+    scene_threshold: float = 0.4,
+    streaming: bool = False,
+    frame_filter: Optional[Callable[[ExtractedFrame], bool]] = None,
+    segments: int = 1,
+    index: Optional[IngestionIndex] = None,
+    strategy: str = "scene",
+    filters: Optional[FrameFilters] = None,
+    frame_format: str = "png",
+    journal: Optional[IngestionJournal] = None,
+    max_edge: Optional[int] = None,
+) -> list[Path]:
     """
     Processes a single source file (image or video) and standardizes it
     into frames using scene-change detection for videos.
@@ -19,43 +462,207 @@ def process_source_file(file_path: Path, output_dir: Path, scene_threshold: floa
         output_dir: Directory to save the extracted frames.
         scene_threshold: Threshold for scene change detection (0.0 to 1.0).
                          Lower values detect more scenes.
+        streaming: Decode video frames in memory instead of having ffmpeg
+                   write every scene-change frame to disk.
+        frame_filter: Optional predicate applied to streamed frames. Only
+                      frames it accepts are written. Implies `streaming`.
+        segments: Decode long videos as this many concurrent time segments.
+                  1 keeps the single-process path; 0 uses one per CPU core.
+        index: Optional content-addressed index of already-ingested sources.
+               A source whose SHA-256 is already recorded is removed from the
+               drop folder without being re-extracted.
+        strategy: Video frame selection strategy, one of EXTRACTION_STRATEGIES.
+                  "keyframe" and "keyframe_scene" skip non-key frames at the
+                  decoder and are much faster on long, static sources.
+        filters: Optional blur / near-duplicate / downscale filters applied
+                 inside ffmpeg, before any frame is written.
+        frame_format: Video frame output format, one of FRAME_FORMATS ("png",
+                      lossless "webp", high-quality "jpg", or raw "npy").
+        journal: Optional write-ahead journal. Frames are always staged in a
+                 hidden work directory and renamed into `output_dir`; with a
+                 journal, a source interrupted by a crash resumes from its
+                 last recorded step instead of being decoded again.
+        max_edge: Optional cap on the long edge of image sources. Images are
+                  written with their EXIF orientation baked in; downscaled
+                  images (and video frames downscaled by `filters`) get a
+                  `.meta.json` sidecar recording the original size.
 
     Returns:
-        A list of file paths for the extracted frames.
+        A list of file paths for the extracted frames. Empty for sources
+        that were already ingested.
     """
     output_dir.mkdir(parents=True, exist_ok=True)
+
+    sha256 = None
+    if index is not None or journal is not None:
+        sha256 = hash_file(file_path)
+    if index is not None and index.contains(sha256):
+        print(f"⏭️  Already ingested, skipping: {file_path.name}")
+        file_path.unlink()
+        return []
+
+    kwargs = dict(
+        scene_threshold=scene_threshold,
+        streaming=streaming,
+        frame_filter=frame_filter,
+        segments=segments,
+        index=index,
+        strategy=strategy,
+        filters=filters,
+        frame_format=frame_format,
+        journal=journal,
+        max_edge=max_edge,
+    )
+    if journal is None:
+        return _ingest_unit(file_path, output_dir, sha256, **kwargs)
+    # Identical content in flight on another worker shares this unit: wait for it, then act on its outcome
+    with unit_lock(output_dir / f".ingest-{sha256[:16]}.lock"):
+        return _ingest_unit(file_path, output_dir, sha256, **kwargs)
+
+
+def _ingest_unit(
+    file_path: Path,
+    output_dir: Path,
+    sha256: Optional[str],
+    scene_threshold: float,
+    streaming: bool,
+    frame_filter: Optional[Callable[[ExtractedFrame], bool]],
+    segments: int,
+    index: Optional[IngestionIndex],
+    strategy: str,
+    filters: Optional[FrameFilters],
+    frame_format: str,
+    journal: Optional[IngestionJournal],
+    max_edge: Optional[int],
+) -> list[Path]:
+    """The body of process_source_file, run while holding the unit's lock when there is a journal."""
     mime_type = magic.from_file(file_path, mime=True)
+    source_size = file_path.stat().st_size
+    if mime_type not in IMAGE_MIMETYPES and mime_type not in VIDEO_MIMETYPES:
+        print(f"⚠️ Unsupported file type '{mime_type}'. Skipping {file_path.name}")
+        return []
 
-    output_paths = []
+    if journal is not None:
+        record = journal.state(sha256)
+        state = record["state"] if record is not None else None
+        if state == COMMITTED:
+            # Crashed after committing but before the source was removed
+            print(f"⏭️  Already committed, removing leftover source: {file_path.name}")
+            file_path.unlink()
+            return []
+        if state == EXTRACTED:
+            print(f"♻️  Resuming interrupted unit: {file_path.name}")
+            output_paths = _move_into_place(Path(record["work_dir"]), [Path(p) for p in record["frames"]])
+            return _finish_unit(file_path, sha256, source_size, mime_type, output_paths, index, journal)
+        work_dir = output_dir / f".ingest-{sha256[:16]}"
+        # Partial output from an interrupted attempt is never trusted. No live attempt can own it: they hold the lock.
+        shutil.rmtree(work_dir, ignore_errors=True)
+        work_dir.mkdir()
+        journal.begin(sha256, file_path, work_dir)
+    else:
+        work_dir = Path(tempfile.mkdtemp(prefix=".ingest-", dir=output_dir))
+
+    frame_paths = []
 
     if mime_type in IMAGE_MIMETYPES:
         print(f"🖼️  Processing as Image: {file_path.name}")
-        new_path = output_dir / file_path.name
-        shutil.copy(file_path, new_path)
-        output_paths.append(new_path)
+        new_path = work_dir / file_path.name
+        if max_edge is not None:
+            normalize_image(file_path, new_path, max_edge)
+        else:
+            link_or_copy(file_path, new_path)
+        frame_paths.append(new_path)
+
+    else:
+        print(f"🎬 Processing as Video ({strategy}, threshold={scene_threshold}): {file_path.name}")
 
-    elif mime_type in VIDEO_MIMETYPES:
-        print(f"🎬 Processing as Video with scene detection (threshold={scene_threshold}): {file_path.name}")
-        output_pattern = str(output_dir / f"{file_path.stem}_%05d.png")
+        if filters is not None:
+            # Each call gets its own copy so concurrent workers don't share counts
+            filters = FrameFilters(filters.max_blur, filters.drop_near_duplicates, filters.max_short_edge)
 
         try:
-            (
-                ffmpeg.input(file_path)
-                .filter("select", f"gt(scene,{scene_threshold})")
-                .vsync("vfr")
-                .output(output_pattern, qscale_v=2)  # Using qscale_v for high quality PNGs
-                .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
-            )
-            output_paths = sorted(list(output_dir.glob(f"{file_path.stem}_*.png")))
-            print(f"   -> Extracted {len(output_paths)} frames.")
+            if streaming or frame_filter is not None:
+                frames = iter_video_frames(file_path, scene_threshold, strategy, filters)
+                if frame_filter is not None:
+                    frames = filter(frame_filter, frames)
+                frame_paths = write_frames(frames, work_dir, file_path.stem, frame_format)
+            elif segments != 1:
+                frame_paths = extract_video_segmented(
+                    file_path,
+                    work_dir,
+                    scene_threshold,
+                    segments or None,
+                    strategy=strategy,
+                    filters=filters,
+                    frame_format=frame_format,
+                )
+            else:
+                frame_paths = extract_video_frames(
+                    file_path, work_dir, scene_threshold, strategy, filters, frame_format
+                )
+            print(f"   -> Extracted {len(frame_paths)} frames.")
+            if frame_paths and filters is not None and filters.max_short_edge is not None:
+                info = probe_video(file_path)
+                original_size = (info["height"], info["width"])
+                width, height = _output_size(info["width"], info["height"], filters)
+                if (height, width) != original_size:
+                    for p in frame_paths:
+                        write_sidecar(p, original_size, (height, width))
+            if filters is not None:
+                counts = filters.counts
+                print(
+                    f"   -> Filters: {counts['selected']} selected, dropped {counts['blurry']} blurry "
+                    f"and {counts['near_duplicate']} near-duplicate."
+                )
         except ffmpeg.Error as e:
             print("FFmpeg Error:")
             print(e.stderr.decode())
+            shutil.rmtree(work_dir, ignore_errors=True)
+            if journal is not None:
+                journal.abandon(sha256)
             return []
 
-    else:
-        print(f"⚠️ Unsupported file type '{mime_type}'. Skipping {file_path.name}")
-        return []
+    output_paths = [output_dir / p.name for p in frame_paths]
+    if journal is not None:
+        for p in frame_paths:
+            fsync_path(p)
+        journal.extracted(sha256, output_paths)
+
+    _move_into_place(work_dir, output_paths)
+    return _finish_unit(file_path, sha256, source_size, mime_type, output_paths, index, journal)
+
+
+def _move_into_place(work_dir: Path, output_paths: list[Path]) -> list[Path]:
+    """
+    Atomically renames each frame from `work_dir` to its final path. Frames that
+    are already in place (a resumed unit) are skipped. A frame's sidecar is moved
+    before the frame itself, so a visible frame always has its metadata.
+    """
+    for final_path in output_paths:
+        staged = work_dir / final_path.name
+        if sidecar_path(staged).exists():
+            os.replace(sidecar_path(staged), sidecar_path(final_path))
+        if staged.exists():
+            os.replace(staged, final_path)
+    if output_paths:
+        fsync_path(output_paths[0].parent)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return output_paths
+
+
+def _finish_unit(
+    file_path: Path,
+    sha256: Optional[str],
+    source_size: int,
+    mime_type: str,
+    output_paths: list[Path],
+    index: Optional[IngestionIndex],
+    journal: Optional[IngestionJournal],
+) -> list[Path]:
+    if index is not None:
+        index.record(sha256, source_size, mime_type, file_path.name, output_paths)
+    if journal is not None:
+        journal.commit(sha256)
 
     # Clean up the original file from the drop folder after processing
     file_path.unlink()
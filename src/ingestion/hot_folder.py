@@ -1,32 +1,129 @@
+import argparse
 import time
+from pathlib import Path
+from typing import Optional
 
+from curation.dedup import find_and_remove_duplicates
+from curation.quality_gate import run_quality_gate
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+from . import processing
+from .batching import BatchTrigger
+from .config import IngestionConfig, load_ingestion_config
+from .index import IngestionIndex
+from .journal import IngestionJournal
 from .processing import queue_new_file
 
 
 class IngestionHandler(FileSystemEventHandler):
     def on_created(self, event):
         if not event.is_directory:
-            print(f"New file detected: {event.src_path}")
-            queue_new_file(event.src_path)
+            self._queue(event.src_path)
 
+    def on_moved(self, event):
+        # rsync and most copy tools write to a temporary name and rename at the end
+        if not event.is_directory:
+            self._queue(event.dest_path)
+
+    def _queue(self, file_path: str):
+        if Path(file_path).name.startswith("."):
+            return
+        print(f"New file detected: {file_path}")
+        queue_new_file(file_path)
+
+
+def run_downstream_batch(output_dir: Path, frames: list[Path], hash_cache_path: Optional[Path] = None):
+    """
+    Runs the curation stages once for a batch of new frames. Deduplication
+    looks at the whole output directory (new frames can duplicate old ones,
+    and the hash cache keeps old frames cheap); the quality gate only checks
+    the batch's frames that survived it, since older frames already passed.
+    """
+    print(f"🚚 Running downstream batch for {len(frames)} new frames...")
+    find_and_remove_duplicates(output_dir, cache_path=hash_cache_path)
+    run_quality_gate(output_dir, image_paths=frames)
+
+
+def start_watching(path: str, config: Optional[IngestionConfig] = None):
+    config = config or IngestionConfig()
+    output_dir = Path(config.output_dir)
+    index = IngestionIndex(Path(config.index_path)) if config.index_path else None
+    journal = IngestionJournal(Path(config.journal_path)) if config.journal_path else None
+
+    # Resume anything a previous run left unfinished. Must happen before any worker starts.
+    leftovers = set()
+    if journal is not None:
+        leftovers.update(journal.recover())
+        journal.compact()
+    # Files dropped while the watcher was down never produce an event
+    leftovers.update(p for p in Path(path).rglob("*") if p.is_file() and not p.name.startswith("."))
+
+    trigger = None
+    if config.pipeline_batch_size > 0:
+        hash_cache_path = Path(config.hash_cache_path) if config.hash_cache_path else None
+        trigger = BatchTrigger(
+            lambda frames: run_downstream_batch(output_dir, frames, hash_cache_path),
+            max_batch_size=config.pipeline_batch_size,
+            max_wait=config.pipeline_max_wait,
+        )
+        trigger.start()
+
+    ingestion_queue = processing.configure(
+        output_dir,
+        on_complete=trigger.add if trigger is not None else None,
+        max_workers=config.max_workers,
+        max_queue_size=config.max_queue_size,
+        use_processes=config.use_processes,
+        stability_interval=config.stability_interval,
+        stability_checks=config.stability_checks,
+        empty_checks=config.empty_checks,
+        scene_threshold=config.scene_threshold,
+        strategy=config.extraction_strategy,
+        streaming=config.streaming,
+        segments=config.segments,
+        filters=config.frame_filters(),
+        frame_format=config.frame_format,
+        max_edge=config.max_edge,
+        index=index,
+        journal=journal,
+    )
+    for leftover in sorted(leftovers):
+        print(f"Queueing leftover file: {leftover}")
+        ingestion_queue.submit(leftover)
 
-def start_watching(path: str):
     event_handler = IngestionHandler()
     observer = Observer()
     observer.schedule(event_handler, path, recursive=True)
     observer.start()
     print(f"Watching for new files in: {path}")
     try:
+        last_report = time.monotonic()
         while True:
             time.sleep(1)
+            if time.monotonic() - last_report >= config.stats_interval:
+                print(f"📊 Ingestion stats: {ingestion_queue.summary()}")
+                if trigger is not None:
+                    print(f"📊 Batch stats: {trigger.summary()}")
+                last_report = time.monotonic()
     finally:
         observer.stop()
         observer.join()
+        ingestion_queue.stop()
+        if trigger is not None:
+            trigger.stop(flush=True)
+            print(f"📊 Final batch stats: {trigger.summary()}")
+        if index is not None:
+            index.close()
+        if journal is not None:
+            journal.close()
+        print(f"📊 Final ingestion stats: {ingestion_queue.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a drop folder and ingest new images and videos.")
+    parser.add_argument("drop_directory", type=str, help="The directory to manually drop files into.")
+    parser.add_argument("--config", type=str, default="configs/ingestion.json", help="Path to the ingestion config.")
+    args = parser.parse_args()
 
-    if __name__ == "__main__":
-        # The directory to manually drop files into:
-        DROP_DIRECTORY = "PATH"
-        start_watching(DROP_DIRECTORY)
+    start_watching(args.drop_directory, load_ingestion_config(Path(args.config)))
@@ -0,0 +1,134 @@
+# src/ingestion/index.py
+import errno
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Linux FICLONE ioctl: share extents with the source file (btrfs, XFS, overlayfs on either)
+_FICLONE = 0x40049409
+
+
+def hash_file(file_path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Returns the SHA-256 hex digest of a file, reading it in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dst: Path):
+    import fcntl
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink()
+            raise
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """
+    Places `src` at `dst` as cheaply as the filesystem allows: a hardlink, then a
+    reflink (copy-on-write clone), then a plain copy. Returns the method used.
+    """
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+            raise
+    try:
+        _reflink(src, dst)
+        return "reflink"
+    except (OSError, ImportError):
+        pass
+    shutil.copy(src, dst)
+    return "copy"
+
+
+class IngestionIndex:
+    """
+    A persistent SQLite index of every ingested source file, keyed by SHA-256,
+    along with the frames it produced. Safe to share between threads, and
+    picklable so it can be handed to process-pool workers (each process opens its
+    own connection).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mime TEXT NOT NULL,
+                source_name TEXT NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS frames (
+                sha256 TEXT NOT NULL REFERENCES sources(sha256),
+                frame_path TEXT NOT NULL,
+                PRIMARY KEY (sha256, frame_path)
+            );
+            """
+        )
+        return conn
+
+    def __getstate__(self):
+        return {"db_path": self.db_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["db_path"])
+
+    def contains(self, sha256: str) -> bool:
+        """Primary-key lookup: has a source with this digest already been ingested?"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM sources WHERE sha256 = ?", (sha256,)).fetchone()
+        return row is not None
+
+    def frames_for(self, sha256: str) -> list[Path]:
+        """Returns the frames recorded for a source."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT frame_path FROM frames WHERE sha256 = ? ORDER BY frame_path", (sha256,)
+            ).fetchall()
+        return [Path(r[0]) for r in rows]
+
+    def record(self, sha256: str, size: int, mime: str, source_name: str, frames: list[Path]):
+        """Records an ingested source and its frames in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (sha256, size, mime, source_name, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (sha256, size, mime, source_name, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frames (sha256, frame_path) VALUES (?, ?)",
+                [(sha256, str(p)) for p in frames],
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,182 @@
+# src/ingestion/journal.py
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Unit lifecycle. A unit is one source file, identified by its SHA-256.
+#   started:   frames are being written into the unit's work_dir
+#   extracted: every frame is in work_dir and their final names are recorded; renames may be in progress
+#   committed: frames are in the output directory and the source may be deleted
+#   abandoned: the source disappeared before the unit was extracted
+STARTED, EXTRACTED, COMMITTED, ABANDONED = "started", "extracted", "committed", "abandoned"
+
+
+def fsync_path(path: Path):
+    """Flushes a file (or a directory's entries) to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def unit_lock(lock_path: Path):
+    """
+    Holds an exclusive lock on one unit for the duration of the block. Workers
+    ingesting identical content (a file dropped twice, or present in two
+    watched subfolders) share a unit and its work_dir; the lock serializes
+    them, across threads and processes alike. The lock file is removed on
+    release; a waiter that wakes up holding a lock on the removed file retries.
+    """
+    while True:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            st = os.stat(lock_path)
+            held = (st.st_dev, st.st_ino) == (os.fstat(fd).st_dev, os.fstat(fd).st_ino)
+        except FileNotFoundError:
+            held = False
+        if held:
+            break
+        os.close(fd)
+    try:
+        yield
+    finally:
+        os.unlink(lock_path)
+        os.close(fd)
+
+
+class IngestionJournal:
+    """
+    An append-only JSON-lines write-ahead journal of ingestion units.
+
+    Every state change is appended as one line and fsynced before the matching
+    filesystem change is considered done, so after a crash the journal says
+    exactly how far each unit got.
+
+    Picklable for process-pool workers: a pool pickles the journal with every
+    task, and unpickling returns one shared instance per worker process
+    (see _journal_in_process), so a worker opens and replays the file once.
+    Lines appended by other processes are read incrementally whenever a unit's
+    state is looked up.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._units: dict[str, dict] = {}
+        self._offset = 0
+        self._replay()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def __reduce__(self):
+        return _journal_in_process, (self.path,)
+
+    def _replay(self):
+        """Applies lines appended since the last replay. Caller must hold self._lock (or be __init__)."""
+        if not self.path.exists():
+            return
+        if self.path.stat().st_size < self._offset:
+            # Compacted since we last read it
+            self._units, self._offset = {}, 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn by a crash mid-append, or still being written by another process: re-read it next time
+                    break
+                self._offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn line from a crash mid-append, followed by later appends; skip it for good
+                    continue
+                self._units.setdefault(record["unit"], {}).update(record)
+
+    def _append(self, unit: str, state: str, **fields):
+        record = {"unit": unit, "state": state, "time": time.time(), **fields}
+        line = (json.dumps(record) + "\n").encode()
+        with self._lock:
+            os.write(self._fd, line)
+            os.fsync(self._fd)
+            self._units.setdefault(unit, {}).update(record)
+
+    def state(self, unit: str) -> Optional[dict]:
+        """Returns the merged record for a unit, or None if it has never been started."""
+        with self._lock:
+            self._replay()
+            record = self._units.get(unit)
+            return dict(record) if record is not None else None
+
+    def begin(self, unit: str, source: Path, work_dir: Path):
+        self._append(unit, STARTED, source=str(source), work_dir=str(work_dir))
+
+    def extracted(self, unit: str, frames: list[Path]):
+        """Records the final frame paths. Must be called before any frame is renamed into place."""
+        self._append(unit, EXTRACTED, frames=[str(p) for p in frames])
+
+    def commit(self, unit: str):
+        self._append(unit, COMMITTED)
+
+    def abandon(self, unit: str):
+        self._append(unit, ABANDONED)
+
+    def incomplete(self) -> list[dict]:
+        """Returns every unit that was started but neither committed nor abandoned."""
+        with self._lock:
+            return [dict(r) for r in self._units.values() if r["state"] in (STARTED, EXTRACTED)]
+
+    def recover(self) -> list[Path]:
+        """
+        Cleans up after a crash. Units whose source is gone are abandoned and their
+        work directories removed. Returns the sources of the remaining incomplete
+        units so they can be re-queued; process_source_file resumes them.
+        """
+        pending = []
+        for record in self.incomplete():
+            source = Path(record["source"])
+            if source.exists():
+                pending.append(source)
+                continue
+            shutil.rmtree(record["work_dir"], ignore_errors=True)
+            self.abandon(record["unit"])
+        return pending
+
+    def compact(self):
+        """Rewrites the journal with one line per unit. Call only while no workers are running."""
+        with self._lock:
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w") as f:
+                for record in self._units.values():
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            fsync_path(self.path.parent)
+            self._offset = self.path.stat().st_size
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def close(self):
+        with self._lock:
+            os.close(self._fd)
+
+
+# Journals unpickled in this process, by path; see IngestionJournal.__reduce__
+_process_journals: dict[Path, IngestionJournal] = {}
+_process_journals_lock = threading.Lock()
+
+
+def _journal_in_process(path: Path) -> IngestionJournal:
+    with _process_journals_lock:
+        if path not in _process_journals:
+            _process_journals[path] = IngestionJournal(path)
+        return _process_journals[path]
@@ -0,0 +1,79 @@
+# src/ingestion/normalize.py
+import json
+import math
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from .index import link_or_copy
+
+# Sidecar next to a downscaled frame, e.g. photo.jpg -> photo.meta.json (captions use photo.txt).
+# The training dataset reads "original_size" from it for SDXL micro-conditioning.
+SIDECAR_SUFFIX = ".meta.json"
+
+_EXIF_ORIENTATION = 0x0112
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}  # orientations that swap width and height
+
+
+def sidecar_path(image_path: Path) -> Path:
+    return image_path.with_suffix(SIDECAR_SUFFIX)
+
+
+def write_sidecar(image_path: Path, original_size: tuple[int, int], normalized_size: tuple[int, int]):
+    """Records the (height, width) of the full-resolution source next to a downscaled frame."""
+    sidecar_path(image_path).write_text(
+        json.dumps({"original_size": list(original_size), "normalized_size": list(normalized_size)})
+    )
+
+
+def read_original_size(image_path: Path) -> Optional[tuple[int, int]]:
+    """Returns the recorded (height, width) of the full-resolution source, if there is a sidecar."""
+    path = sidecar_path(image_path)
+    if not path.exists():
+        return None
+    return tuple(json.loads(path.read_text())["original_size"])
+
+
+def normalize_image(src: Path, dst: Path, max_edge: int) -> tuple[int, int]:
+    """
+    Writes `src` to `dst` with its EXIF orientation baked in and its long edge
+    capped at `max_edge`. JPEGs are decoded at reduced size (draft mode) when
+    possible. Images that need neither change are linked, not re-encoded.
+
+    Returns the (height, width) of the oriented full-resolution source. A
+    sidecar recording it is written next to `dst` when the image was downscaled.
+    """
+    with Image.open(src) as img:
+        width, height = img.size
+        orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+        if orientation in _TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+        original_size = (height, width)
+
+        if max(width, height) <= max_edge and orientation == 1:
+            link_or_copy(src, dst)
+            return original_size
+
+        image_format = img.format
+        icc_profile = img.info.get("icc_profile")
+        # draft only reduces while both edges stay at or above the requested size, so ask for the
+        # aspect-correct target rather than a max_edge square (which a 3:2 frame could never reduce to)
+        scale = max_edge / max(img.size)
+        img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        save_kwargs = {"icc_profile": icc_profile} if icc_profile else {}
+        if image_format == "JPEG":
+            save_kwargs.update(quality=95, subsampling=0)
+        elif image_format == "WEBP":
+            save_kwargs.update(quality=95)
+        exif = img.getexif()
+        if exif:
+            save_kwargs["exif"] = exif.tobytes()
+        img.save(dst, format=image_format, **save_kwargs)
+
+    if (img.height, img.width) != original_size:
+        write_sidecar(dst, original_size, (img.height, img.width))
+    return original_size
@@ -0,0 +1,274 @@
+# src/ingestion/processing.py
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .extract import process_source_file
+
+
+@dataclass
+class IngestionStats:
+    """Running counters for an IngestionQueue. Use these to size the worker pool."""
+
+    submitted: int = 0
+    dropped: int = 0  # queue was full on a non-blocking submit
+    vanished: int = 0  # file disappeared before it became stable
+    empty: int = 0  # file stayed at zero bytes for `empty_checks` polls
+    completed: int = 0
+    failed: int = 0
+    frames: int = 0
+    in_flight: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> dict:
+        """Returns a snapshot of the counters plus derived throughput rates."""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "vanished": self.vanished,
+            "empty": self.empty,
+            "completed": self.completed,
+            "failed": self.failed,
+            "frames": self.frames,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "elapsed_s": round(elapsed, 2),
+            "files_per_sec": round(self.completed / elapsed, 3),
+            "frames_per_sec": round(self.frames / elapsed, 3),
+        }
+
+
+def _stat_signature(file_path: Path) -> Optional[tuple[int, int]]:
+    """Returns (size, mtime_ns) for a file, or None if it no longer exists."""
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class IngestionQueue:
+    """
+    A bounded ingestion engine that runs `process_source_file` on a worker pool.
+
+    Files are submitted into a bounded in-memory queue. A dispatcher thread waits
+    until each file's size and mtime have been unchanged for `stability_checks`
+    consecutive polls (so half-copied files are not picked up), then hands it to
+    the pool. A file still empty after `empty_checks` unchanged polls is given
+    up on, so an abandoned zero-byte file never holds a queue slot forever. At most `max_workers` files are in flight at once; when the pool is
+    full the dispatcher blocks, the queue fills up, and `submit` blocks in turn.
+    `on_complete` is called with the frames of every source that produced any.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        max_workers: int = 4,
+        max_queue_size: int = 256,
+        use_processes: bool = False,
+        stability_interval: float = 1.0,
+        stability_checks: int = 2,
+        empty_checks: int = 30,
+        process_fn: Callable[..., list[Path]] = process_source_file,
+        on_complete: Optional[Callable[[list[Path]], None]] = None,
+        **process_kwargs,
+    ):
+        self.output_dir = Path(output_dir)
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.use_processes = use_processes
+        self.stability_interval = stability_interval
+        self.stability_checks = stability_checks
+        self.empty_checks = empty_checks
+        self.stats = IngestionStats()
+        self.on_complete = on_complete
+
+        self._process = functools.partial(process_fn, output_dir=self.output_dir, **process_kwargs)
+        self._queue: queue.Queue[Path] = queue.Queue(maxsize=max_queue_size)
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Condition()
+        self._outstanding = 0
+        self._stop = threading.Event()
+        self._executor: Optional[Executor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the worker pool and the dispatcher thread."""
+        if self._dispatcher is not None:
+            return
+        pool_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self._executor = pool_cls(max_workers=self.max_workers)
+        self._stop.clear()
+        self.stats.started_at = time.monotonic()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ingestion-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, file_path: Path, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Queues a file for ingestion.
+
+        Blocks while the queue is full (backpressure) unless `block` is False or
+        `timeout` expires, in which case the file is dropped and False is returned.
+        """
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self._queue.put(Path(file_path), block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._outstanding -= 1
+                self.stats.dropped += 1
+                self._lock.notify_all()
+            print(f"⚠️ Ingestion queue full, dropping {Path(file_path).name}")
+            return False
+
+        with self._lock:
+            self.stats.submitted += 1
+            self._update_depth(0)
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every submitted file has been processed. Returns False on timeout."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def stop(self, wait: bool = True):
+        """Stops the dispatcher and shuts down the worker pool."""
+        self._stop.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def summary(self) -> dict:
+        with self._lock:
+            return self.stats.summary()
+
+    def _update_depth(self, pending: int):
+        # Caller must hold self._lock
+        depth = self._queue.qsize() + pending
+        self.stats.queue_depth = depth
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+    def _finish(self):
+        with self._lock:
+            self._outstanding -= 1
+            self._lock.notify_all()
+
+    def _dispatch_loop(self):
+        # path -> (last stat signature, number of consecutive unchanged polls)
+        pending: dict[Path, tuple[Optional[tuple[int, int]], int]] = {}
+
+        while not self._stop.is_set():
+            while len(pending) < self.max_queue_size:
+                try:
+                    file_path = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if file_path in pending:
+                    # Already waiting (e.g. both a create and a move event fired)
+                    self._finish()
+                    continue
+                pending[file_path] = (None, 0)
+
+            for file_path, (last_sig, unchanged) in list(pending.items()):
+                sig = _stat_signature(file_path)
+                if sig is None:
+                    del pending[file_path]
+                    with self._lock:
+                        self.stats.vanished += 1
+                    self._finish()
+                    continue
+
+                unchanged = unchanged + 1 if sig == last_sig else 0
+                if sig[0] == 0:
+                    # An empty file is never stable: its writer may not have started yet
+                    if unchanged >= self.empty_checks:
+                        del pending[file_path]
+                        print(f"⚠️ {file_path.name} is still empty after {unchanged} checks, skipping it")
+                        with self._lock:
+                            self.stats.empty += 1
+                        self._finish()
+                    else:
+                        pending[file_path] = (sig, unchanged)
+                    continue
+                if unchanged < self.stability_checks:
+                    pending[file_path] = (sig, unchanged)
+                    continue
+
+                del pending[file_path]
+                # Backpressure: wait for a free worker slot before dispatching.
+                while not self._slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                self._dispatch(file_path)
+
+            with self._lock:
+                self._update_depth(len(pending))
+
+            self._stop.wait(self.stability_interval)
+
+    def _dispatch(self, file_path: Path):
+        with self._lock:
+            self.stats.in_flight += 1
+        try:
+            future = self._executor.submit(self._process, file_path)
+        except Exception as e:
+            print(f"Could not dispatch {file_path.name}: {e}")
+            self._on_done(file_path, None)
+            return
+        future.add_done_callback(functools.partial(self._on_done, file_path))
+
+    def _on_done(self, file_path: Path, future: Optional[Future]):
+        self._slots.release()
+        frames = None
+        if future is not None:
+            try:
+                frames = future.result()
+            except Exception as e:
+                print(f"Error ingesting {file_path.name}: {e}")
+
+        with self._lock:
+            self.stats.in_flight -= 1
+            if frames is None:
+                self.stats.failed += 1
+            else:
+                self.stats.completed += 1
+                self.stats.frames += len(frames)
+        if frames and self.on_complete is not None:
+            try:
+                self.on_complete(frames)
+            except Exception as e:
+                print(f"Error handing off frames from {file_path.name}: {e}")
+        self._finish()
+
+
+_default_queue: Optional[IngestionQueue] = None
+
+
+def configure(output_dir: Path, **kwargs) -> IngestionQueue:
+    """Creates and starts the module-level queue used by `queue_new_file`."""
+    global _default_queue
+    if _default_queue is not None:
+        _default_queue.stop()
+    _default_queue = IngestionQueue(output_dir, **kwargs)
+    _default_queue.start()
+    return _default_queue
+
+
+def queue_new_file(file_path: str) -> bool:
+    """Queues a newly detected file on the configured ingestion queue."""
+    if _default_queue is None:
+        raise RuntimeError("Ingestion queue is not configured. Call processing.configure() first.")
+    return _default_queue.submit(Path(file_path))
@@ -0,0 +1,105 @@
+# src/shared/embedding_store.py
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+DEFAULT_STORE_DIR = "data/embeddings"
+KEYS_FILE = "keys.u64"
+VECTORS_FILE = "vectors.f16"
+META_FILE = "meta.json"
+
+
+def store_dir_for(root: Path, model_name: str, preprocess: str) -> Path:
+    """One directory per (model, preprocessing) pair, so changing either starts a fresh store."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "--", f"{model_name}@{preprocess}")
+    return Path(root) / slug
+
+
+class EmbeddingStore:
+    """
+    A persistent, content-addressed store of image embeddings for one model
+    and preprocessing version, shared by every stage that embeds images.
+
+    On disk it is an append-only float16 matrix (one row per image) and an
+    append-only array of uint64 content keys, row i of one belonging to key i
+    of the other, plus meta.json recording the model, the preprocessing
+    version and the dimension. Vectors are appended before their keys, so a
+    crash can only leave a vector without a key, which is truncated on open.
+    Meant for one writer at a time.
+    """
+
+    def __init__(self, root: Path, model_name: str, preprocess: str, dim: int):
+        self.store_dir = store_dir_for(root, model_name, preprocess)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        meta = {"model": model_name, "preprocess": preprocess, "dim": dim, "dtype": "float16"}
+        meta_path = self.store_dir / META_FILE
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())
+            if stored != meta:
+                raise ValueError(f"Embedding store {self.store_dir} was written with {stored}, not {meta}")
+        else:
+            meta_path.write_text(json.dumps(meta))
+        self.model_name, self.preprocess, self.dim = model_name, preprocess, dim
+        self._open()
+
+    def _open(self):
+        keys_path, vectors_path = self.store_dir / KEYS_FILE, self.store_dir / VECTORS_FILE
+        key_bytes = keys_path.stat().st_size if keys_path.exists() else 0
+        vector_bytes = vectors_path.stat().st_size if vectors_path.exists() else 0
+        row_bytes = 2 * self.dim
+        # A crash mid-append can leave a torn row or key, or a vector without its key; the shorter one wins
+        self._count = min(key_bytes // 8, vector_bytes // row_bytes)
+        if key_bytes > self._count * 8:
+            os.truncate(keys_path, self._count * 8)
+        if vector_bytes > self._count * row_bytes:
+            os.truncate(vectors_path, self._count * row_bytes)
+
+        keys = np.fromfile(keys_path, dtype="<u8", count=self._count) if self._count else np.empty(0, "<u8")
+        self._rows = {key: row for row, key in enumerate(keys.tolist())}
+        self._vectors = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._rows
+
+    def rows(self, keys: Sequence[int]) -> list[Optional[int]]:
+        """Returns each key's row, or None for keys not in the store."""
+        return [self._rows.get(key) for key in keys]
+
+    def get(self, keys: Sequence[int]) -> np.ndarray:
+        """Returns the stored float16 vectors for `keys`. Raises KeyError for a missing key."""
+        if self._vectors is None or len(self._vectors) != self._count:
+            self._vectors = np.memmap(
+                self.store_dir / VECTORS_FILE, dtype="<f2", mode="r", shape=(self._count, self.dim)
+            )
+        return np.asarray(self._vectors[[self._rows[key] for key in keys]], dtype=np.float16)
+
+    def add(self, keys: Sequence[int], vectors: np.ndarray):
+        """Appends vectors for keys not stored yet, durably. Keys already in the store are skipped."""
+        vectors = np.asarray(vectors)
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+        new, seen = [], set()
+        for i, key in enumerate(keys):
+            if key not in self._rows and key not in seen:
+                new.append(i)
+                seen.add(key)
+        if not new:
+            return
+        with open(self.store_dir / VECTORS_FILE, "ab") as f:
+            f.write(vectors[new].astype("<f2").reshape(len(new), self.dim).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.store_dir / KEYS_FILE, "ab") as f:
+            f.write(np.array([keys[i] for i in new], dtype="<u8").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        for i in new:
+            self._rows[keys[i]] = self._count
+            self._count += 1
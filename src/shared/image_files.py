@@ -0,0 +1,61 @@
+# src/shared/image_files.py
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Every frame format the ingestion stage can write (see ingestion.extract.FRAME_FORMATS).
+# .npy frames are HxWx3 RGB uint8 arrays saved with np.save.
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".npy"}
+
+
+def list_images(directory: Path) -> list[Path]:
+    """Returns the image/frame files directly inside a directory (not recursive)."""
+    return [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES]
+
+
+def open_image(path: Path) -> Image.Image:
+    """Opens any supported frame file as a PIL image."""
+    if path.suffix.lower() == ".npy":
+        return Image.fromarray(np.load(path))
+    return Image.open(path)
+
+
+# cv2.imread flags for grayscale decodes at 1/1, 1/2, 1/4 and 1/8 scale. libjpeg scales JPEGs in the DCT
+# domain, so reduced JPEG decodes skip most of the work; other formats are decoded and then resized.
+GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def read_gray(path: Path, reduction: int = 1) -> Optional[np.ndarray]:
+    """
+    Reads any supported frame file as a grayscale array, downscaled by
+    `reduction` (1, 2, 4 or 8). Returns None if it can't be read.
+    """
+    if path.suffix.lower() == ".npy":
+        return shrink_gray(cv2.cvtColor(np.load(path), cv2.COLOR_RGB2GRAY), reduction)
+    return cv2.imread(str(path), GRAYSCALE_FLAGS[reduction])
+
+
+def shrink_gray(gray: np.ndarray, reduction: int) -> np.ndarray:
+    """Downscales a decoded grayscale array by `reduction`, to the size cv2's reduced decodes produce."""
+    if reduction == 1:
+        return gray
+    height, width = gray.shape
+    size = (-(-width // reduction), -(-height // reduction))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def image_size(path: Path) -> tuple[int, int]:
+    """Returns (width, height) from the file header, without decoding pixels."""
+    if path.suffix.lower() == ".npy":
+        height, width = np.load(path, mmap_mode="r").shape[:2]
+        return width, height
+    with Image.open(path) as img:
+        return img.size
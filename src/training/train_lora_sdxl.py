@@ -72,6 +72,8 @@ from diffusers.utils import (
 from diffusers.utils.hub_utils import load_or_create_model_card, populate_model_card
 from diffusers.utils.import_utils import is_xformers_available
 from diffusers.utils.torch_utils import is_compiled_module
+from ingestion.normalize import read_original_size
+from shared.image_files import open_image
 
 
 if is_wandb_available():
@@ -768,6 +770,7 @@ class DreamBoothDataset(Dataset):
                         f"`--image_column` value '{args.image_column}' not found in dataset columns. Dataset columns are: {', '.join(column_names)}"
                     )
             instance_images = dataset["train"][image_column]
+            recorded_sizes = [None] * len(instance_images)
 
             if args.caption_column is None:
                 logger.info(
@@ -792,15 +795,20 @@ class DreamBoothDataset(Dataset):
                 raise ValueError("Instance images root doesn't exists.")
 
             # Filter for image files only
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+            # .npy is the raw frame format ingestion can write (see shared.image_files.open_image)
+            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp', '.npy'}
             image_paths = [path for path in Path(instance_data_root).iterdir() 
                           if path.is_file() and path.suffix.lower() in image_extensions]
-            instance_images = [Image.open(path) for path in image_paths]
+            instance_images = [open_image(path) for path in image_paths]
+            # SD-XL is conditioned on the size before ingestion downscaled the image
+            recorded_sizes = [read_original_size(path) for path in image_paths]
             self.custom_instance_prompts = None
 
         self.instance_images = []
-        for img in instance_images:
+        instance_original_sizes = []
+        for img, recorded_size in zip(instance_images, recorded_sizes):
             self.instance_images.extend(itertools.repeat(img, repeats))
+            instance_original_sizes.extend(itertools.repeat(recorded_size, repeats))
 
         # image processing to prepare for using SD-XL micro-conditioning
         self.original_sizes = []
@@ -820,11 +828,11 @@ class DreamBoothDataset(Dataset):
                 transforms.Normalize([0.5], [0.5]),
             ]
         )
-        for image in self.instance_images:
+        for image, recorded_size in zip(self.instance_images, instance_original_sizes):
             image = exif_transpose(image)
             if not image.mode == "RGB":
                 image = image.convert("RGB")
-            self.original_sizes.append((image.height, image.width))
+            self.original_sizes.append(recorded_size or (image.height, image.width))
             image = train_resize(image)
             if args.random_flip and random.random() < 0.5:
                 # flip
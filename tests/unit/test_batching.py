@@ -0,0 +1,62 @@
+# tests/unit/test_batching.py
+import threading
+import time
+from pathlib import Path
+
+from ingestion.batching import BatchTrigger
+
+
+def test_batch_fires_at_count_watermark():
+    """Tests that a batch fires as soon as enough frames are waiting."""
+    batches = []
+    trigger = BatchTrigger(batches.append, max_batch_size=5, max_wait=60.0)
+    trigger.start()
+    trigger.add(Path(f"f{i}.png") for i in range(5))
+
+    deadline = time.monotonic() + 5
+    while not batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    trigger.stop(flush=False)
+
+    assert [len(b) for b in batches] == [5]
+
+
+def test_batch_fires_after_time_window():
+    """Tests that a small batch still fires once the oldest frame has waited long enough."""
+    batches = []
+    trigger = BatchTrigger(batches.append, max_batch_size=100, max_wait=0.1)
+    trigger.start()
+    trigger.add([Path("a.png"), Path("b.png")])
+    time.sleep(0.5)
+    trigger.stop(flush=False)
+
+    assert batches == [[Path("a.png"), Path("b.png")]]
+    summary = trigger.summary()
+    assert summary["batches"] == 1
+    assert summary["frame_latency_s"]["max"] >= 0.1
+
+
+def test_only_one_batch_in_flight():
+    """Tests that batches never overlap and frames added mid-batch go to the next one."""
+    running = threading.Semaphore(1)
+    overlaps = []
+    sizes = []
+
+    def slow_batch(frames):
+        if not running.acquire(blocking=False):
+            overlaps.append(len(frames))
+            return
+        sizes.append(len(frames))
+        time.sleep(0.1)
+        running.release()
+
+    trigger = BatchTrigger(slow_batch, max_batch_size=2, max_wait=60.0)
+    trigger.start()
+    for i in range(10):
+        trigger.add([Path(f"{i}.png")])
+        time.sleep(0.02)
+    trigger.stop(flush=True)
+
+    assert overlaps == []
+    assert sum(sizes) == 10
+    assert trigger.summary()["frames"] == 10
@@ -0,0 +1,68 @@
+# tests/unit/test_clustering.py
+import numpy as np
+from curation import clustering
+from curation.clustering import knn_graph, knn_graph_clusters, oversized_clusters, readable_rows
+from curation.similarity import normalize_rows
+
+
+def _planted_clusters(rng, clusters=20, size=8, noise=200, dim=256):
+    """Tight groups around a shared mean direction (like CLIP embeddings), plus unrelated background images."""
+    mean = normalize_rows(rng.normal(size=(1, dim)))[0]
+
+    def around_mean(count, spread):
+        return 0.7 * mean + 0.7 * rng.normal(size=(count, dim)) / np.sqrt(dim) * spread
+
+    centers = around_mean(clusters, 1.0)
+    members = np.repeat(centers, size, axis=0) + 0.1 * rng.normal(size=(clusters * size, dim)) / np.sqrt(dim)
+    vectors = normalize_rows(np.concatenate([members, around_mean(noise, 1.0)]))
+    truth = np.concatenate([np.repeat(np.arange(clusters), size), np.full(noise, -1)])
+    return vectors, truth
+
+
+def test_numpy_knn_matches_brute_force(monkeypatch):
+    """Tests that the blocked fallback (with tiles smaller than the corpus) returns the exact nearest neighbors."""
+    monkeypatch.setattr(clustering, "faiss", None)
+    monkeypatch.setattr(clustering, "KNN_TILE_ELEMENTS", 1000)
+    vectors = normalize_rows(np.random.default_rng(0).normal(size=(300, 16))).astype(np.float32)
+
+    neighbors, similarities = knn_graph(vectors, k=5)
+
+    full = vectors @ vectors.T
+    np.fill_diagonal(full, -np.inf)
+    expected = np.argsort(-full, axis=1)[:, :5]
+    assert np.array_equal(neighbors, expected)
+    assert np.allclose(similarities, np.take_along_axis(full, expected, axis=1))
+
+
+def test_knn_graph_recovers_planted_clusters(tmp_path, monkeypatch):
+    """Tests that PCA + k-NN graph clustering on a float16 memmap finds each planted group and leaves the rest out."""
+    monkeypatch.setattr(clustering, "faiss", None)
+    vectors, truth = _planted_clusters(np.random.default_rng(1))
+    embeddings = np.lib.format.open_memmap(tmp_path / "emb.npy", mode="w+", dtype=np.float16, shape=vectors.shape)
+    embeddings[:] = vectors
+    embeddings[5] = 0  # an unreadable image
+
+    rows = readable_rows(embeddings)
+    assert 5 not in rows and len(rows) == len(truth) - 1
+    labels = knn_graph_clusters(embeddings, rows, pca_dim=16, k=10, min_similarity=0.85)
+
+    truth = truth[rows]
+    assert np.all(labels[truth == -1] == -1)
+    for cluster in np.unique(truth[truth >= 0]):
+        found = np.unique(labels[truth == cluster])
+        assert len(found) == 1 and found[0] >= 0
+    assert len(np.unique(labels[labels >= 0])) == len(np.unique(truth[truth >= 0]))
+
+
+def test_oversized_clusters_matches_a_per_label_scan():
+    """Tests that the bincount grouping finds the same clusters and rows as scanning each label, outliers excluded."""
+    labels = np.random.default_rng(2).integers(-1, 40, size=2000)
+    labels[labels == 7] = -1  # a label with no members
+
+    dense, sizes, rows = oversized_clusters(labels, max_cluster_size=50)
+
+    expected = [label for label in range(40) if np.sum(labels == label) > 50]
+    assert dense.tolist() == expected
+    assert sizes.tolist() == [int(np.sum(labels == label)) for label in expected]
+    assert rows.tolist() == np.flatnonzero(np.isin(labels, expected)).tolist()
+    assert oversized_clusters(np.full(5, -1), 0)[2].size == 0
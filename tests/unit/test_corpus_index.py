@@ -0,0 +1,61 @@
+# tests/unit/test_corpus_index.py
+import numpy as np
+import pytest
+from curation.corpus_index import HASHES_FILE, CorpusIndex
+from curation.hash_index import brute_force_query
+
+
+def test_corpus_index_matches_brute_force_across_compactions(tmp_path):
+    """Tests that sorted generations plus the unsorted tail find exactly what a linear scan finds."""
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**64, size=3000, dtype=np.uint64)
+    names = [f"img_{i}.png" for i in range(len(hashes))]
+
+    index = CorpusIndex(tmp_path / "index", max_tail=1000)
+    for start in range(0, len(hashes), 700):
+        index.add(hashes[start : start + 700].tolist(), names[start : start + 700])
+    assert index.summary() == {"hashes": 3000, "sorted": 2800, "tail": 200}
+
+    # Reopened from disk: memory-mapped generation plus the tail
+    reopened = CorpusIndex(tmp_path / "index", max_tail=1000)
+    queries = hashes[::37] ^ (np.uint64(1) << rng.integers(0, 64, size=len(hashes[::37])).astype(np.uint64))
+    for value in queries.tolist():
+        expected = [(names[i], d) for i, d in brute_force_query(hashes, value, 6)]
+        assert reopened.query(value, 6) == expected
+        assert expected  # every query is one bit away from a stored hash
+
+
+def test_corpus_index_recovers_from_torn_append(tmp_path):
+    """Tests that a crash between the name and hash appends leaves a consistent, appendable index."""
+    index = CorpusIndex(tmp_path / "index")
+    index.add([1, 2], ["a.png", "b.png"])
+    with open(tmp_path / "index" / "names.txt", "a") as f:
+        f.write("c.png\n")  # crashed before the hash of c.png was written
+    with open(tmp_path / "index" / HASHES_FILE, "ab") as f:
+        f.write(b"\x01\x02\x03")  # and a torn partial hash
+
+    recovered = CorpusIndex(tmp_path / "index")
+    assert recovered.names() == ["a.png", "b.png"]
+    recovered.add([3], ["d.png"])
+    assert CorpusIndex(tmp_path / "index").query(3, 0) == [("d.png", 0)]
+
+
+def test_corpus_index_compaction_never_touches_the_live_generation(tmp_path, monkeypatch):
+    """Tests that compacting an already-sorted index is a no-op, and a rebuild that crashes leaves the index usable."""
+    index = CorpusIndex(tmp_path / "index")
+    index.add([1, 2], ["a.png", "b.png"])
+    index.compact()
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "save", crash)
+    index.compact()  # nothing to sort: must not rebuild (or delete) the generation it is serving from
+    index.add([3], ["c.png"])
+    with pytest.raises(OSError):
+        index.compact()
+    monkeypatch.undo()
+
+    reopened = CorpusIndex(tmp_path / "index")
+    assert reopened.summary() == {"hashes": 3, "sorted": 2, "tail": 1}
+    assert [reopened.query(value, 0) for value in (1, 2, 3)] == [[("a.png", 0)], [("b.png", 0)], [("c.png", 0)]]
@@ -0,0 +1,71 @@
+# tests/unit/test_dedup.py
+import json
+from pathlib import Path
+
+import numpy as np
+from curation.dedup import find_and_remove_duplicates
+from curation.duplicate_groups import UnionFind, pick_representative, representative_score
+from PIL import Image
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+
+def test_union_find_groups_transitive_links():
+    uf = UnionFind(6)
+    uf.union(0, 1)
+    uf.union(1, 2)
+    uf.union(4, 5)
+    assert not uf.union(2, 0)
+    assert sorted(uf.groups()) == [[0, 1, 2], [4, 5]]
+
+
+def test_representative_compares_file_sizes_only_within_a_format(tmp_path):
+    """Tests that a raw .npy copy does not win over a .jpg of the same resolution just by being bigger on disk."""
+    pixels = np.random.default_rng(0).integers(0, 256, size=(32, 48, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(tmp_path / "b.jpg", quality=95)
+    Image.fromarray(pixels).save(tmp_path / "c.jpg", quality=50)
+    np.save(tmp_path / "d.npy", pixels)
+    Image.fromarray(pixels).resize((24, 16)).save(tmp_path / "a_small.png")
+
+    scores = {p: representative_score(p) for p in tmp_path.iterdir()}
+    assert scores[tmp_path / "d.npy"][1] > scores[tmp_path / "b.jpg"][1]
+    assert pick_representative(scores) == tmp_path / "b.jpg"
+
+
+def test_dedup_keeps_highest_resolution_copy(tmp_path):
+    """Tests that a duplicate group keeps its largest member and quarantines the rest with a report."""
+    with Image.open(FIXTURES_DIR / "sample_image.jpg") as img:
+        source = img.convert("RGB")
+    source.resize((source.width // 2, source.height // 2)).save(tmp_path / "a_small.png")
+    source.save(tmp_path / "b_full.png")
+    source.save(tmp_path / "c_recompressed.jpg", quality=60)
+    Image.new("RGB", source.size, (10, 200, 30)).save(tmp_path / "d_unrelated.png")
+
+    report = find_and_remove_duplicates(tmp_path, threshold=6, workers=1)
+
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == ["b_full.png", "d_unrelated.png"]
+    duplicates_dir = tmp_path / "duplicates"
+    assert sorted(p.name for p in duplicates_dir.glob("*.*") if p.suffix != ".json") == [
+        "a_small.png",
+        "c_recompressed.jpg",
+    ]
+    (report_path,) = duplicates_dir.glob("dedup_report-*.json")
+    assert json.loads(report_path.read_text()) == report
+    assert report["groups"][0]["kept"] == "b_full.png"
+
+
+def test_repeated_runs_keep_earlier_quarantined_files_and_reports(tmp_path):
+    """Tests that a duplicate quarantined under an existing name is renamed, and every run keeps its own report."""
+    with Image.open(FIXTURES_DIR / "sample_image.jpg") as img:
+        source = img.convert("RGB")
+    source.save(tmp_path / "a.png")
+    reports = []
+    for _ in range(2):
+        source.save(tmp_path / "b.png")  # a new batch brings another copy under the same name
+        reports.append(find_and_remove_duplicates(tmp_path, workers=1))
+
+    duplicates_dir = tmp_path / "duplicates"
+    assert sorted(p.name for p in duplicates_dir.glob("*.png")) == ["b.png", "b_1.png"]
+    assert [r["groups"][0]["quarantined_as"] for r in reports] == [["b.png"], ["b_1.png"]]
+    saved = [json.loads(p.read_text()) for p in sorted(duplicates_dir.glob("dedup_report-*.json"))]
+    assert saved == reports
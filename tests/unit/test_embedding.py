@@ -0,0 +1,95 @@
+# tests/unit/test_embedding.py
+import numpy as np
+import pytest
+from curation.embedding import content_keys, embed_to_memmap, iter_image_batches, open_embedding_store
+from curation.hash_cache import HashCache
+from PIL import Image
+
+
+class _MeanColorModel:
+    """Stands in for a SentenceTransformer: embeds an image as its mean RGB."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, images, batch_size, convert_to_numpy, show_progress_bar):
+        assert len(images) <= batch_size
+        self.encoded += len(images)
+        return np.stack([np.asarray(img, dtype=np.float32).mean(axis=(0, 1)) for img in images])
+
+
+class _ClipLikeModel(_MeanColorModel):
+    """Like a SentenceTransformer wrapping a lone CLIPModel module, which reports no embedding dimension."""
+
+    def get_sentence_embedding_dimension(self):
+        return None
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_streamed_embeddings_land_in_their_rows(tmp_path, workers):
+    """Tests that batches arrive in order, large images are downscaled, and unreadable images keep a zero row."""
+    colors = [(i * 20, 255 - i * 20, 100) for i in range(11)]
+    paths = []
+    for i, color in enumerate(colors):
+        paths.append(tmp_path / f"img_{i:02d}.jpg")
+        Image.new("RGB", (1200, 800), color).save(paths[-1], quality=95)
+    (tmp_path / "img_05.jpg").write_bytes(b"not an image")
+
+    seen = []
+    for rows, images in iter_image_batches(paths, batch_size=4, workers=workers, size=256):
+        seen.extend(rows)
+        assert all(min(img.size) == 256 for img in images)
+    assert seen == [i for i in range(11) if i != 5]
+
+    embeddings = embed_to_memmap(paths, _MeanColorModel(), tmp_path / "emb.npy", 4, workers, normalize=False)
+    assert embeddings.dtype == np.float16 and embeddings.shape == (11, 3)
+    assert np.all(embeddings[5] == 0)
+    expected = np.array([c for i, c in enumerate(colors) if i != 5], dtype=np.float32)
+    assert np.allclose(np.delete(np.asarray(embeddings, np.float32), 5, axis=0), expected, atol=2)
+
+
+def test_rerun_with_store_needs_no_forward_passes(tmp_path):
+    """Tests that a second run over unchanged images reuses every stored vector, renamed files included."""
+    image_dir = tmp_path / "images"
+    image_dir.mkdir()
+    for i in range(6):
+        Image.new("RGB", (64, 48), (i * 40, 80, 200 - i * 30)).save(image_dir / f"img_{i}.png")
+    paths = sorted(image_dir.iterdir())
+    hash_cache = HashCache(tmp_path / "hash_cache.sqlite")
+
+    first_model = _MeanColorModel()
+    store = open_embedding_store(tmp_path / "store", "mean-color", first_model)
+    first = embed_to_memmap(paths[:4], first_model, tmp_path / "a.npy", 4, 0, store=store, hash_cache=hash_cache)
+    assert first_model.encoded == 4
+
+    paths[0].rename(image_dir / "renamed.png")
+    paths = sorted(image_dir.iterdir())
+    model = _MeanColorModel()
+    store = open_embedding_store(tmp_path / "store", "mean-color", model)
+    second = embed_to_memmap(paths, model, tmp_path / "b.npy", 4, 0, store=store, hash_cache=hash_cache)
+    assert model.encoded == 2  # only img_4 and img_5 are new
+
+    model = _MeanColorModel()
+    store = open_embedding_store(tmp_path / "store", "mean-color", model)
+    third = embed_to_memmap(paths, model, tmp_path / "c.npy", 4, 0, store=store, hash_cache=hash_cache)
+    assert model.encoded == 0
+    assert np.array_equal(third, second)
+    assert np.array_equal(third[paths.index(image_dir / "renamed.png")], first[0])
+
+
+def test_dimension_comes_from_a_probe_when_the_model_does_not_report_it(tmp_path):
+    """Tests that CLIP-style models, whose get_sentence_embedding_dimension is None, still size the memmap and store."""
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"img_{i}.png")
+        Image.new("RGB", (64, 48), (i * 40, 80, 200)).save(paths[-1])
+
+    model = _ClipLikeModel()
+    store = open_embedding_store(tmp_path / "store", "clip-like", model)
+    assert store.dim == 3
+    embeddings = embed_to_memmap(paths, model, tmp_path / "emb.npy", 4, 0, normalize=False, store=store)
+    assert embeddings.shape == (3, 3)
+    assert np.array_equal(store.get(content_keys(paths)), np.asarray(embeddings))
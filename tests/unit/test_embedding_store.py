@@ -0,0 +1,44 @@
+# tests/unit/test_embedding_store.py
+import numpy as np
+import pytest
+from shared.embedding_store import KEYS_FILE, VECTORS_FILE, EmbeddingStore
+
+
+def test_store_round_trips_and_skips_known_keys(tmp_path):
+    """Tests that vectors come back by content key after reopening, and re-adding a key is a no-op."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(5, 8)).astype(np.float32)
+    store = EmbeddingStore(tmp_path, "clip-ViT-L-14", "v1", dim=8)
+    store.add([10, 11, 12], vectors[:3])
+    store.add([12, 13, 14, 14], vectors[2:5].tolist() + [vectors[4].tolist()])
+
+    reopened = EmbeddingStore(tmp_path, "clip-ViT-L-14", "v1", dim=8)
+    assert len(reopened) == 5
+    assert reopened.rows([14, 99, 10]) == [4, None, 0]
+    assert np.allclose(reopened.get([13, 10]), vectors[[3, 0]], atol=1e-2)
+    with pytest.raises(KeyError):
+        reopened.get([99])
+
+
+def test_store_is_separate_per_model_and_preprocessing(tmp_path):
+    """Tests that another model or preprocessing version never sees this one's vectors."""
+    EmbeddingStore(tmp_path, "clip-ViT-L-14", "v1", dim=4).add([1], np.ones((1, 4)))
+    assert len(EmbeddingStore(tmp_path, "clip-ViT-L-14", "v2", dim=4)) == 0
+    assert len(EmbeddingStore(tmp_path, "clip-ViT-B-32", "v1", dim=4)) == 0
+    with pytest.raises(ValueError):
+        EmbeddingStore(tmp_path, "clip-ViT-L-14", "v1", dim=8)
+
+
+def test_store_recovers_from_torn_append(tmp_path):
+    """Tests that a crash after writing a vector but before its key leaves a consistent, appendable store."""
+    store = EmbeddingStore(tmp_path, "m", "v1", dim=4)
+    store.add([1, 2], np.arange(8).reshape(2, 4))
+    with open(store.store_dir / VECTORS_FILE, "ab") as f:
+        f.write(np.ones(4, "<f2").tobytes() + b"\x00")  # a full vector plus a torn one, no keys
+    with open(store.store_dir / KEYS_FILE, "ab") as f:
+        f.write(b"\x03\x00")  # and a torn key
+
+    recovered = EmbeddingStore(tmp_path, "m", "v1", dim=4)
+    assert len(recovered) == 2
+    recovered.add([3], np.full((1, 4), 7))
+    assert EmbeddingStore(tmp_path, "m", "v1", dim=4).get([3, 2]).tolist() == [[7] * 4, [4, 5, 6, 7]]
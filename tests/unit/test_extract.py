@@ -0,0 +1,232 @@
+# tests/unit/test_extract.py
+import io
+import queue
+import shutil
+
+import ffmpeg
+import numpy as np
+import pytest
+from ingestion import extract
+from ingestion.extract import (
+    ExtractedFrame,
+    FrameFilters,
+    _filter_counts,
+    _output_size,
+    _parse_showinfo,
+    _parse_showinfo_line,
+    _read_showinfo,
+    _segment_bounds,
+    extract_video_frames,
+    extract_video_segmented,
+    iter_video_frames,
+    write_frames,
+)
+from PIL import Image
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None, reason="ffmpeg not installed"
+)
+
+
+def _make_video(path, size="320x240", seconds=3, rate=10, gop=10, freeze=0):
+    """
+    Writes a synthetic test-pattern video with a keyframe every `gop` frames,
+    ending in `freeze` seconds of the last frame repeated.
+    """
+    stream = ffmpeg.input(f"testsrc2=size={size}:rate={rate}:duration={seconds}", f="lavfi")
+    if freeze:
+        stream = stream.filter("tpad", stop_mode="clone", stop_duration=freeze)
+    stream.output(str(path), vcodec="mpeg4", pix_fmt="yuv420p", g=gop, **{"q:v": 2}).run(
+        quiet=True, overwrite_output=True
+    )
+    return path
+
+
+def test_write_frames_round_trips_every_format(tmp_path):
+    """Tests that streamed frames are written under the file-based naming scheme and decode back to the same pixels."""
+    y, x = np.mgrid[0:48, 0:64]
+    frames = [
+        ExtractedFrame(i, i / 10, np.stack([x * 4, y * 5, (x + y) * i * 2], axis=-1).astype(np.uint8)) for i in (1, 2)
+    ]
+
+    for frame_format in ("png", "webp", "jpg", "npy"):
+        paths = write_frames(frames, tmp_path, "clip", frame_format)
+        assert [p.name for p in paths] == [f"clip_00001.{frame_format}", f"clip_00002.{frame_format}"]
+        for frame, path in zip(frames, paths):
+            decoded = np.load(path) if frame_format == "npy" else np.asarray(Image.open(path).convert("RGB"))
+            assert decoded.shape == frame.image.shape
+            if frame_format == "jpg":
+                assert np.abs(decoded.astype(int) - frame.image).mean() < 4
+            else:
+                assert np.array_equal(decoded, frame.image)
+
+    with pytest.raises(ValueError):
+        write_frames(frames, tmp_path, "clip", "tiff")
+
+
+@requires_ffmpeg
+def test_streamed_frames_match_file_based_extraction(tmp_path):
+    """Tests that frames read from ffmpeg's stdout have the right shape, pixels and timestamps."""
+    video = _make_video(tmp_path / "clip.mp4")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    streamed = list(iter_video_frames(video, strategy="keyframe"))
+    written = extract_video_frames(video, out_dir, strategy="keyframe")
+
+    assert [frame.index for frame in streamed] == [1, 2, 3]
+    assert [frame.timestamp for frame in streamed] == pytest.approx([0.0, 1.0, 2.0])
+    assert len(written) == len(streamed)
+    for frame, path in zip(streamed, written):
+        assert np.array_equal(frame.image, np.asarray(Image.open(path).convert("RGB")))
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("frame_format", ["png", "webp", "jpg", "npy"])
+def test_every_frame_format_extracts(tmp_path, frame_format):
+    """Tests that ffmpeg accepts each format's output options (npy goes through the streaming path)."""
+    video = _make_video(tmp_path / "clip.mp4")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    paths = extract_video_frames(video, out_dir, strategy="keyframe", frame_format=frame_format)
+
+    assert [p.name for p in paths] == [f"clip_{i:05d}.{frame_format}" for i in (1, 2, 3)]
+    first = np.load(paths[0]) if frame_format == "npy" else np.asarray(Image.open(paths[0]).convert("RGB"))
+    assert first.shape == (240, 320, 3)
+
+
+def test_segment_bounds_cover_the_video_once():
+    """Tests that owned ranges tile [0, duration) and each decode starts `overlap` earlier (clamped at 0)."""
+    bounds = _segment_bounds(100.0, 4, overlap=2.0)
+    assert bounds == [(0.0, 0.0, 25.0), (23.0, 25.0, 50.0), (48.0, 50.0, 75.0), (73.0, 75.0, 100.0)]
+    assert _segment_bounds(10.0, 1, overlap=2.0) == [(0.0, 0.0, 10.0)]
+
+
+def test_segmented_merge_keeps_owned_frames_in_order(tmp_path, monkeypatch):
+    """
+    Tests the merge without ffmpeg: frames decoded in an overlap belong to the segment that owns their
+    timestamp, a boundary frame seen by both segments is kept once, and the result is renumbered in time order.
+    """
+    segment_frames = {
+        # (absolute timestamp) per segment; the decoder also sees frames outside the range it owns
+        0: [10.0, 49.99, 50.0],
+        1: [48.5, 50.02, 75.0, 100.0],
+    }
+
+    def fake_extract_segment(file_path, work_dir, k, decode_start, decode_end, *args):
+        frames = []
+        for i, ts in enumerate(segment_frames[k]):
+            path = work_dir / f"seg{k:03d}_{i + 1:05d}.png"
+            path.write_text(f"{k}@{ts}")
+            frames.append((ts, path))
+        return frames, {"tap_selected": len(frames) + 1, "tap_out": len(frames)}
+
+    monkeypatch.setattr(extract, "probe_video", lambda file_path: {"duration": 100.0})
+    monkeypatch.setattr(extract, "_extract_segment", fake_extract_segment)
+    filters = FrameFilters()
+    paths = extract_video_segmented(tmp_path / "clip.mp4", tmp_path, segments=2, filters=filters)
+
+    assert [p.name for p in paths] == [f"clip_{i:05d}.png" for i in range(1, 5)]
+    assert [p.read_text() for p in paths] == ["0@10.0", "0@49.99", "1@75.0", "1@100.0"]
+    assert filters.counts == {"selected": 9, "blurry": 0, "near_duplicate": 0, "kept": 7}
+    assert sorted(tmp_path.iterdir()) == paths  # the segment work directory is gone
+
+    with pytest.raises(ValueError):
+        extract_video_segmented(tmp_path / "clip.mp4", tmp_path, segments=2, frame_format="tiff")
+
+
+@requires_ffmpeg
+def test_segmented_extraction_matches_single_process(tmp_path):
+    """Tests that decoding in two time segments yields the same frames as one pass over the whole video."""
+    video = _make_video(tmp_path / "clip.mp4", size="160x120", seconds=65, rate=5, gop=25)
+    single_dir, segmented_dir = tmp_path / "single", tmp_path / "segmented"
+    single_dir.mkdir()
+    segmented_dir.mkdir()
+
+    single = extract_video_frames(video, single_dir, strategy="keyframe")
+    segmented = extract_video_segmented(video, segmented_dir, segments=2, strategy="keyframe")
+
+    assert len(single) == 13
+    assert [p.name for p in segmented] == [p.name for p in single]
+    for a, b in zip(single, segmented):
+        assert np.array_equal(np.asarray(Image.open(a)), np.asarray(Image.open(b)))
+
+
+@pytest.mark.parametrize(
+    "size, max_short_edge, expected",
+    [
+        # Checked against ffmpeg 6.0; the first three are exact halves, which ffmpeg rounds away from zero
+        ((1922, 1080), 540, (962, 540)),
+        ((1080, 1922), 540, (540, 962)),
+        ((1000, 1000), 333, (334, 333)),
+        ((322, 242), 121, (162, 121)),
+        ((998, 1000), 500, (500, 502)),
+        ((1280, 720), 360, (640, 360)),
+        ((1280, 720), 2000, (1280, 720)),
+    ],
+)
+def test_output_size_matches_ffmpeg_rounding(size, max_short_edge, expected):
+    """Tests that the predicted frame size matches what ffmpeg's scale filter produces, or frames get mis-sliced."""
+    assert _output_size(*size, FrameFilters(max_short_edge=max_short_edge)) == expected
+    assert _output_size(*size, FrameFilters()) == size
+    assert _output_size(*size, None) == size
+
+
+def test_showinfo_lines_are_attributed_to_taps():
+    """
+    Tests showinfo parsing on real ffmpeg log lines, including one glued to a progress line, for both the
+    file-based path (whole stderr) and the streaming path (stderr read line by line as it arrives).
+    """
+    stderr = (
+        b"[tap_selected @ 0x34496680] config in time_base: 1/5, frame_rate: 5/1\n"
+        b"[tap_selected @ 0x34496680] n:   0 pts:      0 pts_time:0       duration:      1 fmt:yuv420p\n"
+        b"[tap_selected @ 0x34496680] color_range:unknown color_space:unknown\n"
+        b"[tap_out @ 0x34496b40] n:   0 pts:      0 pts_time:0       duration:      1 fmt:yuv420p\n"
+        b"[tap_selected @ 0x34496680] n:   1 pts:  10240 pts_time:1       duration:   1024 fmt:yuv420p\n"
+        b"frame=    0 fps=0.0 q=-0.0 size=       0kB time=00:00:00.00 bitrate=N/A speed=   0x    \r"
+        b"[tap_out @ 0x34496b40] n:   1 pts:  10240 pts_time:1.5     duration:   1024 fmt:yuv420p\n"
+        b"  Duration: 00:00:03.00, start: 0.000000, bitrate: 809 kb/s\n"
+    )
+    assert _parse_showinfo_line("[tap_sharp @ 0x1] n:   7 pts: 700 pts_time:0.7 duration: 1") == ("tap_sharp", 0.7)
+    assert _parse_showinfo_line("[Parsed_showinfo_2 @ 0x1] n:   7 pts: 700 pts_time:0.7") is None
+    assert _parse_showinfo(stderr) == ([0.0, 1.5], {"tap_selected": 2, "tap_out": 2})
+
+    timestamps, tap_counts = queue.Queue(), {}
+    _read_showinfo(io.BytesIO(stderr), timestamps, tap_counts, [])
+    assert [timestamps.get_nowait() for _ in range(3)] == [0.0, 1.5, None]
+    assert tap_counts == {"tap_selected": 2, "tap_out": 2}
+
+
+def test_filter_counts_turn_tap_counts_into_drops():
+    """Tests that missing taps (filters that were not enabled) count as dropping nothing."""
+    all_taps = {"tap_selected": 40, "tap_sharp": 31, "tap_unique": 12, "tap_out": 12}
+    assert _filter_counts(all_taps) == {"selected": 40, "blurry": 9, "near_duplicate": 19, "kept": 12}
+    assert _filter_counts({"tap_selected": 40, "tap_unique": 25, "tap_out": 25}) == {
+        "selected": 40,
+        "blurry": 0,
+        "near_duplicate": 15,
+        "kept": 25,
+    }
+    assert _filter_counts({}) == {"selected": 0, "blurry": 0, "near_duplicate": 0, "kept": 0}
+
+
+@requires_ffmpeg
+def test_in_graph_filters_count_drops_and_downscale(tmp_path):
+    """Tests that frozen frames are dropped in the graph and streamed frames come out at the predicted size."""
+    video = _make_video(tmp_path / "clip.mp4", size="322x242", seconds=2, gop=1, freeze=2)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    filters = FrameFilters(drop_near_duplicates=True, max_short_edge=121)
+    streamed = list(iter_video_frames(video, strategy="keyframe", filters=filters))
+    counts = filters.counts
+
+    assert counts["selected"] == 40
+    assert counts["near_duplicate"] >= 15  # the frozen tail
+    assert counts["kept"] == len(streamed) == counts["selected"] - counts["blurry"] - counts["near_duplicate"]
+    assert all(frame.image.shape == (121, 162, 3) for frame in streamed)
+
+    written = extract_video_frames(video, out_dir, strategy="keyframe", filters=FrameFilters(**vars(filters)))
+    assert len(written) == len(streamed)
+    assert Image.open(written[0]).size == (162, 121)
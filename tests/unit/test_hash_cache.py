@@ -0,0 +1,42 @@
+# tests/unit/test_hash_cache.py
+import os
+
+from curation.hash_cache import HashCache
+from curation.hashing import hash_images
+from PIL import Image
+
+
+def test_warm_cache_skips_unchanged_files_and_prunes_deleted(tmp_path, monkeypatch):
+    """Tests that only new or modified images are re-hashed, and deleted ones drop out of the cache."""
+    image_dir = tmp_path / "images"
+    image_dir.mkdir()
+    paths = []
+    for i in range(3):
+        path = image_dir / f"img_{i}.png"
+        Image.new("RGB", (32, 32), (i * 80, 0, 0)).save(path)
+        paths.append(path)
+
+    cache = HashCache(tmp_path / "cache.sqlite")
+    cold = hash_images(paths, workers=1, cache=cache)["phash"]
+    assert len(cache) == 3
+
+    # Modify one file (new content, bumped mtime) and delete another
+    Image.new("RGB", (32, 32), (0, 0, 255)).save(paths[0])
+    st = os.stat(paths[0])
+    os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    paths[2].unlink()
+
+    hits, misses = cache.lookup(paths[:2])
+    assert misses == [paths[0]]
+    assert hits == {paths[1]: cold[paths[1]]}
+
+    assert cache.prune(image_dir, paths[:2]) == 1
+    assert len(cache) == 2
+    cache.close()
+
+    # The cache survives reopening and values round-trip through signed SQLite integers
+    reopened = HashCache(tmp_path / "cache.sqlite")
+    warm = hash_images(paths[:2], workers=1, cache=reopened)["phash"]
+    assert warm[paths[1]] == cold[paths[1]]
+    assert reopened.lookup(paths[:2]) == (warm, [])
+    reopened.close()
@@ -0,0 +1,29 @@
+# tests/unit/test_hash_index.py
+import numpy as np
+import pytest
+from curation.hash_index import MultiIndexHashTable, brute_force_query, popcount64
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 5, 10])
+def test_multi_index_matches_brute_force(threshold):
+    """Tests that the multi-index table returns exactly the hashes a linear scan finds."""
+    rng = np.random.default_rng(threshold)
+    base = rng.integers(0, 2**64, size=500, dtype=np.uint64)
+    # Near-duplicates: copies of stored hashes with a few bits flipped
+    flips = rng.integers(0, 64, size=(200, 3))
+    near = base[:200].copy()
+    for i, bits in enumerate(flips):
+        for b in bits:
+            near[i] ^= np.uint64(1) << np.uint64(b)
+
+    table = MultiIndexHashTable(threshold)
+    for value in base.tolist():
+        table.add(value)
+
+    for value in np.concatenate([near, base[:50]]).tolist():
+        assert table.query(value) == brute_force_query(table.hashes(), value, threshold)
+
+
+def test_popcount64_lookup_matches_python():
+    values = np.array([0, 1, 2**64 - 1, 0xF0F0F0F0F0F0F0F0], dtype=np.uint64)
+    assert popcount64(values).tolist() == [int(v).bit_count() for v in values.tolist()]
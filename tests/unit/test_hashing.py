@@ -0,0 +1,68 @@
+# tests/unit/test_hashing.py
+from pathlib import Path
+
+import imagehash
+import numpy as np
+from curation.hash_index import hash_to_int
+from curation.hashing import COLOR_THUMBNAIL_SIZE, HASH_KINDS, hash_images, load_for_hash
+from PIL import Image
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+
+def test_parallel_hashes_match_serial(tmp_path):
+    """Tests that the process pool returns the same hashes as hashing in-process, and skips bad files."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"img_{i}.png"
+        Image.fromarray(rng.integers(0, 256, size=(64, 64, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not a jpeg")
+
+    serial = hash_images(paths + [broken], workers=1, kinds=HASH_KINDS)
+    parallel = hash_images(paths + [broken], workers=2, chunk_size=2, kinds=HASH_KINDS)
+
+    assert serial == parallel
+    assert all(set(serial[kind]) == set(paths) for kind in HASH_KINDS)
+
+
+def test_batched_hashes_match_imagehash(tmp_path):
+    """Tests that every vectorized hash family is bit-for-bit what imagehash computes per image."""
+    with Image.open(FIXTURES_DIR / "sample_image.jpg") as img:
+        source = img.convert("RGB")
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"variant_{i}.png"
+        source.rotate(i * 11).resize((180 + i * 17, 140 + i * 9)).save(path)
+        paths.append(path)
+
+    hashes = hash_images(paths, workers=1, draft=False, kinds=HASH_KINDS)
+
+    for path in paths:
+        with Image.open(path) as img:
+            color_thumbnail = img.convert("RGB").resize(COLOR_THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+            expected = {
+                "phash": imagehash.phash(img),
+                "dhash": imagehash.dhash(img),
+                "ahash": imagehash.average_hash(img),
+                "colorhash": imagehash.colorhash(color_thumbnail),
+            }
+        for kind in HASH_KINDS:
+            assert hashes[kind][path] == hash_to_int(expected[kind]), kind
+
+
+def test_draft_decode_keeps_jpeg_hash_close(tmp_path):
+    """Tests that reduced-size JPEG decoding changes the phash by at most a few bits."""
+    with Image.open(FIXTURES_DIR / "sample_image.jpg") as img:
+        large = img.convert("RGB").resize((img.width * 8, img.height * 8), Image.Resampling.LANCZOS)
+    path = tmp_path / "large.jpg"
+    large.save(path, quality=95)
+
+    def phash(draft):
+        with load_for_hash(path, draft) as img:
+            return hash_to_int(imagehash.phash(img))
+
+    distance = (phash(draft=True) ^ phash(draft=False)).bit_count()
+    assert distance <= 4
@@ -0,0 +1,26 @@
+# tests/unit/test_image_files.py
+import numpy as np
+import pytest
+from ingestion.extract import FRAME_FORMATS, ExtractedFrame, write_frames
+from shared.image_files import list_images, open_image, read_gray
+
+
+@pytest.mark.parametrize("frame_format", list(FRAME_FORMATS))
+def test_frame_formats_round_trip(tmp_path, frame_format):
+    """Tests that every ingestion frame format is listed and readable by the curation helpers."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+    (tmp_path / "notes.txt").write_text("not an image")
+
+    paths = write_frames([ExtractedFrame(index=1, timestamp=0.0, image=image)], tmp_path, "clip", frame_format)
+
+    assert list_images(tmp_path) == paths
+    rgb = np.asarray(open_image(paths[0]).convert("RGB"))
+    gray = read_gray(paths[0])
+    assert rgb.shape == (48, 64, 3) and gray.shape == (48, 64)
+    gray_error = np.abs(gray.astype(int) - np.asarray(open_image(paths[0]).convert("L")))
+    if frame_format == "jpg":  # the only lossy format; OpenCV decodes its luma plane directly
+        assert gray_error.mean() < 2
+    else:
+        assert np.array_equal(rgb, image)
+        assert gray_error.max() <= 1
@@ -0,0 +1,61 @@
+# tests/unit/test_ingestion_index.py
+import hashlib
+import pickle
+import shutil
+from pathlib import Path
+
+from ingestion.extract import process_source_file
+from ingestion.index import IngestionIndex, hash_file, link_or_copy
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+
+def test_hash_file_matches_hashlib(tmp_path):
+    """Tests that chunked hashing gives the same digest as hashing the whole file."""
+    f = tmp_path / "blob.bin"
+    data = bytes(range(256)) * 5000
+    f.write_bytes(data)
+    assert hash_file(f, chunk_size=1000) == hashlib.sha256(data).hexdigest()
+
+
+def test_link_or_copy_preserves_content(tmp_path):
+    """Tests that the placed file has the source's content, whatever method was used."""
+    src = tmp_path / "src.jpg"
+    src.write_bytes(b"pixels")
+    dst = tmp_path / "out" / "src.jpg"
+    dst.parent.mkdir()
+    dst.write_bytes(b"stale")
+
+    assert link_or_copy(src, dst) in {"hardlink", "reflink", "copy"}
+    assert dst.read_bytes() == b"pixels"
+
+
+def test_index_survives_pickling(tmp_path):
+    """Tests that a pickled index reconnects to the same database (process-pool workers)."""
+    index = IngestionIndex(tmp_path / "index.sqlite")
+    index.record("abc", 3, "image/jpeg", "a.jpg", [tmp_path / "a.jpg"])
+
+    clone = pickle.loads(pickle.dumps(index))
+    assert clone.contains("abc")
+    assert clone.frames_for("abc") == [tmp_path / "a.jpg"]
+    assert not clone.contains("def")
+
+
+def test_redropped_image_is_skipped(tmp_path):
+    """Tests that a source that was already ingested is not processed again."""
+    drop_dir = tmp_path / "drop"
+    out_dir = tmp_path / "out"
+    drop_dir.mkdir()
+    index = IngestionIndex(tmp_path / "index.sqlite")
+
+    first = shutil.copy(FIXTURES_DIR / "sample_image.jpg", drop_dir / "sample.jpg")
+    frames = process_source_file(Path(first), out_dir, index=index)
+    assert frames == [out_dir / "sample.jpg"]
+    assert not Path(first).exists()
+
+    # Same content under a different name
+    second = shutil.copy(FIXTURES_DIR / "sample_image.jpg", drop_dir / "renamed.jpg")
+    assert process_source_file(Path(second), out_dir, index=index) == []
+    assert not Path(second).exists()
+    assert not (out_dir / "renamed.jpg").exists()
+    assert len(index) == 1
@@ -0,0 +1,134 @@
+# tests/unit/test_journal.py
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ingestion import extract
+from ingestion.extract import process_source_file
+from ingestion.index import hash_file
+from ingestion.journal import COMMITTED, EXTRACTED, IngestionJournal
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+
+def test_journal_replays_state_and_ignores_torn_line(tmp_path):
+    """Tests that the journal survives a reopen, including a half-written final line."""
+    journal_path = tmp_path / "journal.jsonl"
+    journal = IngestionJournal(journal_path)
+    journal.begin("u1", tmp_path / "a.mp4", tmp_path / ".ingest-u1")
+    journal.extracted("u1", [tmp_path / "a_00001.png"])
+    journal.begin("u2", tmp_path / "b.mp4", tmp_path / ".ingest-u2")
+    journal.commit("u2")
+    journal.close()
+    with open(journal_path, "a") as f:
+        f.write('{"unit": "u3", "sta')
+
+    reopened = IngestionJournal(journal_path)
+    assert reopened.state("u1")["state"] == EXTRACTED
+    assert reopened.state("u1")["frames"] == [str(tmp_path / "a_00001.png")]
+    assert reopened.state("u2")["state"] == COMMITTED
+    assert reopened.state("u3") is None
+    assert [r["unit"] for r in reopened.incomplete()] == ["u1"]
+
+
+def test_recover_abandons_units_whose_source_is_gone(tmp_path):
+    """Tests that recovery re-queues live sources and cleans up orphaned work directories."""
+    journal = IngestionJournal(tmp_path / "journal.jsonl")
+    live = tmp_path / "live.mp4"
+    live.write_bytes(b"v")
+    orphan_work = tmp_path / ".ingest-gone"
+    orphan_work.mkdir()
+    (orphan_work / "gone_00001.png").write_bytes(b"partial")
+    journal.begin("live", live, tmp_path / ".ingest-live")
+    journal.begin("gone", tmp_path / "gone.mp4", orphan_work)
+
+    assert journal.recover() == [live]
+    assert not orphan_work.exists()
+    assert journal.state("gone")["state"] == "abandoned"
+
+
+def test_interrupted_unit_resumes_without_reprocessing(tmp_path):
+    """Tests that a unit that crashed after extraction is finished from the journal alone."""
+    drop_dir = tmp_path / "drop"
+    out_dir = tmp_path / "out"
+    drop_dir.mkdir()
+    out_dir.mkdir()
+    source = Path(shutil.copy(FIXTURES_DIR / "sample_image.jpg", drop_dir / "sample.jpg"))
+    sha256 = hash_file(source)
+
+    # Simulate a crash after the frames were staged and journaled, before they were renamed.
+    journal = IngestionJournal(tmp_path / "journal.jsonl")
+    work_dir = out_dir / f".ingest-{sha256[:16]}"
+    work_dir.mkdir()
+    (work_dir / "sample.jpg").write_bytes(b"staged frame")
+    journal.begin(sha256, source, work_dir)
+    journal.extracted(sha256, [out_dir / "sample.jpg"])
+    journal.close()
+
+    journal = IngestionJournal(tmp_path / "journal.jsonl")
+    frames = process_source_file(source, out_dir, journal=journal)
+
+    # The staged frame was moved into place, not re-extracted from the source
+    assert frames == [out_dir / "sample.jpg"]
+    assert (out_dir / "sample.jpg").read_bytes() == b"staged frame"
+    assert not work_dir.exists()
+    assert not source.exists()
+    assert journal.state(sha256)["state"] == COMMITTED
+
+
+def test_process_source_file_stages_frames_outside_output_dir(tmp_path):
+    """Tests that a normal run leaves no work directory behind and commits the unit."""
+    drop_dir = tmp_path / "drop"
+    out_dir = tmp_path / "out"
+    drop_dir.mkdir()
+    source = Path(shutil.copy(FIXTURES_DIR / "sample_image.jpg", drop_dir / "sample.jpg"))
+    journal = IngestionJournal(tmp_path / "journal.jsonl")
+
+    frames = process_source_file(source, out_dir, journal=journal)
+
+    assert frames == [out_dir / "sample.jpg"]
+    assert list(out_dir.iterdir()) == [out_dir / "sample.jpg"]
+    assert journal.incomplete() == []
+
+
+def test_identical_sources_in_flight_do_not_clobber_each_other(tmp_path, monkeypatch):
+    """Tests that a second copy of the same content waits for the first instead of deleting its work directory."""
+    out_dir = tmp_path / "out"
+    sources = []
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        sources.append(Path(shutil.copy(FIXTURES_DIR / "sample_image.jpg", tmp_path / folder / "sample.jpg")))
+    journal = IngestionJournal(tmp_path / "journal.jsonl")
+
+    def slow_link_or_copy(src, dst):
+        time.sleep(0.2)  # the other worker gets to run while this one is mid-extraction
+        assert dst.parent.is_dir(), "work directory was removed under a running extraction"
+        shutil.copy(src, dst)
+
+    monkeypatch.setattr(extract, "link_or_copy", slow_link_or_copy)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda source: process_source_file(source, out_dir, journal=journal), sources))
+
+    assert sorted(results, key=len) == [[], [out_dir / "sample.jpg"]]
+    assert list(out_dir.iterdir()) == [out_dir / "sample.jpg"]
+    assert not any(source.exists() for source in sources)
+    assert journal.incomplete() == []
+
+
+def test_unpickled_journals_are_shared_per_process(tmp_path):
+    """Tests that a pool worker opens the journal once, not once per task, and sees other processes' appends."""
+    journal_path = tmp_path / "journal.jsonl"
+    parent = IngestionJournal(journal_path)
+    fds_before = len(os.listdir("/proc/self/fd"))
+    worker_copies = [pickle.loads(pickle.dumps(parent)) for _ in range(50)]
+    assert all(copy is worker_copies[0] for copy in worker_copies)
+    assert len(os.listdir("/proc/self/fd")) <= fds_before + 1
+
+    # Another process (here, another instance) appending is picked up on the next lookup
+    parent.begin("u1", tmp_path / "a.mp4", tmp_path / ".ingest-u1")
+    assert worker_copies[0].state("u1")["state"] == "started"
+    parent.commit("u1")
+    assert worker_copies[0].state("u1")["state"] == COMMITTED
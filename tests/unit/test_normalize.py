@@ -0,0 +1,53 @@
+# tests/unit/test_normalize.py
+from ingestion.normalize import normalize_image, read_original_size, sidecar_path
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+
+def test_normalize_bakes_orientation_and_records_original_size(tmp_path):
+    """Tests that a rotated, oversized JPEG is upright, downscaled and has a sidecar with its true size."""
+    src = tmp_path / "portrait.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored landscape, displayed rotated 90 degrees
+    Image.new("RGB", (400, 300), "red").save(src, exif=exif.tobytes())
+    dst = tmp_path / "out" / "portrait.jpg"
+    dst.parent.mkdir()
+
+    assert normalize_image(src, dst, max_edge=200) == (400, 300)
+
+    with Image.open(dst) as img:
+        assert img.size == (150, 200)
+        assert img.getexif().get(0x0112, 1) == 1
+    assert read_original_size(dst) == (400, 300)
+
+
+def test_normalize_links_images_that_need_no_change(tmp_path):
+    """Tests that small, upright images are passed through without a sidecar."""
+    src = tmp_path / "small.png"
+    Image.new("RGB", (64, 48)).save(src)
+    dst = tmp_path / "small_out.png"
+
+    assert normalize_image(src, dst, max_edge=200) == (48, 64)
+    assert dst.read_bytes() == src.read_bytes()
+    assert not sidecar_path(dst).exists()
+
+
+def test_normalize_decodes_oversized_jpegs_at_reduced_scale(tmp_path, monkeypatch):
+    """Tests that a 3:2 JPEG is draft-decoded at the smallest scale that still covers max_edge."""
+    src = tmp_path / "wide.jpg"
+    Image.new("RGB", (1200, 800), "blue").save(src)
+    decoded_sizes = []
+    draft = JpegImageFile.draft
+
+    def recording_draft(self, mode, size):
+        result = draft(self, mode, size)
+        decoded_sizes.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImageFile, "draft", recording_draft)
+    normalize_image(src, tmp_path / "out.jpg", max_edge=500)
+
+    # A (500, 500) request could not reduce: at 1/2 scale the short edge (400) would fall below 500
+    assert decoded_sizes == [(600, 400)]
+    with Image.open(tmp_path / "out.jpg") as img:
+        assert img.size == (500, 333)
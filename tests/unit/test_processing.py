@@ -0,0 +1,122 @@
+# tests/unit/test_processing.py
+import threading
+from pathlib import Path
+
+from ingestion.processing import IngestionQueue
+
+
+def _fake_process(file_path: Path, output_dir: Path) -> list[Path]:
+    """Stands in for process_source_file: 'extracts' one frame per source."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    frame = output_dir / f"{file_path.stem}_00001.png"
+    frame.write_bytes(file_path.read_bytes())
+    file_path.unlink()
+    return [frame]
+
+
+def test_queue_processes_all_files(tmp_path):
+    """Tests that every submitted file is processed and counted."""
+    drop_dir = tmp_path / "drop"
+    drop_dir.mkdir()
+    files = []
+    for i in range(20):
+        f = drop_dir / f"img_{i}.jpg"
+        f.write_bytes(b"x" * (i + 1))
+        files.append(f)
+
+    q = IngestionQueue(
+        tmp_path / "out", max_workers=3, max_queue_size=4, stability_interval=0.01, process_fn=_fake_process
+    )
+    q.start()
+    for f in files:
+        assert q.submit(f)
+    assert q.join(timeout=10)
+    q.stop()
+
+    summary = q.summary()
+    assert summary["completed"] == 20
+    assert summary["frames"] == 20
+    assert summary["failed"] == 0
+    assert summary["max_queue_depth"] <= 8  # queue + pending set, both bounded by max_queue_size
+    assert len(list((tmp_path / "out").iterdir())) == 20
+
+
+def test_queue_waits_for_file_to_stop_growing(tmp_path):
+    """Tests that a file still being written is not processed until its size settles."""
+    growing = tmp_path / "video.mp4"
+    growing.write_bytes(b"a")
+    seen_sizes = []
+
+    def record(file_path: Path, output_dir: Path) -> list[Path]:
+        seen_sizes.append(file_path.stat().st_size)
+        return []
+
+    q = IngestionQueue(tmp_path / "out", stability_interval=0.05, stability_checks=3, process_fn=record)
+    q.start()
+    q.submit(growing)
+
+    stop_writing = threading.Event()
+
+    def writer():
+        for _ in range(10):
+            with open(growing, "ab") as f:
+                f.write(b"b" * 100)
+            stop_writing.wait(0.03)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    t.join()
+    assert q.join(timeout=10)
+    q.stop()
+
+    assert seen_sizes == [1 + 10 * 100]
+
+
+def test_vanished_files_are_not_processed(tmp_path):
+    """Tests that a temp file renamed away before it is stable is counted as vanished."""
+    tmp_file = tmp_path / ".partial"
+    tmp_file.write_bytes(b"abc")
+
+    q = IngestionQueue(tmp_path / "out", stability_interval=0.05, stability_checks=5, process_fn=_fake_process)
+    q.start()
+    q.submit(tmp_file)
+    tmp_file.unlink()
+    assert q.join(timeout=10)
+    q.stop()
+
+    assert q.summary()["vanished"] == 1
+    assert q.summary()["completed"] == 0
+
+
+def test_non_blocking_submit_drops_when_full(tmp_path):
+    """Tests that a full queue rejects non-blocking submits instead of growing."""
+    q = IngestionQueue(tmp_path / "out", max_queue_size=2, process_fn=_fake_process)
+    # Dispatcher not started, so nothing drains the queue.
+    assert q.submit(tmp_path / "a.jpg", block=False)
+    assert q.submit(tmp_path / "b.jpg", block=False)
+    assert not q.submit(tmp_path / "c.jpg", block=False)
+    assert q.summary()["dropped"] == 1
+
+
+def test_files_that_stay_empty_are_released(tmp_path):
+    """Tests that a zero-byte file is given up on after `empty_checks` polls, but one filled in time is processed."""
+    abandoned = tmp_path / "abandoned.mp4"
+    abandoned.touch()
+    late = tmp_path / "late.jpg"
+    late.touch()
+
+    q = IngestionQueue(
+        tmp_path / "out", stability_interval=0.02, stability_checks=2, empty_checks=20, process_fn=_fake_process
+    )
+    q.start()
+    q.submit(abandoned)
+    q.submit(late)
+    threading.Event().wait(0.1)
+    late.write_bytes(b"data")
+    assert q.join(timeout=10)
+    q.stop()
+
+    summary = q.summary()
+    assert summary["empty"] == 1
+    assert summary["completed"] == 1
+    assert abandoned.exists() and not late.exists()
@@ -0,0 +1,199 @@
+# tests/unit/test_quality_gate.py
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from curation import quality_gate
+from curation.quality_gate import (
+    CheckScheduler,
+    FaceDetectionOptions,
+    ImageContext,
+    QualityCheck,
+    check_image,
+    detect_faces,
+    run_quality_gate,
+)
+from PIL import Image, ImageFilter
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+CASCADE = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+# OpenCV 5 dropped the Haar cascade API; requirements.txt pins 4.x
+requires_cascade = pytest.mark.skipif(
+    not hasattr(cv2, "CascadeClassifier"), reason="OpenCV build without CascadeClassifier"
+)
+
+
+def _write_images(image_dir):
+    rng = np.random.default_rng(0)
+    Image.new("RGB", (320, 240), (90, 90, 90)).save(image_dir / "small.png")
+    Image.new("RGB", (800, 800), (120, 130, 140)).save(image_dir / "flat.png")
+    for i in range(4):
+        noise = rng.integers(0, 256, size=(800, 800, 3), dtype=np.uint8)
+        Image.fromarray(noise).save(image_dir / f"sharp_{i}.png")
+
+
+@requires_cascade
+def test_parallel_gate_matches_serial(tmp_path):
+    """Tests that the process-pool gate rejects the same images as the serial gate, moving each once."""
+    outcomes = []
+    for workers in (1, 2):
+        image_dir = tmp_path / f"workers_{workers}"
+        image_dir.mkdir()
+        _write_images(image_dir)
+        run_quality_gate(image_dir, workers=workers, chunk_size=2, cascade_path=CASCADE)
+        kept = sorted(p.name for p in image_dir.glob("*.png"))
+        rejected = sorted(p.name for p in (image_dir / "rejected").iterdir())
+        outcomes.append((kept, rejected))
+
+    assert outcomes[0] == outcomes[1]
+    assert outcomes[0][1] == ["flat.png", "small.png"]
+    assert outcomes[0][0] == [f"sharp_{i}.png" for i in range(4)]
+
+
+class _NoFaces:
+    def detectMultiScale(self, gray, scale_factor, min_neighbors):
+        return ()
+
+
+@requires_cascade
+def test_gate_checks_only_the_given_paths(tmp_path):
+    """Tests that a batch run leaves images outside the batch alone, and skips batch images already removed."""
+    _write_images(tmp_path)
+    batch = [tmp_path / "small.png", tmp_path / "sharp_0.png", tmp_path / "gone.png"]
+    run_quality_gate(tmp_path, cascade_path=CASCADE, image_paths=batch)
+    assert sorted(p.name for p in (tmp_path / "rejected").iterdir()) == ["small.png"]
+    assert (tmp_path / "flat.png").exists()
+
+
+@pytest.fixture(scope="module")
+def calibration_set(tmp_path_factory) -> list[Path]:
+    """
+    Photo, white-noise, smooth-gradient and Nyquist-frequency (1-px stripes and checkerboard, like interlace
+    combing or dithering) images across a range of blurs, in lossy and lossless formats.
+    """
+    image_dir = tmp_path_factory.mktemp("calibration")
+    rng = np.random.default_rng(0)
+    with Image.open(FIXTURES_DIR / "sample_image.jpg") as img:
+        photo = img.convert("RGB").resize((img.width * 3, img.height * 3), Image.LANCZOS)
+    noise = Image.fromarray(rng.integers(0, 256, size=(720, 960, 3), dtype=np.uint8))
+    y, x = np.mgrid[0:720, 0:960]
+    gradient = Image.fromarray((127 + 100 * np.sin(x / 37.0) * np.cos(y / 53.0)).astype(np.uint8))
+    stripes = Image.fromarray((x % 2 * 255).astype(np.uint8))
+    checkerboard = Image.fromarray(((x + y) % 2 * 255).astype(np.uint8))
+
+    paths = []
+    for sigma in (0, 1, 2, 4):
+        images = {"photo": photo, "noise": noise, "gradient": gradient, "stripes": stripes, "checker": checkerboard}
+        for name, image in images.items():
+            blurred = image.filter(ImageFilter.GaussianBlur(sigma))
+            for suffix in (".jpg", ".png"):
+                paths.append(image_dir / f"{name}_{sigma}{suffix}")
+                blurred.save(paths[-1], compress_level=1)
+        paths.append(image_dir / f"photo_{sigma}.npy")
+        np.save(paths[-1], np.asarray(photo.filter(ImageFilter.GaussianBlur(sigma))))
+    return paths
+
+
+@pytest.mark.parametrize("reduction", [2, 4])
+def test_each_image_is_decoded_once(calibration_set, monkeypatch, reduction):
+    """
+    Tests that gating with a reduced face scale makes the same blur decisions as a full-resolution gate at every
+    threshold, with exactly one decode per image: faces are scanned on a shrunk copy of the blur check's decode.
+    """
+    paths = calibration_set
+    decodes = []
+    read_gray = quality_gate.read_gray
+
+    def counting_read_gray(path, reduction=1):
+        decodes.append((path, reduction))
+        return read_gray(path, reduction)
+
+    for blur_threshold in (10, 100, 1000):
+        expected = [check_image(p, _NoFaces(), 600, blur_threshold, reduction=1) is None for p in paths]
+        monkeypatch.setattr(quality_gate, "read_gray", counting_read_gray)
+        actual = [check_image(p, _NoFaces(), 600, blur_threshold, reduction=reduction) is None for p in paths]
+        monkeypatch.setattr(quality_gate, "read_gray", read_gray)
+        assert actual == expected, f"decisions differ at blur_threshold={blur_threshold}"
+        assert 0 < sum(expected) < len(paths)
+        assert decodes == [(p, 1) for p in paths]
+        decodes.clear()
+
+
+def test_reduced_scale_is_shrunk_from_the_full_decode(tmp_path, monkeypatch):
+    """
+    Tests that whichever check asks first, the image is decoded once at full resolution and the reduced scale is
+    shrunk from it, at the size of libjpeg's reduced decode.
+    """
+    path = tmp_path / "odd.jpg"
+    Image.new("L", (801, 603), 128).save(path)
+    decodes = []
+    read_gray = quality_gate.read_gray
+    monkeypatch.setattr(quality_gate, "read_gray", lambda path, *args: decodes.append(args) or read_gray(path, *args))
+
+    ctx = ImageContext(path, reduction=4)
+    assert ctx.gray().shape == read_gray(path, 4).shape == (151, 201)
+    assert ctx.gray(1).shape == (603, 801)
+    assert decodes == [()]
+
+
+def _slow_pass(ctx):
+    time.sleep(0.002)
+    return None
+
+
+def _fast_reject(ctx):
+    return "rejected"
+
+
+def test_scheduler_moves_selective_checks_first():
+    """Tests that measured cost and reject rate reorder checks, and that a rejection short-circuits the rest."""
+    # The declared costs are wrong on purpose: the slow check claims to be cheap
+    scheduler = CheckScheduler(
+        [QualityCheck("slow_pass", 1e-6, _slow_pass), QualityCheck("fast_reject", 1.0, _fast_reject)],
+        reorder_every=4,
+    )
+    record = {}
+    reasons = [scheduler.run(ImageContext(Path(f"{i}.png")), record) for i in range(12)]
+
+    assert reasons == ["rejected"] * 12
+    assert [check.name for check in scheduler.checks] == ["fast_reject", "slow_pass"]
+    assert scheduler.stats["slow_pass"].runs == 4  # only before the first reorder
+    assert scheduler.stats["fast_reject"].runs == scheduler.stats["fast_reject"].rejects == 12
+    assert record["slow_pass"] == scheduler.stats["slow_pass"]
+
+
+def _draw_face(side):
+    """A schematic face the frontal-face cascade detects (see scripts/bench_face_detection.py)."""
+    face = np.full((side, side), 90, np.uint8)
+    c = side // 2
+    cv2.ellipse(face, (c, int(c * 1.05)), (int(side * 0.36), int(side * 0.47)), 0, 0, 360, 200, -1)
+    for sign in (-1, 1):
+        x, y = c + sign * int(side * 0.15), int(side * 0.42)
+        cv2.ellipse(face, (x, y), (int(side * 0.09), int(side * 0.045)), 0, 0, 360, 40, -1)
+        cv2.ellipse(face, (x, y - int(side * 0.08)), (int(side * 0.10), int(side * 0.02)), 0, 0, 360, 70, -1)
+    cv2.ellipse(face, (c, int(side * 0.62)), (int(side * 0.04), int(side * 0.08)), 0, 0, 360, 170, -1)
+    cv2.ellipse(face, (c, int(side * 0.75)), (int(side * 0.13), int(side * 0.035)), 0, 0, 360, 80, -1)
+    return cv2.GaussianBlur(face, (0, 0), side / 100)
+
+
+@requires_cascade
+@pytest.mark.parametrize("first_pass_scale_factor", [None, 1.3])
+def test_downscaled_face_detection_reports_full_resolution_boxes(tmp_path, first_pass_scale_factor):
+    """Tests that capped-size detection finds a face, in full-resolution coordinates, and honours min_size."""
+    frame = np.full((1200, 1600), 120, np.uint8)
+    frame[300:540, 700:940] = _draw_face(240)
+    cv2.imwrite(str(tmp_path / "frame.png"), frame)
+    cascade = cv2.CascadeClassifier(CASCADE)
+
+    ctx = ImageContext(tmp_path / "frame.png", reduction=2)
+    options = FaceDetectionOptions(max_edge=400, first_pass_scale_factor=first_pass_scale_factor)
+    faces = detect_faces(ctx, cascade, options)
+    assert len(faces) >= 1
+    x, y, w, h = faces[0]
+    assert abs(x - 700) < 40 and abs(y - 300) < 40 and 200 < w < 290
+
+    options.min_size = 400  # larger than the face
+    assert detect_faces(ctx, cascade, options) == []
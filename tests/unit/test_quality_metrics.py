@@ -0,0 +1,117 @@
+# tests/unit/test_quality_metrics.py
+import zlib
+
+import cv2
+import numpy as np
+import pytest
+from curation import embedding
+from curation.quality_gate import run_quality_gate
+from curation.quality_metrics import (
+    compute_metrics,
+    load_metrics,
+    preview,
+    rejection_masks,
+    save_metrics,
+    score_directory,
+    table_from_rows,
+)
+from PIL import Image
+
+CASCADE = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+requires_cascade = pytest.mark.skipif(
+    not hasattr(cv2, "CascadeClassifier"), reason="OpenCV build without CascadeClassifier"
+)
+
+
+class _NoFaces:
+    def detectMultiScale(self, gray, scale_factor, min_neighbors):
+        return ()
+
+
+def _row(name, width=1024, height=1024, blur=500.0, faces=0, brightness=128.0, shadows=0.0, highlights=0.0):
+    return {
+        "key": zlib.crc32(name.encode()),
+        "name": name,
+        "width": width,
+        "height": height,
+        "blur": blur,
+        "faces": faces,
+        "brightness": brightness,
+        "contrast": 40.0,
+        "shadows": shadows,
+        "highlights": highlights,
+    }
+
+
+def test_rejection_masks_evaluate_every_check():
+    """Tests that each check is evaluated independently, so an image can fail several at once."""
+    table = table_from_rows(
+        [
+            _row("ok"),
+            _row("small", width=320),
+            _row("soft", blur=40.0),
+            _row("small_soft", height=400, blur=20.0),
+            _row("portrait", faces=2),
+            _row("dark", brightness=12.0, shadows=0.6),
+        ]
+    )
+
+    masks = rejection_masks(table)
+    assert masks["resolution"].tolist() == [False, True, False, True, False, False]
+    assert masks["blur"].tolist() == [False, False, True, True, False, False]
+    assert not masks["exposure"].any()  # exposure checks are off by default
+    assert preview(table) == {
+        "images": 6,
+        "rejected": 4,
+        "by_check": {"resolution": 2, "blur": 2, "faces": 1, "exposure": 0},
+    }
+
+    tuned = preview(table, min_resolution=300, blur_threshold=30.0, max_faces=2, max_clipped=0.5)
+    assert tuned == {"images": 6, "rejected": 2, "by_check": {"resolution": 0, "blur": 1, "faces": 0, "exposure": 1}}
+
+
+def test_metrics_round_trip(tmp_path):
+    """Tests that computed metrics survive save/load and that another reduction invalidates the table."""
+    rng = np.random.default_rng(0)
+    image_path = tmp_path / "noise.png"
+    Image.fromarray(rng.integers(0, 256, size=(200, 300, 3), dtype=np.uint8)).save(image_path)
+
+    metrics = compute_metrics(image_path, _NoFaces())
+    assert (metrics["width"], metrics["height"], metrics["faces"]) == (300, 200, 0)
+    assert metrics["blur"] > 1000 and 0 < metrics["shadows"] < 0.1
+
+    table = table_from_rows([metrics | {"key": 2**64 - 1}])
+    save_metrics(tmp_path / "metrics.npz", table, reduction=2)
+    loaded = load_metrics(tmp_path / "metrics.npz", reduction=2)
+    assert all(np.array_equal(loaded[column], table[column]) for column in table)
+    assert len(load_metrics(tmp_path / "metrics.npz", reduction=4)["key"]) == 0
+
+
+@requires_cascade
+def test_scored_table_gates_like_quality_gate(tmp_path, monkeypatch):
+    """
+    Tests that re-scoring reuses rows by content, re-reading only files the hash cache has not seen, and that
+    default thresholds match run_quality_gate.
+    """
+    rng = np.random.default_rng(0)
+    Image.new("RGB", (320, 240), (90, 90, 90)).save(tmp_path / "small.png")
+    Image.new("RGB", (800, 800), (120, 130, 140)).save(tmp_path / "flat.png")
+    for i in range(3):
+        Image.fromarray(rng.integers(0, 256, size=(800, 800, 3), dtype=np.uint8)).save(tmp_path / f"sharp_{i}.png")
+
+    hash_cache = tmp_path / "cache" / "hashes.sqlite"
+    table = score_directory(tmp_path, cascade_path=CASCADE, hash_cache_path=hash_cache)
+    (tmp_path / "sharp_0.png").rename(tmp_path / "renamed.png")
+    hashed = []
+    hash_file = embedding.hash_file
+    monkeypatch.setattr(embedding, "hash_file", lambda path: hashed.append(path.name) or hash_file(path))
+    rescored = score_directory(tmp_path, cascade_path=CASCADE, hash_cache_path=hash_cache)
+    assert hashed == ["renamed.png"]
+    assert rescored["name"].tolist() == ["flat.png", "renamed.png", "sharp_1.png", "sharp_2.png", "small.png"]
+    assert sorted(rescored["key"].tolist()) == sorted(table["key"].tolist())
+
+    masks = rejection_masks(rescored)
+    predicted = sorted(n for n, *fails in zip(rescored["name"].tolist(), *masks.values()) if any(fails))
+    run_quality_gate(tmp_path, cascade_path=CASCADE)
+    assert sorted(p.name for p in (tmp_path / "rejected").iterdir()) == predicted == ["flat.png", "small.png"]
@@ -0,0 +1,23 @@
+# tests/unit/test_similarity.py
+import numpy as np
+from curation.similarity import normalize_rows, similar_pairs
+
+
+def test_blocked_pairs_match_full_similarity_matrix(tmp_path):
+    """Tests that tiling (including ragged edge tiles and a float16 memmap) finds every pair above threshold."""
+    rng = np.random.default_rng(0)
+    base = normalize_rows(rng.normal(size=(300, 32)))
+    # Plant near-duplicates of the first 40 rows
+    vectors = normalize_rows(np.concatenate([base, base[:40] + 0.05 * rng.normal(size=(40, 32))]))
+    embeddings = np.lib.format.open_memmap(tmp_path / "emb.npy", mode="w+", dtype=np.float16, shape=vectors.shape)
+    embeddings[:] = vectors
+
+    found = set()
+    for rows, cols, sims in similar_pairs(embeddings, 0.9, block_size=64):
+        assert np.all(rows < cols) and np.all(sims >= 0.9)
+        found.update(zip(rows.tolist(), cols.tolist()))
+
+    full = np.asarray(embeddings, dtype=np.float32) @ np.asarray(embeddings, dtype=np.float32).T
+    expected = {(i, j) for i, j in zip(*np.nonzero(np.triu(full >= 0.9, k=1)))}
+    assert found == expected
+    assert {(i, 300 + i) for i in range(40)} <= found